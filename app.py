@@ -18,6 +18,11 @@ try:
     )
     from stock_hub.pulse_engine import fetch_market_pulse_standalone
     from stock_hub.stock_engine import run_research_cycle
+    from stock_hub.query_cache import get_snapshot_cache
+    from stock_hub.market_calendar import get_market_calendar
+    from stock_hub.portfolio import get_portfolio_manager
+    from stock_hub.screener import ScreenStore, ScreenError, INDICATOR_COLUMNS
+    from stock_hub.change_feed import get_change_feed
 except ImportError as e:
     st.error(f"System Boot Failure (Pathing): {e}")
     # Fallback for some cloud environments
@@ -28,6 +33,11 @@ except ImportError as e:
     )
     from pulse_engine import fetch_market_pulse_standalone
     from stock_engine import run_research_cycle
+    from query_cache import get_snapshot_cache
+    from market_calendar import get_market_calendar
+    from portfolio import get_portfolio_manager
+    from screener import ScreenStore, ScreenError, INDICATOR_COLUMNS
+    from change_feed import get_change_feed
 
 import plotly.express as px # type: ignore
 from dotenv import load_dotenv
@@ -42,6 +52,9 @@ if 'cache_cleared' not in st.session_state:
 st.set_page_config(page_title="Indigenous AI Cockpit", page_icon="🧬", layout="wide")
 
 TICKER_MAP = {"^NSEI": "Nifty 50", "^NSEBANK": "Bank Nifty", "^BSESN": "Sensex", "^CNXIT": "IT Sector"}
+LIVE_POLL_SECONDS = 1 # change-feed poll while the market is open
+IDLE_POLL_SECONDS = 30
+PULSE_STALE_SECONDS = 120 # no worker publishing: the fragment fetches the pulse itself
 
 # --- UI STYLING ---
 st.markdown("""
@@ -51,6 +64,82 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# --- LIVE WIDGETS (CHANGE FEED) ---
+# Each widget is a fragment that polls the change feed on a timer and only
+# re-renders itself; a full rerun happens only when a cycle publishes a snapshot.
+def _feed_events(name, topics):
+    """Change-feed events for one widget since its last poll (cursor kept per session)."""
+    feed = get_change_feed()
+    key = f"feed_cursor_{name}"
+    if key not in st.session_state:
+        st.session_state[key] = feed.last_id()
+        return []
+    st.session_state[key], events = feed.poll(st.session_state[key], topics)
+    return events
+
+def render_live_pulse(market_open):
+    events = _feed_events("pulse", ["pulse"])
+    now = datetime.utcnow()
+    if events:
+        st.session_state.pulse_rows, st.session_state.pulse_at = events[-1][2], now
+    elif "pulse_rows" not in st.session_state or (
+            market_open and (now - st.session_state.pulse_at).total_seconds() > PULSE_STALE_SECONDS):
+        st.session_state.pulse_rows, st.session_state.pulse_at = fetch_market_pulse_standalone(), now
+    pulse_data = st.session_state.pulse_rows
+    if pulse_data:
+        pulse_cols = st.columns(len(pulse_data))
+        for idx, p in enumerate(pulse_data):
+            with pulse_cols[idx]:
+                # Defensive Key Access to handle Cache Latency
+                raw_ticker = p.get('symbol', p.get('name', 'N/A'))
+                m_ticker = str(raw_ticker).upper()
+                display_name = TICKER_MAP.get(m_ticker, p.get('name', raw_ticker))
+                
+                val_v = float(p.get('value', 0))
+                if 'delta_val' in p:
+                    delta_display = f"{p['delta_val']:+,.2f} ({p['delta_pct']}% )"
+                else:
+                    delta_display = p.get('delta', 'N/A')
+
+                st.metric(label=display_name, value=f"{val_v:,.2f}", delta=delta_display)
+
+def render_live_alerts(db_path):
+    events = _feed_events("alerts", ["alert"])
+    if "alert_rows" not in st.session_state:
+        try:
+            with sqlite3.connect(db_path) as conn:
+                st.session_state.alert_rows = pd.read_sql(
+                    "SELECT Timestamp, Ticker, Kind, Direction, Level, Price FROM alert_events ORDER BY Id DESC LIMIT 50", conn
+                )
+        except Exception:
+            st.session_state.alert_rows = pd.DataFrame()
+    fresh = [a for _, _, batch in events for a in batch]
+    for a in fresh:
+        st.toast(f"🔔 {a['Ticker']} {a['Kind']} {'>=' if a['Direction'] == 'above' else '<='} {a['Level']} @ {a['Price']}")
+    if fresh:
+        st.session_state.alert_rows = pd.concat([pd.DataFrame(fresh[::-1]), st.session_state.alert_rows]).head(50)
+    if st.session_state.alert_rows.empty:
+        st.info("No level crossings recorded yet.")
+    else:
+        st.dataframe(st.session_state.alert_rows, use_container_width=True, hide_index=True)
+
+def render_live_ticks():
+    for _, _, prices in _feed_events("ticks", ["prices"]):
+        st.session_state.setdefault("live_ticks", {}).update(prices)
+        st.session_state.ticks_at = datetime.utcnow() + timedelta(hours=5, minutes=30)
+    ticks = st.session_state.get("live_ticks", {})
+    if not ticks:
+        st.info("Live ticks stream while the refresh scheduler runs (python -m stock_hub.refresh_scheduler).")
+        return
+    st.caption(f"Last tick: {st.session_state.ticks_at.strftime('%H:%M:%S')} IST")
+    st.dataframe(pd.DataFrame(sorted(ticks.items()), columns=["Ticker", "LTP"]).round(2),
+                 use_container_width=True, hide_index=True)
+
+def watch_snapshot():
+    # A new research snapshot changes most of the page: rerun the whole app once
+    if _feed_events("snapshot", ["snapshot"]):
+        st.rerun()
+
 def main():
     # --- MASTER AGENT CLEAN SLATE ---
     if "chat_purged" not in st.session_state:
@@ -60,23 +149,22 @@ def main():
         st.rerun()
 
     # --- AUTO-REFRESH LOGIC (CRITICAL) ---
-    ist_now = datetime.utcnow() + timedelta(hours=5, minutes=30)
-    today_str = ist_now.strftime("%Y-%m-%d")
+    calendar = get_market_calendar()
     
     # Check if DB is stale on launch
     db_path = os.path.join("stock_hub", "brotherhood_data.db")
+    snapshots = get_snapshot_cache()
     if os.path.exists(db_path):
         try:
-            with sqlite3.connect(db_path) as conn:
-                df_date = pd.read_sql("SELECT MAX(Date) as max_date FROM processed_watchlist", conn)
-                latest_db_date = df_date['max_date'].iloc[0] if not df_date.empty else None
-                
-                # If market is open (or it's just a new day) and we haven't run today
-                if latest_db_date != today_str and "auto_run_attempted" not in st.session_state:
-                    st.session_state.auto_run_attempted = True
-                    with st.spinner("🌞 New Day Detected. Initializing Market Terminal..."):
-                        run_research_cycle()
-                        st.rerun()
+            latest_db_date = snapshots.latest_date("processed_watchlist")
+            
+            # Only a session the DB has not seen yet triggers a cycle; weekends,
+            # holidays and overnight loads serve the last session's snapshot
+            if not calendar.is_fresh(latest_db_date) and "auto_run_attempted" not in st.session_state:
+                st.session_state.auto_run_attempted = True
+                with st.spinner("🌞 New Session Detected. Initializing Market Terminal..."):
+                    run_research_cycle()
+                    st.rerun()
         except: pass
     else:
         # No DB at all, force run
@@ -108,75 +196,56 @@ def main():
         if "messages" in st.session_state: st.session_state.messages = []
         st.rerun()
 
-    tabs = st.tabs(["🖥️ MARKET TERMINAL", "🚀 STRATEGY & CONTENT HUB"])
+    tabs = st.tabs(["🖥️ MARKET TERMINAL", "🚀 STRATEGY & CONTENT HUB", "💼 PORTFOLIO"])
 
     with tabs[0]:
         st.header("🖥️ Proprietary Market Terminal (v1.2.1-stable)")
+        if not calendar.is_market_open():
+            st.caption(f"Market {calendar.phase().replace('_', '-')} | Showing session of "
+                       f"{calendar.last_session_date().strftime('%d %b %Y')} | "
+                       f"Next open: {calendar.next_session_open().strftime('%a %d %b %H:%M')} IST")
         db_path = os.path.join("stock_hub", "brotherhood_data.db")
         
         # --- MARKET PULSE INDICES (LIVE REFRESH) ---
+        market_open = calendar.is_market_open()
+        live_every = LIVE_POLL_SECONDS if market_open else IDLE_POLL_SECONDS
+        st.fragment(run_every=live_every)(watch_snapshot)()
         try:
-            pulse_data = fetch_market_pulse_standalone()
-            if pulse_data:
-                pulse_cols = st.columns(len(pulse_data))
-                for idx, p in enumerate(pulse_data):
-                    with pulse_cols[idx]:
-                        # Defensive Key Access to handle Cache Latency
-                        raw_ticker = p.get('symbol', p.get('name', 'N/A'))
-                        m_ticker = str(raw_ticker).upper()
-                        display_name = TICKER_MAP.get(m_ticker, p.get('name', raw_ticker))
-                        
-                        val_v = float(p.get('value', 0))
-                        if 'delta_val' in p:
-                            delta_display = f"{p['delta_val']:+,.2f} ({p['delta_pct']}% )"
-                        else:
-                            delta_display = p.get('delta', 'N/A')
-
-                        st.metric(label=display_name, value=f"{val_v:,.2f}", delta=delta_display)
+            st.fragment(run_every=live_every)(render_live_pulse)(market_open)
             st.markdown("---")
         except Exception as pulse_err:
             st.warning(f"Market Pulse Latency: {pulse_err}")
 
         if os.path.exists(db_path):
             try:
-                with sqlite3.connect(db_path) as conn:
-                    latest_date_query = "SELECT MAX(Date) as max_date FROM processed_watchlist"
-                    df_date = pd.read_sql(latest_date_query, conn)
-                    latest_date = df_date['max_date'].iloc[0] if not df_date.empty and not pd.isna(df_date['max_date'].iloc[0]) else None
+                # Served from the snapshot cache: no DB reads between research cycles
+                latest_date, latest_ts, df = snapshots.latest_snapshot("processed_watchlist")
+                
+                if latest_date:
+                    latest_ts = latest_ts if latest_ts else "N/A"
+                    st.markdown(f"**Terminal Sync: {latest_ts}**")
+                    df = df.copy()
                     
-                    if latest_date:
-                        ts_query = f"SELECT MAX(Timestamp) as max_ts FROM processed_watchlist WHERE Date = '{latest_date}'"
-                        try:
-                            df_ts = pd.read_sql(ts_query, conn)
-                            latest_ts = df_ts['max_ts'].iloc[0] if not df_ts.empty and not pd.isna(df_ts['max_ts'].iloc[0]) else "N/A"
-                        except:
-                            latest_ts = "N/A"
-                            
-                        st.markdown(f"**Terminal Sync: {latest_ts}**")
-                        
-                        query = f"SELECT * FROM processed_watchlist WHERE Date = '{latest_date}'"
-                        df = pd.read_sql(query, conn)
+                    col1, col2 = st.columns([3, 1])
+                    with col1:
+                        if not df.empty:
+                            top_ticker = df.iloc[0]['Ticker']
+                            top_review = df.iloc[0]['Agent_Review']
+                            st.success(f"**Top Momentum Pick: {top_ticker}**")
+                            st.markdown(f"> {top_review}")
+                        else:
+                            st.info("No momentum picks identified for the current session.")
+                    with col2:
+                        st.metric("P-OL Tickers", len(df))
                         
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            if not df.empty:
-                                top_ticker = df.iloc[0]['Ticker']
-                                top_review = df.iloc[0]['Agent_Review']
-                                st.success(f"**Top Momentum Pick: {top_ticker}**")
-                                st.markdown(f"> {top_review}")
-                            else:
-                                st.info("No momentum picks identified for the current session.")
-                        with col2:
-                            st.metric("P-OL Tickers", len(df))
-                            
-                        st.write(f"### 📈 Watchlist Telemetry ({latest_date})")
-                        # Ticker Aliasing for Dataframe Display (Robust Mapping)
-                        if not df.empty and 'Ticker' in df.columns:
-                            mapping = {"^NSEI": "Nifty 50", "^NSEBANK": "Bank Nifty", "^BSESN": "Sensex", "^CNXIT": "IT Sector"}
-                            df['Ticker'] = df['Ticker'].map(mapping).fillna(df['Ticker'])
-                        st.dataframe(df, use_container_width=True)
-                    else:
-                        st.info("Database initialized but empty. Please trigger manual refresh if today's data is missing.")
+                    st.write(f"### 📈 Watchlist Telemetry ({latest_date})")
+                    # Ticker Aliasing for Dataframe Display (Robust Mapping)
+                    if not df.empty and 'Ticker' in df.columns:
+                        mapping = {"^NSEI": "Nifty 50", "^NSEBANK": "Bank Nifty", "^BSESN": "Sensex", "^CNXIT": "IT Sector"}
+                        df['Ticker'] = df['Ticker'].map(mapping).fillna(df['Ticker'])
+                    st.dataframe(df, use_container_width=True)
+                else:
+                    st.info("Database initialized but empty. Please trigger manual refresh if today's data is missing.")
             except Exception as e:
                 st.error(f"Database Read Error: {e}")
         else:
@@ -185,7 +254,7 @@ def main():
         st.write("---")
         if st.button("🚀 MANUAL REFRESH (TRIGGER RESEARCH CYCLE)"):
             with st.spinner("Reprocessing Markets..."):
-                run_research_cycle()
+                run_research_cycle(force=True)
                 st.rerun()
 
         
@@ -193,22 +262,72 @@ def main():
         st.subheader("📊 Systematic Derivatives & ATM Strategy")
         if os.path.exists(db_path):
             try:
-                with sqlite3.connect(db_path) as conn:
-                    deriv_date_query = "SELECT MAX(Date) as max_date FROM derivatives"
-                    df_d_date = pd.read_sql(deriv_date_query, conn)
-                    latest_d_date = df_d_date['max_date'].iloc[0] if not df_d_date.empty and not pd.isna(df_d_date['max_date'].iloc[0]) else None
-                    if latest_d_date:
-                        deriv_query = f"SELECT * FROM derivatives WHERE Date = '{latest_d_date}'"
-                        opt_df = pd.read_sql(deriv_query, conn)
-                        if not opt_df.empty and 'Ticker' in opt_df.columns:
-                            mapping = {"^NSEI": "Nifty 50", "^NSEBANK": "Bank Nifty", "^BSESN": "Sensex", "^CNXIT": "IT Sector"}
-                            opt_df['Ticker'] = opt_df['Ticker'].str.upper().map(mapping).fillna(opt_df['Ticker'])
-                        st.dataframe(opt_df, use_container_width=True)
-                    else:
-                        st.info("Derivatives analytics pending research cycle.")
+                latest_d_date, _, opt_df = snapshots.latest_snapshot("derivatives")
+                if latest_d_date:
+                    opt_df = opt_df.copy()
+                    if not opt_df.empty and 'Ticker' in opt_df.columns:
+                        mapping = {"^NSEI": "Nifty 50", "^NSEBANK": "Bank Nifty", "^BSESN": "Sensex", "^CNXIT": "IT Sector"}
+                        opt_df['Ticker'] = opt_df['Ticker'].str.upper().map(mapping).fillna(opt_df['Ticker'])
+                    st.dataframe(opt_df, use_container_width=True)
+                else:
+                    st.info("Derivatives analytics pending research cycle.")
             except Exception as e:
                 st.error(f"Error loading Derivatives: {e}")
 
+        st.divider()
+        with st.expander("⏱️ CYCLE TELEMETRY (Stage & Upstream Timing)"):
+            try:
+                recent = snapshots.query("SELECT DISTINCT Cycle_Id FROM cycle_metrics ORDER BY Cycle_Id DESC LIMIT 20")
+                if recent.empty:
+                    st.info("Telemetry pending first instrumented research cycle.")
+                else:
+                    stages = snapshots.query(
+                        "SELECT Cycle_Id, Name, Total_Ms FROM cycle_metrics WHERE Kind = 'stage' AND Name != 'cycle' AND Cycle_Id >= ?",
+                        (recent['Cycle_Id'].min(),)
+                    )
+                    if not stages.empty:
+                        breakdown = stages.pivot_table(index='Cycle_Id', columns='Name', values='Total_Ms', aggfunc='sum') / 1000
+                        st.bar_chart(breakdown)
+                        st.caption("Seconds per stage, last 20 cycles")
+                    cycle_id = st.selectbox("Cycle", recent['Cycle_Id'])
+                    detail = snapshots.query(
+                        "SELECT Kind, Name, Calls, Total_Ms, Max_Ms, Failures FROM cycle_metrics WHERE Cycle_Id = ? ORDER BY Kind, Total_Ms DESC",
+                        (cycle_id,)
+                    )
+                    st.dataframe(detail, use_container_width=True, hide_index=True)
+            except Exception:
+                st.info("Telemetry pending first instrumented research cycle.")
+
+        with st.expander("🔔 PRICE ALERTS (SL / Target Crossings)"):
+            st.fragment(run_every=live_every)(render_live_alerts)(db_path)
+
+        with st.expander("⚡ LIVE TICKS (Refresh Scheduler Feed)"):
+            st.fragment(run_every=live_every)(render_live_ticks)()
+
+        with st.expander("🧮 SAVED SCREENS (Run Every Research Cycle)"):
+            try:
+                store = ScreenStore(db_path)
+                with st.form("screen_form", clear_on_submit=True):
+                    sc1, sc2 = st.columns([1, 3])
+                    screen_name = sc1.text_input("Name")
+                    screen_expr = sc2.text_input("Expression", placeholder="rsi14 < 40 and close > ema200 and vol > 2*avg_vol20")
+                    if st.form_submit_button("Save Screen") and screen_name and screen_expr:
+                        try:
+                            store.save(screen_name.strip(), screen_expr)
+                            st.success(f"Saved '{screen_name}'. Matches appear after the next research cycle.")
+                        except ScreenError as e:
+                            st.error(str(e))
+                st.caption("Columns: " + ", ".join(sorted(INDICATOR_COLUMNS)))
+                saved = store.list()
+                if not saved.empty:
+                    st.dataframe(saved[['Name', 'Expression']], use_container_width=True, hide_index=True)
+                    matches = store.latest_results()
+                    if not matches.empty:
+                        st.dataframe(matches.groupby('Screen')['Ticker'].apply(", ".join).reset_index(name='Matches'),
+                                     use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.info(f"Screens unavailable: {e}")
+
         st.divider()
         st.subheader("📚 Mutual Fund Insights")
         mf_data = get_mf_returns_table()
@@ -303,5 +422,47 @@ def main():
                         st.code(st.session_state.post2, language="markdown")
                     st.caption("Optimized for Education Pivot")
 
+    with tabs[2]:
+        st.header("💼 Portfolio Manager")
+        portfolio = get_portfolio_manager()
+
+        with st.form("portfolio_tx", clear_on_submit=True):
+            f1, f2, f3, f4, f5 = st.columns(5)
+            tx_ticker = f1.text_input("Ticker", placeholder="RELIANCE.NS")
+            tx_side = f2.selectbox("Side", ["BUY", "SELL"])
+            tx_qty = f3.number_input("Quantity", min_value=0.0, step=1.0)
+            tx_price = f4.number_input("Price", min_value=0.0, step=0.05)
+            tx_fees = f5.number_input("Fees", min_value=0.0, step=1.0)
+            if st.form_submit_button("➕ RECORD TRANSACTION"):
+                try:
+                    ticker = tx_ticker.strip().upper()
+                    if ticker and "." not in ticker and not ticker.startswith("^"):
+                        ticker += ".NS"
+                    portfolio.record_transaction(ticker, tx_side, tx_qty, tx_price, tx_fees)
+                    st.success(f"{tx_side} {tx_qty:g} {ticker} @ {tx_price:,.2f} recorded.")
+                except Exception as e:
+                    st.error(f"Transaction rejected: {e}")
+
+        try:
+            valuation = portfolio.valuation()
+            # Realized P&L of closed positions counts even when nothing is open
+            summary = valuation.summary()
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Market Value", f"₹{summary['market_value']:,.2f}")
+            m2.metric("Unrealized P&L", f"₹{summary['unrealized_pnl']:,.2f}", f"{summary['unrealized_pct']}%")
+            m3.metric("Realized P&L", f"₹{summary['realized_pnl']:,.2f}")
+            m4.metric("Risk to ATR Stops", f"₹{summary['atr_risk']:,.2f}", f"{summary['atr_risk_pct']}% of value", delta_color="off")
+            if not valuation.tickers:
+                st.info("No open positions. Record a BUY to start tracking.")
+            else:
+                st.dataframe(valuation.frame(), use_container_width=True, hide_index=True)
+                st.write("### 🧭 Sector Exposure")
+                st.bar_chart(pd.Series(summary['sector_exposure'], name="Market Value"))
+        except Exception as e:
+            st.error(f"Valuation Error: {e}")
+
+        with st.expander("🧾 TRANSACTION LEDGER"):
+            st.dataframe(portfolio.transactions(), use_container_width=True, hide_index=True)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
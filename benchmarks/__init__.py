@@ -0,0 +1 @@
+# Brotherhood Benchmark Suite
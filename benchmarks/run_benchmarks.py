@@ -0,0 +1,278 @@
+"""
+Benchmark suite for the research-cycle hot paths.
+
+    python -m benchmarks.run_benchmarks                      # run, compare to baseline
+    python -m benchmarks.run_benchmarks --scales 50 100      # subset of scales
+    python -m benchmarks.run_benchmarks --update-baseline    # store current numbers
+    BROTHERHOOD_DATA_MODE=replay python -m benchmarks.run_benchmarks --data replay
+
+Exits non-zero when any benchmark's fastest run is slower than the baseline's
+by more than --threshold (default 25%). A fixed calibration workload is timed
+around every benchmark, and baseline times are scaled by the ratio of the two
+runs' median calibration, so a slower or busier machine does not read as a
+regression.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import warnings
+import numpy as np
+import pandas as pd
+warnings.filterwarnings("ignore")
+sys.path.append(os.getcwd())
+
+from stock_hub import market_data as md
+from stock_hub.config import QuantConfig
+from stock_hub.quant_tools import QuantTools
+from stock_hub.record_batch import RecordBatch, WATCHLIST_SCHEMA
+from benchmarks.synthetic import SyntheticProvider, synthetic_symbols, synthetic_ohlcv
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SCALES = [50, 100, 500, 2000]
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+        "runs": repeat
+    }
+
+def calibrate(repeat=5):
+    """
+    Fastest ms of a fixed pandas / numpy / pure-Python workload that no repo
+    change can affect: the yardstick for this machine at this moment (the
+    minimum, since a burst of load only ever adds time).
+    """
+    rng = np.random.default_rng(7)
+    frames = [pd.Series(rng.normal(0, 1, 500).cumsum() + 100) for _ in range(50)]
+    def run():
+        for s in frames:
+            s.ewm(span=200, adjust=False).mean()
+            s.rolling(14).mean()
+            s.diff().clip(lower=0).sum()
+        sum(i * i for i in range(100_000))
+    run()
+    return timed(run, repeat)["min_ms"]
+
+def bench_indicators(symbols):
+    qt = QuantTools()
+    frames = [synthetic_ohlcv(s) for s in symbols]
+    def run():
+        for df in frames:
+            qt.calculate_ema(df, 200)
+            qt.calculate_rsi(df)
+            qt.calculate_macd(df)
+            qt.calculate_atr(df)
+            qt.calculate_pivots(df)
+            qt.get_fibonacci_target(df)
+    return run
+
+def bench_scan(symbols):
+    from stock_hub.indicator_engine import scan_advanced_signals
+    frames = {s: synthetic_ohlcv(s, 5) for s in symbols}
+    return lambda: scan_advanced_signals(symbols, frames=frames)
+
+def _enrich_executor_run(symbols, workers, prefetched):
+    """EnrichExecutor.run over every symbol as the cycle's enrich node calls it (news stubbed)."""
+    from stock_hub.stock_engine import _watchlist_row
+    from stock_hub.enrich_executor import EnrichExecutor
+    config = QuantConfig.load()
+    qt = QuantTools()
+    # Enrich every symbol (not just O-L hits) so the scale is the symbol count
+    signals = [{"Symbol": s, "Trend": "Bullish (Open=Low)"} for s in symbols]
+    if prefetched:
+        histories = {s: synthetic_ohlcv(s) for s in symbols}
+        history = histories.__getitem__
+    else:
+        history = lambda sym: md.Ticker(sym).history(period="250d")
+    executor = EnrichExecutor(processes=workers, min_process_symbols=0)
+    build = lambda s, indicators: _watchlist_row(s, config, qt, indicators, lambda sym: "News Neutral")
+    return lambda: executor.run(signals, history, config['FIB_RATIO'], build)
+
+def bench_enrich(symbols):
+    """Full enrich path in this process: history fetch through the provider, indicators, row building."""
+    return _enrich_executor_run(symbols, 1, prefetched=False)
+
+def bench_enrich_pool(workers):
+    """
+    EnrichExecutor compute path with `workers` processes over pre-fetched
+    histories, so the numbers show how the indicator math scales with cores.
+    """
+    return lambda symbols: _enrich_executor_run(symbols, workers, prefetched=True)
+
+# 1, 2, 4, ... up to every core on this machine; 2 always, so the process pool itself is measured
+ENRICH_POOL_WORKERS = sorted({1, 2, os.cpu_count() or 1} | {2 ** k for k in range(1, 6) if 2 ** k < (os.cpu_count() or 1)})
+
+def _watchlist_batch(symbols):
+    b = RecordBatch(WATCHLIST_SCHEMA)
+    for i, s in enumerate(symbols):
+        b.append((s, 100.0 + i, "Bullish", "YES", 95.0, 55.0, 1.2, 90.0, 120.0, "Quant signals intact.", "BUY", 5.0))
+    return b
+
+def bench_db_writes(symbols, tmp):
+    from stock_hub.stock_engine import DatabaseManager
+    db = DatabaseManager(os.path.join(tmp, "bench_writes.db"))
+    batch = _watchlist_batch(symbols)
+    return lambda: db.save_processed_watchlist(batch)
+
+def _seeded_db(symbols, tmp):
+    from stock_hub.stock_engine import DatabaseManager
+    path = os.path.join(tmp, f"bench_reads_{len(symbols)}.db")
+    db = DatabaseManager(path)
+    db.save_processed_watchlist(_watchlist_batch(symbols))
+    db.bump_snapshot()
+    return path
+
+def bench_dashboard_cold(symbols, tmp):
+    from stock_hub.query_cache import SnapshotCache
+    path = _seeded_db(symbols, tmp)
+    return lambda: SnapshotCache(path).latest_snapshot("processed_watchlist")
+
+def bench_dashboard_warm(symbols, tmp):
+    from stock_hub.query_cache import SnapshotCache
+    cache = SnapshotCache(_seeded_db(symbols, tmp))
+    cache.latest_snapshot("processed_watchlist")
+    return lambda: cache.latest_snapshot("processed_watchlist")
+
+def bench_db_context(symbols, tmp):
+    from stock_hub.logic_handler import get_db_context
+    path = _seeded_db(symbols, tmp)
+    return lambda: get_db_context(path)
+
+BENCHMARKS = {
+    "indicators": (bench_indicators, False),
+    "scan_advanced_signals": (bench_scan, False),
+    "enrich": (bench_enrich, False),
+    **{f"enrich_pool_{w}w": (bench_enrich_pool(w), False) for w in ENRICH_POOL_WORKERS},
+    "db_write_watchlist": (bench_db_writes, True),
+    "dashboard_query_cold": (bench_dashboard_cold, True),
+    "dashboard_query_warm": (bench_dashboard_warm, True),
+    "db_context_prompt": (bench_db_context, True),
+}
+
+def run_suite(scales, repeat, only=None, data="synthetic"):
+    if data == "synthetic":
+        md.set_provider(SyntheticProvider())
+    results = []
+    tmp = tempfile.mkdtemp(prefix="brotherhood_bench_")
+    try:
+        for name, (factory, needs_tmp) in BENCHMARKS.items():
+            if only and name not in only: continue
+            for n in scales:
+                symbols = synthetic_symbols(n)
+                fn = factory(symbols, tmp) if needs_tmp else factory(symbols)
+                fn() # warm-up
+                before = calibrate()
+                stats = timed(fn, repeat)
+                # Timed around every entry so the run's median calibration spans its whole duration
+                calibration_ms = round((before + calibrate()) / 2, 3)
+                results.append({"benchmark": name, "scale": n, **stats, "calibration_ms": calibration_ms})
+                print(f"[BENCH] {name:<24} n={n:<5} median={stats['median_ms']:>10.2f} ms  p95={stats['p95_ms']:>10.2f} ms  calib={calibration_ms:>7.2f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+def scaling_summary(results):
+    """Speedup of each enrich_pool_<N>w run over the 1-worker run at the same scale."""
+    single = {r["scale"]: r["median_ms"] for r in results if r["benchmark"] == "enrich_pool_1w"}
+    for n, base in sorted(single.items()):
+        runs = sorted((int(r["benchmark"][len("enrich_pool_"):-1]), r["median_ms"]) for r in results
+                      if r["benchmark"].startswith("enrich_pool_") and r["scale"] == n)
+        print(f"[BENCH] enrich scaling n={n}: " + " | ".join(f"{w}w {base / ms:.2f}x" for w, ms in runs if ms))
+
+def machine_factor(results, baseline_results):
+    """This run's speed relative to the baseline's: ratio of their median calibrations."""
+    ours = [r["calibration_ms"] for r in results if r.get("calibration_ms")]
+    theirs = [r["calibration_ms"] for r in baseline_results if r.get("calibration_ms")]
+    if not ours or not theirs:
+        return 1.0
+    return round(statistics.median(ours) / statistics.median(theirs), 3)
+
+def compare(results, baseline, threshold, min_delta_ms=1.0):
+    """
+    Regressions against the baseline, judged on min_ms: load bursts only ever
+    add time, so the fastest run is what reproduces across runs. Baseline
+    times are scaled by machine_factor() (1.0 for baselines without
+    calibrations). Process-pool runs are only compared on the same core count.
+    """
+    base = {(r["benchmark"], r["scale"]): r for r in baseline.get("results", [])}
+    scale = machine_factor(results, baseline.get("results", []))
+    same_cpus = baseline.get("cpus") == os.cpu_count()
+    regressions = []
+    for r in results:
+        ref = base.get((r["benchmark"], r["scale"]))
+        if not ref: continue
+        if r["benchmark"].startswith("enrich_pool_") and not same_cpus: continue
+        r["machine_factor"] = scale
+        expected = ref["min_ms"] * scale
+        ratio = r["min_ms"] / expected if expected else 1.0
+        r["baseline_min_ms"] = ref["min_ms"]
+        r["expected_ms"] = round(expected, 3)
+        r["ratio"] = round(ratio, 3)
+        # Sub-millisecond paths are timer noise; require a real absolute slowdown too
+        if ratio > 1 + threshold and r["min_ms"] - expected > min_delta_ms:
+            regressions.append(r)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Brotherhood hot-path benchmarks")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--data", choices=["synthetic", "replay"], default="synthetic")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scales, args.repeat, args.only, args.data)
+    scaling_summary(results)
+    report = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "data": args.data,
+        "results": results
+    }
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Baseline written: {args.baseline}")
+        return 0
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"[BENCH] Machine factor vs baseline: x{machine_factor(results, baseline.get('results', []))}")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    report["regressions"] = regressions
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Results written: {args.out}")
+
+    for r in regressions:
+        print(f"[REGRESSION] {r['benchmark']} n={r['scale']}: min {r['min_ms']} ms vs expected {r['expected_ms']} ms "
+              f"(baseline {r['baseline_min_ms']} ms x machine {r['machine_factor']}, x{r['ratio']})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
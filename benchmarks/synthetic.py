@@ -0,0 +1,49 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+# Deterministic random-walk OHLCV so every run sees identical data.
+
+def synthetic_symbols(n):
+    return [f"SYN{i:04d}.NS" for i in range(n)]
+
+def synthetic_ohlcv(symbol, rows=250, interval="1d", end="2026-04-24"):
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    if interval == "1m":
+        idx = pd.date_range(end=f"{end} 15:29", periods=rows, freq="1min", tz="Asia/Kolkata")
+    else:
+        idx = pd.bdate_range(end=end, periods=rows)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, rows)))
+    opens = close * (1 + rng.normal(0, 0.003, rows))
+    # Make roughly 1 in 8 symbols an Open=Low/High candidate on the last bar
+    high = np.maximum(opens, close) * (1 + np.abs(rng.normal(0, 0.004, rows)))
+    low = np.minimum(opens, close) * (1 - np.abs(rng.normal(0, 0.004, rows)))
+    if rng.random() < 0.125:
+        low[-1] = opens[-1]
+    return pd.DataFrame({
+        "Open": opens, "High": high, "Low": low, "Close": close,
+        "Volume": rng.integers(1e5, 5e6, rows).astype(float)
+    }, index=idx)
+
+_PERIOD_ROWS = {"1d": 1, "5d": 5, "60d": 60, "250d": 250, "1y": 250, "max": 2500}
+
+class SyntheticProvider:
+    """market_data provider that fabricates responses instead of calling yfinance."""
+    def call(self, method, symbol=None, **kwargs):
+        if method == "download":
+            syms = kwargs["tickers"].split()
+            interval = kwargs.get("interval", "1d")
+            rows = _PERIOD_ROWS.get(kwargs.get("period", "5d"), 5) * (375 if interval == "1m" else 1)
+            frames = {s: synthetic_ohlcv(s, rows, interval) for s in syms}
+            if kwargs.get("group_by") == "ticker":
+                return pd.concat(frames, axis=1, names=["Ticker", "Price"])
+            return pd.concat(frames, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+        if method == "history":
+            return synthetic_ohlcv(symbol, _PERIOD_ROWS.get(kwargs.get("period", "5d"), 250))
+        if method == "news":
+            return [{"title": f"{symbol} steady ahead of results"}]
+        if method == "options":
+            return ()
+        if method == "info":
+            return {}
+        raise ValueError(f"SyntheticProvider: unsupported {method}")
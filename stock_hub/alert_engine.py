@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right, insort
+from stock_hub.config import DB_PATH, QuantConfig
+from stock_hub.universe import to_yahoo_symbol
+from stock_hub.market_calendar import ist_now
+from stock_hub.metrics import count
+from stock_hub.change_feed import publish
+
+# Price-level alerts on the live feed. Per symbol, armed levels sit in two
+# sorted lists ("above": Target-style, fire when price >= level; "below":
+# SL-style, fire when price <= level), so each update is a bisect plus the
+# levels actually crossed. A fired level is disarmed until price retreats
+# HYSTERESIS_PCT past it, which stops ticks hovering on the line re-firing.
+HYSTERESIS_PCT = 0.2
+
+class _SymbolLevels:
+    __slots__ = ("above", "below", "rearm_above", "rearm_below", "last")
+
+    def __init__(self):
+        self.above = [] # armed (level, id), fire on price >= level
+        self.below = [] # armed (level, id), fire on price <= level
+        self.rearm_above = [] # fired above-levels: (rearm_price, level, id)
+        self.rearm_below = [] # fired below-levels: (rearm_price, level, id)
+        self.last = None
+
+class AlertEngine:
+    def __init__(self, db_path=None, hysteresis_pct=HYSTERESIS_PCT):
+        self.db_path = db_path if db_path else DB_PATH
+        self.hysteresis = hysteresis_pct / 100
+        self.symbols = {}
+        self.ids = {} # level key -> int id
+        self.meta = {} # int id -> (symbol, kind, level, direction)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_levels (
+                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Ticker TEXT,
+                    Level REAL,
+                    Direction TEXT CHECK (Direction IN ('above', 'below')),
+                    Label TEXT,
+                    Active INTEGER DEFAULT 1
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_events (
+                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Timestamp TEXT,
+                    Ticker TEXT,
+                    Kind TEXT,
+                    Level REAL,
+                    Direction TEXT,
+                    Price REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alert_events_ts ON alert_events (Timestamp)")
+
+    def add_level(self, symbol, level, direction, kind="CUSTOM", key=None):
+        level = float(level)
+        key = key if key else (kind, symbol, level, direction)
+        with self._lock:
+            if key in self.ids:
+                return self.ids[key]
+            self._next_id += 1
+            level_id = self.ids[key] = self._next_id
+            self.meta[level_id] = (symbol, kind, level, direction)
+            book = self.symbols.setdefault(symbol, _SymbolLevels())
+            # A level added beyond the current price has not been crossed: start it disarmed
+            if direction == "above":
+                if book.last is not None and book.last >= level:
+                    insort(book.rearm_above, (level * (1 - self.hysteresis), level, level_id))
+                else:
+                    insort(book.above, (level, level_id))
+            else:
+                if book.last is not None and book.last <= level:
+                    insort(book.rearm_below, (level * (1 + self.hysteresis), level, level_id))
+                else:
+                    insort(book.below, (level, level_id))
+        return level_id
+
+    def load_levels(self, config=None):
+        """Active SL/Target rows of the latest processed_watchlist plus user alert_levels."""
+        config = config if config else QuantConfig.load()
+        mapping = config.get('INDEX_MAPPING', {})
+        with sqlite3.connect(self.db_path) as conn:
+            try:
+                rows = conn.execute("""
+                    SELECT Ticker, SL, Target FROM processed_watchlist
+                    WHERE Date = (SELECT MAX(Date) FROM processed_watchlist)
+                """).fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+            custom = conn.execute("SELECT Id, Ticker, Level, Direction, Label FROM alert_levels WHERE Active = 1").fetchall()
+
+        wanted = {}
+        for ticker, sl, target in rows:
+            symbol = to_yahoo_symbol(ticker, mapping)
+            if sl: wanted[("SL", symbol, float(sl), "below")] = (symbol, float(sl), "below", "SL")
+            if target: wanted[("TARGET", symbol, float(target), "above")] = (symbol, float(target), "above", "TARGET")
+        for level_id, ticker, level, direction, label in custom:
+            wanted[("CUSTOM", level_id)] = (to_yahoo_symbol(ticker, mapping), float(level), direction, label or "CUSTOM")
+
+        # Levels that disappeared (new cycle, deactivated) are dropped; the rest keep their armed state
+        with self._lock:
+            for key in [k for k in self.ids if k not in wanted]:
+                self._remove(key)
+        for key, (symbol, level, direction, kind) in wanted.items():
+            self.add_level(symbol, level, direction, kind, key)
+        return len(self.meta)
+
+    def _remove(self, key):
+        level_id = self.ids.pop(key)
+        symbol, _, _, _ = self.meta.pop(level_id)
+        book = self.symbols[symbol]
+        for lst in (book.above, book.below, book.rearm_above, book.rearm_below):
+            for i, entry in enumerate(lst):
+                if entry[-1] == level_id:
+                    del lst[i]
+                    break
+
+    def update(self, symbol, price, high=None, low=None):
+        """
+        Feeds one price (optionally a bar's high/low) and returns fired events
+        as (symbol, kind, level, direction, price). The first price seen for a
+        symbol only arms/disarms levels; a level already beyond it is not a crossing.
+        """
+        book = self.symbols.get(symbol)
+        if book is None or price is None:
+            return []
+        high = high if high is not None else price
+        low = low if low is not None else price
+        fired = []
+        with self._lock:
+            # Re-arm levels price has retreated from
+            i = bisect_left(book.rearm_above, (price,))
+            if i < len(book.rearm_above):
+                for _, level, level_id in book.rearm_above[i:]:
+                    insort(book.above, (level, level_id))
+                del book.rearm_above[i:]
+            j = bisect_right(book.rearm_below, (price, float("inf"), 0))
+            if j:
+                for _, level, level_id in book.rearm_below[:j]:
+                    insort(book.below, (level, level_id))
+                del book.rearm_below[:j]
+
+            # Fire armed levels the price reached
+            k = bisect_right(book.above, (high, float("inf")))
+            if k:
+                crossed, book.above[:k] = book.above[:k], []
+                for level, level_id in crossed:
+                    insort(book.rearm_above, (level * (1 - self.hysteresis), level, level_id))
+                    if book.last is not None: fired.append((symbol, self.meta[level_id][1], level, "above", price))
+            m = bisect_left(book.below, (low,))
+            if m < len(book.below):
+                crossed, book.below[m:] = book.below[m:], []
+                for level, level_id in crossed:
+                    insort(book.rearm_below, (level * (1 + self.hysteresis), level, level_id))
+                    if book.last is not None: fired.append((symbol, self.meta[level_id][1], level, "below", price))
+            book.last = price
+        return fired
+
+    def on_prices(self, prices, bars=None):
+        """prices: {symbol: price}; bars: optional {symbol: (high, low)}. Persists fired events."""
+        bars = bars or {}
+        events = []
+        for symbol, price in prices.items():
+            hl = bars.get(symbol, (None, None))
+            events.extend(self.update(symbol, price, hl[0], hl[1]))
+        if events:
+            self._save_events(events)
+        return events
+
+    def _save_events(self, events):
+        ts = ist_now().strftime("%Y-%m-%d %H:%M:%S")
+        for symbol, kind, level, direction, price in events:
+            print(f"[ALERT] {symbol} {kind} {'>=' if direction == 'above' else '<='} {level} @ {round(price, 2)}")
+        count("alerts.fired", len(events))
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany("""
+                    INSERT INTO alert_events (Timestamp, Ticker, Kind, Level, Direction, Price)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(ts,) + e for e in events])
+        except Exception as e:
+            print(f"[ALERT] Event write failed: {e}")
+        publish("alert", [{"Timestamp": ts, "Ticker": s, "Kind": k, "Direction": d, "Level": l, "Price": round(p, 2)}
+                          for s, k, l, d, p in events])
+
+def check_minute_bars(frames):
+    """Runs the latest 1m bar of each {symbol: bars} frame through the shared engine."""
+    prices, bars = {}, {}
+    for symbol, df in frames.items():
+        if df is None or df.empty: continue
+        last = df.iloc[-1]
+        prices[symbol] = float(last["Close"])
+        bars[symbol] = (float(last["High"]), float(last["Low"]))
+    return get_alert_engine().on_prices(prices, bars)
+
+_engine = None
+_engine_version = None
+
+def get_alert_engine():
+    """Shared engine; levels reload whenever a research cycle publishes a new snapshot."""
+    global _engine, _engine_version
+    from stock_hub.query_cache import get_snapshot_cache
+    if _engine is None:
+        _engine = AlertEngine()
+    version = get_snapshot_cache().version()
+    if version != _engine_version:
+        _engine.load_levels()
+        _engine_version = version
+    return _engine
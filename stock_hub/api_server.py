@@ -0,0 +1,252 @@
+import io
+import gzip
+import json
+import sqlite3
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import pandas as pd
+from stock_hub.config import DB_PATH
+from stock_hub.query_cache import SnapshotCache, SNAPSHOT_TABLES
+
+# Read-only HTTP/JSON view of the latest research snapshot for bots and
+# spreadsheets. Every response carries an ETag built from the snapshot
+# version (the pulse uses its own write time), so polling clients get a 304
+# until a cycle publishes; rendered bodies are cached per version.
+#
+#   GET /v1/meta
+#   GET /v1/snapshot/<processed_watchlist|derivatives|raw_signals>
+#   GET /v1/pulse
+#   GET /v1/history/<table>?ticker=&from=YYYY-MM-DD&to=YYYY-MM-DD&limit=&offset=
+#
+# ?format=arrow (or Accept: application/vnd.apache.arrow.stream) returns an
+# Arrow IPC stream when pyarrow is installed.
+
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+GZIP_MIN_BYTES = 1024
+BODY_CACHE_SIZE = 256
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _records(df):
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def _to_arrow(df):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ApiError(406, "Arrow output needs pyarrow installed")
+    sink = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+class SnapshotAPI:
+    """Transport-free core: handle() maps a GET to (status, headers, body)."""
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else DB_PATH
+        self.snapshots = SnapshotCache(self.db_path)
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+        self._meta = (None, None)
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def _snapshot_state(self):
+        """(version, last_modified UTC) of the published snapshot."""
+        version = self.snapshots.version()
+        if isinstance(version, tuple):
+            # Writer without snapshot_meta: the cache versions by file stat token
+            version = "file-" + hashlib.sha1(repr(version).encode()).hexdigest()[:12]
+        if self._meta[0] != version:
+            updated = None
+            try:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT updated_at FROM snapshot_meta WHERE id = 1").fetchone()
+                updated = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") if row else None
+            except (sqlite3.Error, ValueError, TypeError):
+                pass
+            self._meta = (version, updated)
+        return self._meta
+
+    def _pulse_state(self):
+        try:
+            with self._connect() as conn:
+                ts = conn.execute("SELECT MAX(Timestamp) FROM market_pulse").fetchone()[0]
+        except sqlite3.Error:
+            ts = None
+        # Pulse timestamps are IST
+        return ts, (datetime.strptime(ts, "%Y-%m-%d %H:%M:%S") - timedelta(hours=5, minutes=30)) if ts else None
+
+    # --- routes: each returns (payload dict, DataFrame for arrow) ---
+    def _meta_route(self, version, params):
+        _, updated = self._snapshot_state()
+        return {"version": version, "updated_at": updated.isoformat() + "Z" if updated else None,
+                "tables": list(SNAPSHOT_TABLES)}, None
+
+    def _snapshot_route(self, table, version, params):
+        date, ts, df = self.snapshots.latest_snapshot(table)
+        return {"table": table, "version": version, "date": date, "timestamp": ts,
+                "count": len(df), "rows": _records(df)}, df
+
+    def _pulse_route(self, version, params):
+        if version is None:
+            return {"timestamp": None, "count": 0, "rows": []}, pd.DataFrame()
+        with self._connect() as conn:
+            df = pd.read_sql("SELECT Ticker, Name, Value, Delta_Val, Delta_Pct, Timestamp FROM market_pulse ORDER BY Ticker", conn)
+        return {"timestamp": version, "count": len(df), "rows": _records(df)}, df
+
+    def _history_route(self, table, version, params):
+        try:
+            limit, offset = int(params.get("limit", DEFAULT_LIMIT)), int(params.get("offset", 0))
+        except ValueError:
+            raise ApiError(400, "limit and offset must be integers")
+        if limit < 0 or offset < 0:
+            raise ApiError(400, "limit and offset must not be negative")
+        # limit=0 would page forever with next_offset == offset
+        limit = min(max(limit, 1), MAX_LIMIT)
+        where, args = [], []
+        if params.get("ticker"):
+            where.append("Ticker = ?")
+            args.append(params["ticker"])
+        for key, op in (("from", ">="), ("to", "<=")):
+            if params.get(key):
+                try:
+                    datetime.strptime(params[key], "%Y-%m-%d")
+                except ValueError:
+                    raise ApiError(400, f"{key} must be YYYY-MM-DD")
+                where.append(f"Date {op} ?")
+                args.append(params[key])
+        sql = f"SELECT * FROM {table}" + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY Date DESC, Ticker LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            df = pd.read_sql(sql, conn, params=args + [limit + 1, offset])
+        more = len(df) > limit
+        df = df.iloc[:limit]
+        return {"table": table, "version": version, "offset": offset, "limit": limit, "count": len(df),
+                "next_offset": offset + limit if more else None, "rows": _records(df)}, df
+
+    def _route(self, path):
+        parts = [p for p in path.split("/") if p]
+        if len(parts) < 2 or parts[0] != "v1":
+            raise ApiError(404, "Not found")
+        name, arg = parts[1], parts[2] if len(parts) > 2 else None
+        if name in ("snapshot", "history"):
+            if arg not in SNAPSHOT_TABLES or len(parts) != 3:
+                raise ApiError(404, f"Unknown table. Available: {', '.join(SNAPSHOT_TABLES)}")
+            route = self._snapshot_route if name == "snapshot" else self._history_route
+            return (lambda v, p: route(arg, v, p)), self._snapshot_state
+        if len(parts) == 2 and name == "meta":
+            return self._meta_route, self._snapshot_state
+        if len(parts) == 2 and name == "pulse":
+            return self._pulse_route, self._pulse_state
+        raise ApiError(404, "Not found")
+
+    def handle(self, target, headers):
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            route, state = self._route(url.path)
+            fmt = "arrow" if params.pop("format", "") == "arrow" or ARROW_TYPE in headers.get("Accept", "") else "json"
+            version, modified = state()
+            key = f"{url.path}?{sorted(params.items())}|{fmt}"
+            etag = f'"{hashlib.sha1(f"{version}|{key}".encode()).hexdigest()[:20]}"'
+            base = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+            if modified:
+                base["Last-Modified"] = format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+            # Conditional GET: If-None-Match wins over If-Modified-Since
+            inm = headers.get("If-None-Match")
+            if inm:
+                if etag in [t.strip() for t in inm.split(",")] or inm.strip() == "*":
+                    return 304, base, b""
+            elif modified and headers.get("If-Modified-Since"):
+                try:
+                    since = parsedate_to_datetime(headers["If-Modified-Since"]).replace(tzinfo=None)
+                    if modified.replace(microsecond=0) <= since:
+                        return 304, base, b""
+                except (TypeError, ValueError):
+                    pass
+
+            gz = "gzip" in headers.get("Accept-Encoding", "")
+            with self._lock:
+                cached = self._bodies.get((etag, gz))
+                if cached:
+                    self._bodies.move_to_end((etag, gz))
+            if cached is None:
+                payload, df = route(version, params)
+                if fmt == "arrow":
+                    body, ctype = _to_arrow(df if df is not None else pd.DataFrame([payload])), ARROW_TYPE
+                else:
+                    body, ctype = json.dumps(payload, default=str).encode(), "application/json"
+                extra = {"Content-Type": ctype}
+                if gz and len(body) >= GZIP_MIN_BYTES:
+                    body = gzip.compress(body, compresslevel=5)
+                    extra["Content-Encoding"] = "gzip"
+                cached = (body, extra)
+                with self._lock:
+                    self._bodies[(etag, gz)] = cached
+                    if len(self._bodies) > BODY_CACHE_SIZE:
+                        self._bodies.popitem(last=False)
+            body, extra = cached
+            return 200, {**base, **extra}, body
+        except ApiError as e:
+            return e.status, {"Content-Type": "application/json"}, json.dumps({"error": str(e)}).encode()
+        except (sqlite3.Error, pd.errors.DatabaseError) as e:
+            return 503, {"Content-Type": "application/json"}, json.dumps({"error": f"Database unavailable: {e}"}).encode()
+        except Exception as e:
+            print(f"[API] {target} failed: {e}")
+            return 500, {"Content-Type": "application/json"}, json.dumps({"error": "Internal error"}).encode()
+
+class _Handler(BaseHTTPRequestHandler):
+    api = None
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, send_body):
+        status, headers, body = self.api.handle(self.path, self.headers)
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def log_message(self, fmt, *args):
+        print(f"[API] {self.address_string()} {fmt % args}")
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, db_path=None):
+    handler = type("SnapshotHandler", (_Handler,), {"api": SnapshotAPI(db_path)})
+    return ThreadingHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Brotherhood read-only snapshot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.db)
+    print(f"[API] Serving snapshot on http://{args.host}:{args.port}/v1/meta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
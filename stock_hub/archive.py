@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+from stock_hub.config import BASE_DIR, DB_PATH, BARS_DB_PATH
+from stock_hub.market_calendar import get_market_calendar
+
+# Columnar archive of completed sessions for multi-year analytics:
+#   archive/<dataset>/date=YYYY-MM-DD/part-0.parquet   (zstd)
+# Each session is written once after it closes; load() prunes partitions by
+# date, reads only the requested columns, and memory-maps the files, so
+# history queries never touch the live SQLite databases.
+ARCHIVE_DIR = os.path.join(BASE_DIR, "stock_hub", "data", "archive")
+
+# dataset -> (which DB, SQL for one session's rows, SQL for the stored session dates)
+DATASETS = {
+    "minute_bars": ("bars",
+        "SELECT Ticker, Timestamp, Open, High, Low, Close, Volume FROM minute_bars WHERE Timestamp >= ? AND Timestamp < ? ORDER BY Ticker, Timestamp",
+        "SELECT DISTINCT substr(Timestamp, 1, 10) FROM minute_bars"),
+    "processed_watchlist": ("main",
+        "SELECT * FROM processed_watchlist WHERE Date >= ? AND Date < ? ORDER BY Ticker",
+        "SELECT DISTINCT Date FROM processed_watchlist"),
+    "derivatives": ("main",
+        "SELECT * FROM derivatives WHERE Date >= ? AND Date < ? ORDER BY Ticker",
+        "SELECT DISTINCT Date FROM derivatives"),
+    "raw_signals": ("main",
+        "SELECT * FROM raw_signals WHERE Date >= ? AND Date < ? ORDER BY Ticker",
+        "SELECT DISTINCT Date FROM raw_signals"),
+}
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+# Columns stored in a richer type than their SQLite declaration
+TYPE_OVERRIDES = {("minute_bars", "Timestamp"): pa.timestamp("us")}
+
+def _next_day(date):
+    return (pd.Timestamp(date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+def _arrow_type(declared):
+    """SQLite declared type -> Arrow type, following SQLite's affinity rules."""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(k in declared for k in ("CHAR", "CLOB", "TEXT")) or not declared:
+        return pa.string()
+    return pa.float64() # REAL / FLOAT / DOUBLE / NUMERIC
+
+def _to_table(df, schema):
+    """Coerces each column to its schema type, so an all-NULL day is not inferred as Arrow null."""
+    df = df.copy()
+    for field in schema:
+        col = df[field.name]
+        if pa.types.is_string(field.type):
+            df[field.name] = col.map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+        elif pa.types.is_timestamp(field.type):
+            df[field.name] = pd.to_datetime(col)
+        elif pa.types.is_integer(field.type):
+            df[field.name] = pd.to_numeric(col, errors="coerce").astype("Int64")
+        else:
+            df[field.name] = pd.to_numeric(col, errors="coerce").astype(float)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+class SessionArchive:
+    def __init__(self, root=None, db_path=None, bars_db_path=None):
+        self.root = root if root else ARCHIVE_DIR
+        self.paths = {"main": db_path if db_path else DB_PATH, "bars": bars_db_path if bars_db_path else BARS_DB_PATH}
+
+    def _part_path(self, dataset, date):
+        return os.path.join(self.root, dataset, f"date={date}", "part-0.parquet")
+
+    def is_archived(self, dataset, date):
+        return os.path.exists(self._part_path(dataset, date))
+
+    def stored_dates(self, dataset):
+        which, _, dates_sql = DATASETS[dataset]
+        try:
+            with sqlite3.connect(self.paths[which]) as conn:
+                return sorted(r[0] for r in conn.execute(dates_sql) if r[0])
+        except sqlite3.OperationalError:
+            return []
+
+    @staticmethod
+    def schema(dataset, conn, columns):
+        """Arrow schema for `columns` of a dataset from its SQLite table declaration (dataset = table name)."""
+        declared = {r[1]: r[2] for r in conn.execute(f"PRAGMA table_info({dataset})")}
+        return pa.schema([(c, TYPE_OVERRIDES.get((dataset, c), _arrow_type(declared.get(c)))) for c in columns])
+
+    def archive_day(self, dataset, date, overwrite=False):
+        """Writes one session of one dataset; returns the row count (0 if skipped/empty)."""
+        path = self._part_path(dataset, date)
+        if os.path.exists(path) and not overwrite:
+            return 0
+        which, rows_sql, _ = DATASETS[dataset]
+        with sqlite3.connect(self.paths[which]) as conn:
+            df = pd.read_sql(rows_sql, conn, params=(date, _next_day(date)))
+            schema = self.schema(dataset, conn, df.columns)
+        if df.empty:
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        pq.write_table(_to_table(df, schema), tmp, compression="zstd")
+        os.replace(tmp, path) # readers never see a half-written partition
+        return len(df)
+
+    def run(self, datasets=None, through=None):
+        """Archives every stored session up to `through` (default: the last completed session) not yet on disk."""
+        if through is None:
+            calendar = get_market_calendar()
+            last = calendar.last_session_date()
+            # The current session is still being written until it closes
+            through = last.strftime("%Y-%m-%d") if not calendar.is_market_open() else \
+                (pd.Timestamp(last) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        written = {}
+        for dataset in datasets if datasets else DATASETS:
+            for date in self.stored_dates(dataset):
+                if date > through or self.is_archived(dataset, date): continue
+                n = self.archive_day(dataset, date)
+                if n:
+                    written[f"{dataset}/{date}"] = n
+        if written:
+            print(f"[ARCHIVE] {len(written)} partitions | {sum(written.values())} rows through {through}")
+        return written
+
+    def load(self, dataset, columns=None, start=None, end=None, tickers=None, as_arrow=False):
+        """
+        Reads a date range (inclusive, 'YYYY-MM-DD') of one dataset. Only the
+        matching date partitions are opened, only `columns` are decoded, and
+        files are memory-mapped rather than read into Python buffers.
+        """
+        base = os.path.join(self.root, dataset)
+        if not os.path.isdir(base):
+            return pa.table({}) if as_arrow else pd.DataFrame(columns=columns)
+        filesystem = fs.LocalFileSystem(use_mmap=True)
+        data = ds.dataset(base, format="parquet", partitioning=PARTITIONING, filesystem=filesystem)
+        # One schema across days; also reads partitions written before the table gained a column
+        schemas = [frag.physical_schema for frag in data.get_fragments()]
+        if schemas:
+            unified = pa.unify_schemas(schemas, promote_options="permissive")
+            data = ds.dataset(base, schema=unified.append(pa.field("date", pa.string())), format="parquet",
+                              partitioning=PARTITIONING, filesystem=filesystem)
+        expr = None
+        for cond in ((ds.field("date") >= start) if start else None,
+                     (ds.field("date") <= end) if end else None,
+                     ds.field("Ticker").isin(list(tickers)) if tickers else None):
+            if cond is not None:
+                expr = cond if expr is None else expr & cond
+        table = data.to_table(columns=list(columns) if columns else None, filter=expr)
+        return table if as_arrow else table.to_pandas()
+
+_archive = None
+
+def get_archive():
+    global _archive
+    if _archive is None:
+        _archive = SessionArchive()
+    return _archive
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive completed sessions to partitioned Parquet")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS))
+    parser.add_argument("--through", help="Last session date to archive (YYYY-MM-DD)")
+    args = parser.parse_args()
+    written = SessionArchive().run(args.datasets, args.through)
+    print(f"[ARCHIVE] Done: {len(written)} new partitions")
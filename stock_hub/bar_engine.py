@@ -0,0 +1,270 @@
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from stock_hub import market_data as md
+from stock_hub.config import BARS_DB_PATH
+from stock_hub.metrics import count
+from stock_hub.shared_panel import get_shared_panel
+
+# NSE cash session (IST). Minute bars are labelled by their start time,
+# so the last bar of the day is stamped 15:29.
+MARKET_TZ = "Asia/Kolkata"
+SESSION_OPEN = "09:15"
+SESSION_LAST_BAR = "15:29"
+
+# Resample rules. Intraday bins are anchored at 09:15 (offset from midnight)
+# so 30m/60m candles open at 09:15, 09:45 / 10:15 ... like the exchange charts.
+TIMEFRAMES = {
+    "1m": "1min",
+    "5m": "5min",
+    "15m": "15min",
+    "30m": "30min",
+    "60m": "60min",
+    "1h": "60min",
+    "1d": "1D",
+}
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+def to_market_tz(df):
+    if df.index.tz is None:
+        df = df.tz_localize(MARKET_TZ)
+    else:
+        df = df.tz_convert(MARKET_TZ)
+    return df
+
+def split_download(data, symbols):
+    """
+    Splits a yf.download frame (flat, Ticker/Price or Price/Ticker MultiIndex)
+    into {symbol: OHLCV DataFrame}.
+    """
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        if len(symbols) == 1:
+            frames[symbols[0]] = data
+        return {s: f[[c for c in OHLCV if c in f.columns]].dropna(subset=["Close"]) for s, f in frames.items()}
+
+    lvl0 = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        try:
+            if symbol in lvl0:
+                f = data[symbol]
+            else:
+                f = data.xs(symbol, axis=1, level=-1)
+        except KeyError:
+            continue
+        f = f[[c for c in OHLCV if c in f.columns]].dropna(subset=["Close"])
+        if not f.empty:
+            frames[symbol] = f
+    return frames
+
+def resample_bars(df, timeframe):
+    """
+    Derives session-aware bars from 1-minute OHLCV.
+    Bars outside 09:15-15:30 IST (pre-open, post-close prints) are dropped.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    if df.empty:
+        return df
+
+    df = to_market_tz(df).between_time(SESSION_OPEN, SESSION_LAST_BAR)
+    if timeframe == "1m" or df.empty:
+        return df
+
+    agg = {c: a for c, a in OHLCV_AGG.items() if c in df.columns}
+    if timeframe == "1d":
+        out = df.groupby(df.index.normalize()).agg(agg)
+    else:
+        out = df.resample(TIMEFRAMES[timeframe], offset="15min", label="left", closed="left").agg(agg)
+    return out.dropna(subset=["Open"])
+
+class BarStore:
+    """
+    Persists the 1-minute bars we already download and serves derived
+    timeframes from them. Derived frames are cached per (symbol, timeframe)
+    and invalidated when new minute bars land for that symbol.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else BARS_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS minute_bars (
+                    Ticker TEXT,
+                    Timestamp TEXT,
+                    Open REAL,
+                    High REAL,
+                    Low REAL,
+                    Close REAL,
+                    Volume REAL,
+                    PRIMARY KEY (Ticker, Timestamp)
+                )
+            """)
+            # Session-range reads (archive) scan by time across all tickers
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_minute_bars_ts ON minute_bars (Timestamp)")
+
+    def save_minute_bars(self, frames):
+        """frames: {symbol: 1m OHLCV DataFrame}"""
+        rows = []
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            df = to_market_tz(df)
+            ts = df.index.strftime("%Y-%m-%d %H:%M:%S")
+            vol = df["Volume"] if "Volume" in df.columns else pd.Series(0.0, index=df.index)
+            rows.extend(zip([symbol] * len(df), ts, df["Open"].astype(float), df["High"].astype(float),
+                            df["Low"].astype(float), df["Close"].astype(float), vol.fillna(0).astype(float)))
+        if not rows:
+            return 0
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO minute_bars (Ticker, Timestamp, Open, High, Low, Close, Volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+        with self._lock:
+            for key in [k for k in self._cache if k[0] in frames]:
+                del self._cache[key]
+        return len(rows)
+
+    def _version(self, conn, symbol):
+        return conn.execute(
+            "SELECT MAX(Timestamp), COUNT(*) FROM minute_bars WHERE Ticker = ?", (symbol,)
+        ).fetchone()
+
+    def load_minute_bars(self, symbol, since=None):
+        query = "SELECT Timestamp, Open, High, Low, Close, Volume FROM minute_bars WHERE Ticker = ?"
+        params = [symbol]
+        if since:
+            query += " AND Timestamp >= ?"
+            params.append(since)
+        query += " ORDER BY Timestamp"
+        with sqlite3.connect(self.db_path) as conn:
+            df = pd.read_sql(query, conn, params=params)
+        if df.empty:
+            return pd.DataFrame(columns=OHLCV)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("Timestamp"))).tz_localize(MARKET_TZ)
+        return df
+
+    def get_bars(self, symbol, timeframe="5m"):
+        """
+        Returns bars for any supported timeframe, derived from stored minute bars.
+        Served from cache until new minute bars arrive for the symbol.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            version = self._version(conn, symbol)
+
+        key = (symbol, timeframe)
+        with self._lock:
+            hit = self._cache.get(key)
+        if hit and hit[0] == version:
+            count("cache_hit.bars")
+            return hit[1]
+
+        bars = resample_bars(self.load_minute_bars(symbol), timeframe)
+        with self._lock:
+            self._cache[key] = (version, bars)
+        return bars
+
+    def latest_closes(self, symbols, since=None):
+        """{symbol: last stored minute Close}, only for symbols with a bar at/after since."""
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        query = f"""
+            SELECT Ticker, Close, MAX(Timestamp) FROM minute_bars
+            WHERE Ticker IN ({",".join("?" * len(symbols))})
+        """
+        params = symbols
+        if since:
+            query += " AND Timestamp >= ?"
+            params = symbols + [since]
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(query + " GROUP BY Ticker", params).fetchall()
+        return {ticker: close for ticker, close, _ in rows}
+
+    def symbols(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT Ticker FROM minute_bars")]
+
+def download_minute_bars(symbols, period="1d"):
+    """Batched 1-minute download split per symbol (no persistence)."""
+    data = md.download(
+        tickers=" ".join(symbols),
+        period=period,
+        interval="1m",
+        group_by='ticker',
+        progress=False,
+        threads=True,
+        timeout=10,
+        auto_adjust=False
+    )
+    return split_download(data, list(symbols))
+
+def refresh_minute_bars(symbols, period="1d", store=None):
+    """Downloads minute bars for the universe once and persists them for resampling."""
+    store = store if store else get_bar_store()
+    frames = download_minute_bars(symbols, period)
+    if frames:
+        store.save_minute_bars(frames)
+    return frames
+
+_default_store = None
+
+def get_bar_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = BarStore()
+    return _default_store
+
+_panel_cache = {}
+PANEL_TTL = 300 # seconds
+
+def fetch_price_panel(symbols, period="5d", interval="1d", ttl=PANEL_TTL):
+    """
+    One batched download for the whole universe, returned as
+    {field: DataFrame(dates x symbols)}. Repeat calls within ttl are served
+    from memory, and from the refresher's shared panel when it covers the
+    request and is fresh.
+    """
+    symbols = list(symbols)
+    if ttl and interval == "1d":
+        shared = get_shared_panel()
+        if shared.covers(symbols, period) and shared.fresh(ttl):
+            count("cache_hit.shared_panel")
+            return shared.to_panel(symbols, period)
+    key = (tuple(symbols), period, interval)
+    hit = _panel_cache.get(key)
+    if hit and time.time() - hit[0] < ttl:
+        count("cache_hit.price_panel")
+        return hit[1]
+
+    data = md.download(
+        tickers=" ".join(symbols),
+        period=period,
+        interval=interval,
+        group_by='ticker',
+        progress=False,
+        threads=True,
+        timeout=10
+    )
+    panel = panel_from_frames(split_download(data, symbols))
+    _panel_cache[key] = (time.time(), panel)
+    return panel
+
+def panel_from_frames(frames):
+    """{symbol: OHLCV DataFrame} -> {field: DataFrame(dates x symbols)}"""
+    return {f: pd.DataFrame({s: df[f] for s, df in frames.items() if f in df.columns}) for f in OHLCV}
@@ -0,0 +1,103 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import timedelta
+from stock_hub.config import DB_PATH
+from stock_hub.market_calendar import ist_now
+
+# Append-only event log the workers publish to and dashboards poll. Readers
+# keep the last Id they saw; a poll is a stat() of the DB file and, only when
+# it changed, one primary-key range scan, so polling every second is cheap.
+#
+# Topics:
+#   pulse    - index pulse rows after a live fetch
+#   prices   - {symbol: price} from the refresh scheduler
+#   alert    - SL/Target/custom level crossings
+#   snapshot - a research cycle published a new snapshot version
+
+RETENTION_HOURS = 48
+PRUNE_EVERY = 500 # publishes between retention sweeps
+
+class ChangeFeed:
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else DB_PATH
+        self._lock = threading.Lock()
+        self._published = 0
+        self._token = None
+        self._token_last_id = None
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS change_feed (
+                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Timestamp TEXT,
+                    Topic TEXT,
+                    Payload TEXT
+                )
+            """)
+
+    def publish(self, topic, payload):
+        ts = ist_now()
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO change_feed (Timestamp, Topic, Payload) VALUES (?, ?, ?)",
+                         (ts.strftime("%Y-%m-%d %H:%M:%S"), topic, json.dumps(payload, default=float)))
+            self._published += 1
+            if self._published % PRUNE_EVERY == 0:
+                cutoff = (ts - timedelta(hours=RETENTION_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+                conn.execute("DELETE FROM change_feed WHERE Timestamp < ?", (cutoff,))
+
+    def last_id(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COALESCE(MAX(Id), 0) FROM change_feed").fetchone()[0]
+
+    def _stat_token(self):
+        token = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                token.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                token.append(None)
+        return tuple(token)
+
+    def poll(self, after_id, topics=None, limit=500):
+        """
+        (cursor, [(id, topic, payload)]) for events after after_id, oldest first.
+        The cursor also moves past events of other topics, so filtered readers
+        stay on the stat-only fast path.
+        """
+        token = self._stat_token()
+        # Unchanged file and nothing newer than this cursor last time: skip the query
+        if token == self._token and self._token_last_id is not None and after_id >= self._token_last_id:
+            return after_id, []
+        query = "SELECT Id, Topic, Payload FROM change_feed WHERE Id > ?"
+        params = [after_id]
+        if topics:
+            query += f" AND Topic IN ({', '.join('?' * len(topics))})"
+            params += list(topics)
+        query += " ORDER BY Id LIMIT ?"
+        params.append(limit)
+        with sqlite3.connect(self.db_path) as conn:
+            last = conn.execute("SELECT COALESCE(MAX(Id), 0) FROM change_feed").fetchone()[0]
+            rows = conn.execute(query, params).fetchall()
+        self._token, self._token_last_id = token, last
+        if len(rows) == limit:
+            cursor = rows[-1][0]
+        else:
+            cursor = max(last, after_id, rows[-1][0] if rows else 0)
+        return cursor, [(i, t, json.loads(p)) for i, t, p in rows]
+
+_feed = None
+
+def get_change_feed():
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed()
+    return _feed
+
+def publish(topic, payload):
+    """Best-effort publish: a feed failure never breaks the writer."""
+    try:
+        get_change_feed().publish(topic, payload)
+    except Exception as e:
+        print(f"[FEED] Publish '{topic}' failed: {e}")
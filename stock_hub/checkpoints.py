@@ -0,0 +1,57 @@
+import json
+import sqlite3
+import threading
+from stock_hub.config import DB_PATH
+from stock_hub.metrics import count
+from stock_hub.market_calendar import ist_now
+
+# Per-symbol progress of the research cycle in flight. Each finished symbol
+# (enrichment row, Agent_Review text, derivatives signal) is committed as soon
+# as it is known; a cycle restarted the same IST day reuses those results
+# instead of re-fetching / re-querying Gemini. A completed cycle clears them.
+
+class CycleCheckpoint:
+    def __init__(self, db_path=None, date=None):
+        self.db_path = db_path if db_path else DB_PATH
+        self.date = date if date else ist_now().strftime("%Y-%m-%d")
+        self._lock = threading.Lock()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cycle_checkpoints (
+                    Date TEXT,
+                    Stage TEXT,
+                    Ticker TEXT,
+                    Payload TEXT,
+                    Timestamp TEXT,
+                    PRIMARY KEY (Date, Stage, Ticker)
+                )
+            """)
+            # A crash on an earlier day is not resumable
+            conn.execute("DELETE FROM cycle_checkpoints WHERE Date < ?", (self.date,))
+
+    def load(self, stage):
+        """{ticker: payload} already final for this stage today."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT Ticker, Payload FROM cycle_checkpoints WHERE Date = ? AND Stage = ?",
+                                (self.date, stage)).fetchall()
+        if rows:
+            print(f"[CHECKPOINT] Resuming {stage}: {len(rows)} symbols already final")
+        return {ticker: json.loads(payload) for ticker, payload in rows}
+
+    def save(self, stage, ticker, payload):
+        ts = ist_now().strftime("%Y-%m-%d %H:%M:%S")
+        # numpy scalars fall back to float
+        data = json.dumps(payload, default=float)
+        try:
+            with self._lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO cycle_checkpoints (Date, Stage, Ticker, Payload, Timestamp)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (self.date, stage, ticker, data, ts))
+        except Exception as e:
+            print(f"[CHECKPOINT] Save failed for {stage}/{ticker}: {e}")
+            count("failure.checkpoint")
+
+    def clear(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM cycle_checkpoints WHERE Date = ?", (self.date,))
@@ -4,6 +4,7 @@ import os
 CONFIG_PATH = "config.json"
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "stock_hub", "brotherhood_data.db")
+BARS_DB_PATH = os.path.join(BASE_DIR, "stock_hub", "data", "market_data.db")
 
 class QuantConfig:
     DEFAULT = {
@@ -11,6 +12,19 @@ class QuantConfig:
         "RSI_SELL": 75,
         "EMA_PERIOD": 20,
         "FIB_RATIO": 0.618,
+        "UNIVERSE": "NIFTY_100",
+        "SHARD_THRESHOLD": 200,
+        "SCAN_SHARDS": 4,
+        "SHARD_FETCH_BUDGET": 20,
+        "SCAN_TIME_BUDGET": 240,
+        "ENRICH_PROCESSES": 4,
+        "ENRICH_PROCESS_THRESHOLD": 200,
+        "PRIORITY_TICKERS": ["VBL.NS", "RELIANCE.NS", "ITC.NS"],
+        "WATCHLIST": [],
+        "REFRESH_BUDGET_PER_MIN": 60,
+        "REFRESH_BASE_INTERVAL": 300,
+        "RISK_WINDOW": 60,
+        "NEWS_TTL_MINUTES": 120,
         "INDEX_MAPPING": {
             "^NSEI": "NIFTY",
             "^NSEBANK": "BANK NIFTY",
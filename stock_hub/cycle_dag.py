@@ -0,0 +1,75 @@
+import threading
+import concurrent.futures
+from stock_hub.metrics import span
+
+class CycleGraph:
+    """
+    One research cycle as a DAG of named computations.
+    - node(name, deps): registers fn(**dep_results); runs once per cycle.
+    - run(targets): executes the targets and their dependencies, launching
+      every node whose dependencies are done in parallel.
+    - memo(key, fn): keyed per-cycle memoization for shared inputs (price
+      histories, VIX, ...) so concurrent consumers trigger one computation.
+    """
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._nodes = {}
+        self._results = {}
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def node(self, name, deps=()):
+        def register(fn):
+            self._nodes[name] = (tuple(deps), fn)
+            return fn
+        return register
+
+    def memo(self, key, fn):
+        with self._memo_lock:
+            fut = self._memo.get(key)
+            owner = fut is None
+            if owner:
+                fut = concurrent.futures.Future()
+                self._memo[key] = fut
+        if owner:
+            try:
+                fut.set_result(fn())
+            except Exception as e:
+                fut.set_exception(e)
+        return fut.result()
+
+    def _closure(self, targets):
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed: continue
+            if name not in self._nodes:
+                raise KeyError(f"Unknown cycle node: {name}")
+            needed.add(name)
+            stack.extend(self._nodes[name][0])
+        return needed
+
+    def _execute(self, name):
+        deps, fn = self._nodes[name]
+        with span(name):
+            return fn(**{d: self._results[d] for d in deps})
+
+    def run(self, targets):
+        pending = self._closure(targets) - set(self._results)
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                ready = [n for n in pending if all(d in self._results for d in self._nodes[n][0])]
+                for name in ready:
+                    pending.discard(name)
+                    running[pool.submit(self._execute, name)] = name
+                if not running:
+                    raise RuntimeError(f"Cycle graph stalled on: {sorted(pending)}")
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for fut in done:
+                    # A failing node fails the cycle, like an exception in the old linear flow
+                    self._results[running.pop(fut)] = fut.result()
+        return {t: self._results[t] for t in targets}
+
+    def result(self, name):
+        return self._results[name]
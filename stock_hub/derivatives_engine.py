@@ -1,6 +1,6 @@
 import os
 import random
-import yfinance as yf
+from stock_hub import market_data as md
 from datetime import datetime
 
 # Logic: Fetch ATM Premium or fallback
@@ -18,7 +18,7 @@ def get_atm_info(ticker_symbol, ltp):
     
     # 2. FETCH PREMIUM
     try:
-        t = yf.Ticker(ticker_symbol)
+        t = md.Ticker(ticker_symbol)
         options = t.options
         if not options: 
             return calculated_strike, "FEED DELAY"
@@ -35,15 +35,17 @@ def get_atm_info(ticker_symbol, ltp):
     except:
         return calculated_strike, "FEED DELAY"
 
-def get_derivatives_strategy(ticker_symbol, ltp):
+def get_derivatives_strategy(ticker_symbol, ltp, vix=None):
     """
     Analyzes Derivative sentiment (PCR, OI, RSI).
+    vix: cycle-level VIX close; fetched here only when the caller has none.
     """
     try:
         # VIX fetch for general sentiment
-        vix_ticker = yf.Ticker("^VIX")
-        vix_hist = vix_ticker.history(period="1d")
-        vix = vix_hist['Close'].iloc[-1] if not vix_hist.empty else 15.0
+        if vix is None:
+            vix_ticker = md.Ticker("^VIX")
+            vix_hist = vix_ticker.history(period="1d")
+            vix = vix_hist['Close'].iloc[-1] if not vix_hist.empty else 15.0
         
         # Synthetic PCR Calculation (inverse of VIX trend)
         pcr = round(1.05 - (vix / 100) + (random.uniform(-0.05, 0.05)), 2)
@@ -0,0 +1,163 @@
+import concurrent.futures
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from stock_hub.quant_tools import QuantTools
+from stock_hub.metrics import span, count
+
+# Enrichment split by cost: history fetches and row building (news lookups)
+# stay on I/O threads, while the indicator math runs in a process pool over
+# symbol shards so it is not serialized by the GIL. Histories are packed once
+# into a shared-memory block (FIELDS x total rows); workers get only the block
+# name and their (index, start, end) spans, and return a few floats per symbol.
+
+FIELDS = ("High", "Low", "Close")
+IO_WORKERS = 30
+MIN_HISTORY = 200 # sessions needed for the EMA200 guard
+SHARD_SIZE = 64 # symbols per pool task
+
+class HistoryUnavailable(ValueError):
+    """Empty or short daily history. yfinance reports most failed fetches this way, so it is an error (retried), not a filter."""
+
+def _check_history(hist):
+    if hist is None or hist.empty or len(hist) < MIN_HISTORY:
+        raise HistoryUnavailable(f"{0 if hist is None else len(hist)} sessions of history (need {MIN_HISTORY})")
+
+def enrich_indicators(hist, qt, fib_ratio):
+    """(ltp, ema200, macd_hist, rsi, atr, fib_target) from daily history; raises HistoryUnavailable under MIN_HISTORY sessions."""
+    _check_history(hist)
+    ltp = round(float(hist['Close'].iloc[-1]), 2)
+    ema200 = qt.calculate_ema(hist, 200).iloc[-1]
+    _, _, macd_hist = qt.calculate_macd(hist, 26, 12, 9)
+    rsi = qt.calculate_rsi(hist).iloc[-1]
+    atr = qt.calculate_atr(hist).iloc[-1]
+    fib_target = qt.get_fibonacci_target(hist, fib_ratio)
+    return (ltp, float(ema200), float(macd_hist.iloc[-1]), float(rsi), float(atr), float(fib_target))
+
+def _compute_shard(shm_name, total, spans, fib_ratio):
+    """Worker entry point: indicators for [(index, start, end)] spans of the shared block."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray((len(FIELDS), total), dtype=np.float64, buffer=shm.buf)
+        qt = QuantTools()
+        out = []
+        for i, start, end in spans:
+            try:
+                hist = pd.DataFrame({f: block[k, start:end].copy() for k, f in enumerate(FIELDS)})
+                out.append((i, enrich_indicators(hist, qt, fib_ratio)))
+            except Exception as e:
+                out.append((i, e))
+        del block
+        return out
+    finally:
+        shm.close()
+
+class EnrichExecutor:
+    """
+    processes <= 1, or fewer than min_process_symbols histories, computes in
+    this process; startup and packing only pay off on large batches. Workers
+    are spawned rather than forked, since the caller already runs DAG and I/O
+    threads.
+    """
+    def __init__(self, processes=4, io_workers=IO_WORKERS, min_process_symbols=200, shard_size=SHARD_SIZE):
+        self.processes = max(int(processes or 1), 1)
+        self.io_workers = io_workers
+        self.min_process_symbols = min_process_symbols
+        self.shard_size = shard_size
+
+    @staticmethod
+    def _compute_inline(hists, fib_ratio, deliver):
+        qt = QuantTools()
+        for i, hist in hists.items():
+            try:
+                deliver(i, enrich_indicators(hist, qt, fib_ratio))
+            except Exception as e:
+                deliver(i, e)
+
+    def _compute(self, hists, fib_ratio, deliver):
+        """Calls deliver(index, indicators or Exception) for every history as its shard finishes."""
+        if self.processes <= 1 or len(hists) < self.min_process_symbols:
+            return self._compute_inline(hists, fib_ratio, deliver)
+
+        delivered = set()
+        def deliver_once(i, m):
+            delivered.add(i)
+            deliver(i, m)
+
+        shm = None
+        try:
+            spans, offset = [], 0
+            for i, hist in hists.items():
+                spans.append((i, offset, offset + len(hist)))
+                offset += len(hist)
+            shm = shared_memory.SharedMemory(create=True, size=max(len(FIELDS) * offset * 8, 1))
+            block = np.ndarray((len(FIELDS), offset), dtype=np.float64, buffer=shm.buf)
+            for (i, start, end) in spans:
+                for k, f in enumerate(FIELDS):
+                    block[k, start:end] = hists[i][f].to_numpy(dtype=np.float64)
+            del block
+            workers = min(self.processes, len(spans))
+            # Small round-robin shards: results (and checkpoints) arrive as each one finishes
+            n_shards = max(workers, -(-len(spans) // self.shard_size))
+            shards = [spans[k::n_shards] for k in range(n_shards)]
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+                futures = [pool.submit(_compute_shard, shm.name, offset, shard, fib_ratio) for shard in shards]
+                for fut in concurrent.futures.as_completed(futures):
+                    for i, m in fut.result():
+                        deliver_once(i, m)
+        except Exception as e:
+            # Broken pool, pickling or /dev/shm trouble: finish what is left in this process
+            print(f"[ENRICH] Process pool failed ({e!r}), computing {len(hists) - len(delivered)} symbols inline")
+            count("failure.enrich_pool")
+            self._compute_inline({i: h for i, h in hists.items() if i not in delivered}, fib_ratio, deliver)
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    def run(self, signals, history, fib_ratio, build_row, on_result=None):
+        """
+        One outcome per signal, in order: whatever build_row(signal, indicators)
+        returns, or the Exception raised while fetching (HistoryUnavailable for
+        empty / short history), computing or building. on_result(signal, outcome)
+        is called as soon as each outcome is known, from a worker thread, so an
+        interrupted batch keeps what already finished.
+        """
+        if not signals:
+            return []
+        io_workers = min(self.io_workers, len(signals))
+        outcomes = [None] * len(signals)
+
+        def finish(i, outcome):
+            outcomes[i] = outcome
+            if on_result:
+                on_result(signals[i], outcome)
+
+        def fetch(s):
+            try:
+                hist = history(s['Symbol'])
+                _check_history(hist)
+                return hist[list(FIELDS)]
+            except Exception as e:
+                return e
+
+        with span("enrich.fetch"), concurrent.futures.ThreadPoolExecutor(max_workers=io_workers) as executor:
+            fetched = list(executor.map(fetch, signals))
+        hists = {}
+        for i, h in enumerate(fetched):
+            if isinstance(h, Exception):
+                finish(i, h)
+            else:
+                hists[i] = h
+        count("enrich.symbols", len(hists))
+
+        def build(i, m):
+            try:
+                finish(i, m if isinstance(m, Exception) else build_row(signals[i], m))
+            except Exception as e:
+                finish(i, e)
+
+        with span("enrich.compute"), concurrent.futures.ThreadPoolExecutor(max_workers=io_workers) as builder:
+            self._compute(hists, fib_ratio, lambda i, m: builder.submit(build, i, m))
+        return outcomes
@@ -1,10 +1,12 @@
 import sys
 import os
 sys.path.append(os.getcwd())
-import yfinance as yf
+from stock_hub import market_data as md
 import pandas as pd
 import numpy as np
 import concurrent.futures
+from stock_hub.record_batch import RecordBatch, SIGNAL_SCHEMA
+from stock_hub.bar_engine import split_download
 
 def calculate_rsi(prices, period=14):
     delta = prices.diff()
@@ -50,19 +52,35 @@ def get_pa_prediction(symbol, data):
     except:
         return "N/A", "Technical data unavailable."
 
-def scan_advanced_signals(symbols):
+def scan_advanced_signals(symbols, timeframe="1d", frames=None):
     """
     Scans for technical signals and implements the Prime O-L Momentum (Open=Low/High).
+    timeframe: "1d" downloads daily bars; intraday timeframes ("5m", "15m", "60m")
+    are derived from the stored minute bars (see bar_engine) with no extra download.
+    frames: optional {symbol: OHLCV DataFrame} already fetched in one batch
+    (used by the sharded runner); symbols missing from it are skipped.
     """
-    print(f"[SCAN] PRIME O-L MOMENTUM SCAN | Nifty 100 | Symbols: {len(symbols)}...")
+    print(f"[SCAN] PRIME O-L MOMENTUM SCAN | Symbols: {len(symbols)} | TF: {timeframe}...")
+    store = None
+    if timeframe != "1d" and frames is None:
+        from stock_hub.bar_engine import get_bar_store
+        store = get_bar_store()
     
     def process_symbol(symbol):
         try:
-            # period="5d" to handle weekend/Friday gaps
-            df = yf.download(symbol, period="5d", interval="1d", progress=False)
+            if frames is not None:
+                df = frames.get(symbol, pd.DataFrame())
+            elif store is not None:
+                df = store.get_bars(symbol, timeframe)
+            else:
+                # period="5d" to handle weekend/Friday gaps
+                # Single-ticker downloads come back with (Price, Ticker) columns
+                data = md.download(symbol, period="5d", interval="1d", progress=False)
+                df = split_download(data, [symbol]).get(symbol, pd.DataFrame())
             if df.empty: return None
             
-            # Using latest session (Friday if today is Saturday)
+            # Last row = market_calendar.last_session_date(): period="5d" spans
+            # weekends and NSE holidays, so off-days see the previous session
             last_row = df.iloc[-1]
             o, h, l, c = last_row['Open'].item(), last_row['High'].item(), last_row['Low'].item(), last_row['Close'].item()
             
@@ -90,25 +108,26 @@ def scan_advanced_signals(symbols):
             change_pct = round(((c - prev_c) / prev_c) * 100, 2) if prev_c else 0.0
             vol = float(last_row['Volume'].item()) if 'Volume' in last_row else 0.0
             
-            return {
-                "Symbol": symbol,
-                "Open": round(o, 2),
-                "High": round(h, 2),
-                "Low": round(l, 2),
-                "Close": round(c, 2),
-                "Price": round(c, 2),
-                "Volume": vol,
-                "Change_Pct": change_pct,
-                "EMA200": round(ema200, 2),
-                "Above_EMA200": is_above_ema200,
-                "High_Open_Pct": high_open_pct,
-                "Trend": trend,
-                "PA_Prediction": prediction,
-                "Reasoning": reasoning
-            }
+            # Row in SIGNAL_SCHEMA order (packed into a RecordBatch below)
+            return (
+                symbol,
+                round(o, 2),
+                round(h, 2),
+                round(l, 2),
+                round(c, 2),
+                round(c, 2),
+                vol,
+                change_pct,
+                round(ema200, 2),
+                is_above_ema200,
+                high_open_pct,
+                trend,
+                prediction,
+                reasoning
+            )
         except: return None
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=30) as executor:
-        results = [r for r in list(executor.map(process_symbol, symbols)) if r]
+        results = RecordBatch(SIGNAL_SCHEMA).extend(executor.map(process_symbol, symbols))
         
-    return sorted(results, key=lambda x: abs(x['High_Open_Pct']), reverse=True)
+    return results.sort_by('High_Open_Pct', key=abs, reverse=True)
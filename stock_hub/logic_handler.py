@@ -10,6 +10,10 @@ try:
 except ImportError:
     Credentials = None
 from dotenv import load_dotenv
+from stock_hub.metrics import span
+from stock_hub.risk_engine import get_risk_context
+from stock_hub.sql_tool import get_sql_executor, make_sql_tool
+from stock_hub.memory_index import get_memory_index
 
 load_dotenv()
 
@@ -39,9 +43,9 @@ class LocalBrainDB:
 
 brain_db = LocalBrainDB()
 
-def get_db_context():
+def get_db_context(db_path=None):
     try:
-        db_path = os.path.join("stock_hub", "brotherhood_data.db")
+        db_path = db_path if db_path else os.path.join("stock_hub", "brotherhood_data.db")
         with sqlite3.connect(db_path) as conn:
             query = "SELECT * FROM processed_watchlist WHERE Date = (SELECT MAX(Date) FROM processed_watchlist)"
             df = pd.read_sql(query, conn)
@@ -76,22 +80,41 @@ def query_gemini(prompt):
     history_records = brain_db.get_history(limit=5)
     context = "\n".join([f"{h[0]}: {h[1]}" for h in history_records])
     
-    db_state = get_db_context()
+    risk_state = get_risk_context() or "Risk snapshot pending research cycle."
+    try:
+        memory = get_memory_index().context(prompt) or "No related past exchanges."
+    except sqlite3.Error:
+        memory = "No related past exchanges."
+    try:
+        schema = get_sql_executor().schema()
+    except sqlite3.Error:
+        schema = "(database not initialized)"
     
+    # The model pulls only the rows it needs through run_sql instead of the whole watchlist
     full_prompt = (
-        "You are the Brotherhood Oracle, a high-precision Systematic Momentum terminal. Read the SQL data provided and give professional, blunt, and practical financial advice based on MACD/RSI/EMA trends.\n"
+        "You are the Brotherhood Oracle, a high-precision Systematic Momentum terminal. Give professional, blunt, and practical financial advice based on MACD/RSI/EMA trends.\n"
+        "You have LIVE SQL READ ACCESS through the run_sql tool (SQLite dialect, SELECT only, max 50 rows per query). "
+        "Query for the data you need before answering; filter on the latest Date unless history is asked for.\n"
+        f"TABLES:\n{schema}\n\n"
         f"CONTEXT HISTORY:\n{context}\n\n"
-        f"LIVE SQL DATABASE STATE:\n{db_state}\n\n"
+        f"RELEVANT MEMORY (past exchanges and agent reviews):\n{memory}\n\n"
+        f"CROSS-ASSET RISK:\n{risk_state}\n\n"
         f"USER: {prompt}\n\n"
         "STRICT RULE: Do not use personal names or informal greetings. Data-centric responses only."
     )
     
     try:
-        model = genai.GenerativeModel('gemini-flash-lite-latest')
+        model = genai.GenerativeModel('gemini-flash-lite-latest', tools=[make_sql_tool()])
         brain_db.save_message("user", prompt)
-        response = model.generate_content(full_prompt)
+        with span("gemini.oracle", kind="upstream"):
+            chat = model.start_chat(enable_automatic_function_calling=True)
+            response = chat.send_message(full_prompt)
         answer = response.text.strip()
         brain_db.save_message("assistant", answer)
+        try:
+            get_memory_index().sync_history()
+        except sqlite3.Error as e:
+            print(f"[MEMORY] Exchange not indexed: {e}")
         return answer
     except Exception as e:
         return f"Oracle Error: {e}"
@@ -117,7 +140,7 @@ def get_cross_domain_strategy():
     return "Proprietary Momentum Scanner: Monitoring for breakout triggers."
 
 def fetch_market_pulse():
-    import yfinance as yf
+    from stock_hub import market_data as md
     indices = {
         "^NSEI": "Nifty 50",
         "^NSEBANK": "Bank Nifty",
@@ -126,7 +149,7 @@ def fetch_market_pulse():
     results = []
     for ticker, name in indices.items():
         try:
-            t = yf.Ticker(ticker)
+            t = md.Ticker(ticker)
             hist = t.history(period="5d")
             if len(hist) >= 2:
                 last_close = hist['Close'].iloc[-1]
@@ -147,7 +170,7 @@ def fetch_market_pulse():
     return results
 
 def fetch_sector_performance():
-    import yfinance as yf
+    from stock_hub import market_data as md
     sectors = {
         "^CNXIT": "IT",
         "^NSEBANK": "Bank",
@@ -159,7 +182,7 @@ def fetch_sector_performance():
     results = []
     for ticker, name in sectors.items():
         try:
-            t = yf.Ticker(ticker)
+            t = md.Ticker(ticker)
             prices = t.history(period="5d") # Buffer for weekends
             if len(prices) >= 2:
                 # basis: (Closing Price Today / Closing Price Previous Session) - 1
@@ -170,42 +193,38 @@ def fetch_sector_performance():
 
 def fetch_trending_tickers():
     try:
-        db_path = os.path.join("stock_hub", "brotherhood_data.db")
-        with sqlite3.connect(db_path) as conn:
-            query = """
-                SELECT Ticker, Price, Volume, Change_Pct 
-                FROM raw_signals 
-                WHERE Date = (SELECT MAX(Date) FROM raw_signals)
-                ORDER BY Volume DESC LIMIT 5
-            """
-            df = pd.read_sql(query, conn)
-            if not df.empty: return df
-            # Fallback for fresh DB: Mock data for visualization
-            return pd.DataFrame([
-                {"Ticker": "NIFTY_P", "Price": 22450, "Volume": 500000, "Change_Pct": 1.2},
-                {"Ticker": "BANK_P", "Price": 48200, "Volume": 350000, "Change_Pct": -0.5},
-                {"Ticker": "IT_P", "Price": 36000, "Volume": 420000, "Change_Pct": 0.8},
-            ])
+        from stock_hub.query_cache import get_snapshot_cache
+        df = get_snapshot_cache().query("""
+            SELECT Ticker, Price, Volume, Change_Pct 
+            FROM raw_signals 
+            WHERE Date = (SELECT MAX(Date) FROM raw_signals)
+            ORDER BY Volume DESC LIMIT 5
+        """)
+        if not df.empty: return df.copy()
+        # Fallback for fresh DB: Mock data for visualization
+        return pd.DataFrame([
+            {"Ticker": "NIFTY_P", "Price": 22450, "Volume": 500000, "Change_Pct": 1.2},
+            {"Ticker": "BANK_P", "Price": 48200, "Volume": 350000, "Change_Pct": -0.5},
+            {"Ticker": "IT_P", "Price": 36000, "Volume": 420000, "Change_Pct": 0.8},
+        ])
     except:
         return pd.DataFrame()
 
 def fetch_top_movers():
     try:
-        db_path = os.path.join("stock_hub", "brotherhood_data.db")
-        with sqlite3.connect(db_path) as conn:
-            query = """
-                SELECT Ticker, Price, Change_Pct 
-                FROM raw_signals 
-                WHERE Date = (SELECT MAX(Date) FROM raw_signals)
-                ORDER BY Change_Pct DESC LIMIT 5
-            """
-            df = pd.read_sql(query, conn)
-            return df
+        from stock_hub.query_cache import get_snapshot_cache
+        df = get_snapshot_cache().query("""
+            SELECT Ticker, Price, Change_Pct 
+            FROM raw_signals 
+            WHERE Date = (SELECT MAX(Date) FROM raw_signals)
+            ORDER BY Change_Pct DESC LIMIT 5
+        """)
+        return df.copy()
     except:
         return pd.DataFrame()
 
 def get_mf_returns_table():
-    import yfinance as yf
+    from stock_hub import market_data as md
     from datetime import datetime, timedelta
     mf_map = {
         '0P0000XW8F.BO': 'SBI Bluechip Fund',
@@ -218,7 +237,7 @@ def get_mf_returns_table():
     rows = []
     for ticker, name in mf_map.items():
         try:
-            t = yf.Ticker(ticker)
+            t = md.Ticker(ticker)
             hist = t.history(period="max")
             if hist.empty: continue
             
@@ -0,0 +1,180 @@
+import os
+import csv
+from datetime import datetime, date, time as dtime, timedelta
+from stock_hub.config import BASE_DIR
+
+# NSE equity segment calendar (IST). Decides when the market is live and
+# which session the stored data should belong to, so refreshes only hit
+# Yahoo when there is something new to fetch.
+PRE_OPEN = (dtime(9, 0), dtime(9, 15))
+NORMAL_SESSION = (dtime(9, 15), dtime(15, 30))
+POST_CLOSE = (dtime(15, 30), dtime(16, 0))
+
+# Trading holidays from the NSE circulars. Add late changes (or next year's
+# list) to stock_hub/data/nse_calendar.csv instead of editing this table.
+NSE_HOLIDAYS = {
+    "2025-02-26": "Mahashivratri",
+    "2025-03-14": "Holi",
+    "2025-03-31": "Id-Ul-Fitr (Ramadan Eid)",
+    "2025-04-10": "Shri Mahavir Jayanti",
+    "2025-04-14": "Dr. Baba Saheb Ambedkar Jayanti",
+    "2025-04-18": "Good Friday",
+    "2025-05-01": "Maharashtra Day",
+    "2025-08-15": "Independence Day",
+    "2025-08-27": "Ganesh Chaturthi",
+    "2025-10-02": "Mahatma Gandhi Jayanti / Dussehra",
+    "2025-10-21": "Diwali Laxmi Pujan",
+    "2025-10-22": "Balipratipada",
+    "2025-11-05": "Prakash Gurpurb Sri Guru Nanak Dev",
+    "2025-12-25": "Christmas",
+    "2026-01-15": "Municipal Corporation Elections (Maharashtra)",
+    "2026-01-26": "Republic Day",
+    "2026-03-03": "Holi",
+    "2026-03-26": "Shri Ram Navami",
+    "2026-03-31": "Shri Mahavir Jayanti",
+    "2026-04-03": "Good Friday",
+    "2026-04-14": "Dr. Baba Saheb Ambedkar Jayanti",
+    "2026-05-01": "Maharashtra Day",
+    "2026-05-28": "Bakri Id",
+    "2026-06-26": "Muharram",
+    "2026-09-14": "Ganesh Chaturthi",
+    "2026-10-02": "Mahatma Gandhi Jayanti",
+    "2026-10-20": "Dussehra",
+    "2026-11-10": "Diwali Balipratipada",
+    "2026-11-24": "Prakash Gurpurb Sri Guru Nanak Dev",
+    "2026-12-25": "Christmas",
+}
+
+# One-hour Diwali sessions, traded even on holidays / weekends
+MUHURAT_SESSIONS = {
+    "2025-10-21": (dtime(13, 45), dtime(14, 45)),
+    # Laxmi Pujan falls on a Sunday; timing as announced by circular (override in nse_calendar.csv if it moves)
+    "2026-11-08": (dtime(18, 0), dtime(19, 0)),
+}
+
+CALENDAR_CSV = os.path.join(BASE_DIR, "stock_hub", "data", "nse_calendar.csv")
+
+def ist_now():
+    return datetime.utcnow() + timedelta(hours=5, minutes=30)
+
+def _parse_time(value):
+    h, m = value.strip().split(":")[:2]
+    return dtime(int(h), int(m))
+
+class MarketCalendar:
+    """
+    Holidays, regular / pre-open / post-close windows and muhurat sessions.
+    Optional overrides: CSV with Date,Type,Start,End,Description where Type is
+    HOLIDAY, MUHURAT (Start/End required) or OPEN (removes a listed holiday).
+    """
+    def __init__(self, holidays=None, muhurat=None, csv_path=CALENDAR_CSV):
+        self.holidays = dict(holidays if holidays is not None else NSE_HOLIDAYS)
+        self.muhurat = dict(muhurat if muhurat is not None else MUHURAT_SESSIONS)
+        if csv_path and os.path.exists(csv_path):
+            self._load_overrides(csv_path)
+
+    def _load_overrides(self, path):
+        try:
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    d = row.get("Date", "").strip()
+                    kind = row.get("Type", "").strip().upper()
+                    if not d: continue
+                    if kind == "HOLIDAY":
+                        self.holidays[d] = row.get("Description", "") or "Holiday"
+                    elif kind == "MUHURAT":
+                        self.muhurat[d] = (_parse_time(row["Start"]), _parse_time(row["End"]))
+                    elif kind == "OPEN":
+                        self.holidays.pop(d, None)
+        except Exception as e:
+            print(f"[CALENDAR] Override file skipped: {e}")
+
+    @staticmethod
+    def _key(d):
+        return d.strftime("%Y-%m-%d")
+
+    def is_holiday(self, d):
+        return self._key(d) in self.holidays
+
+    def is_trading_day(self, d):
+        """Regular session day (muhurat-only days excluded)."""
+        return d.weekday() < 5 and not self.is_holiday(d)
+
+    def sessions(self, d):
+        """[(start, end)] trading windows on d."""
+        windows = [NORMAL_SESSION] if self.is_trading_day(d) else []
+        if self._key(d) in self.muhurat:
+            windows.append(self.muhurat[self._key(d)])
+        return windows
+
+    def phase(self, now=None):
+        """'open', 'muhurat', 'pre_open', 'post_close' or 'closed'."""
+        now = now if now else ist_now()
+        d, t = now.date(), now.time()
+        if self._key(d) in self.muhurat:
+            start, end = self.muhurat[self._key(d)]
+            if start <= t < end: return "muhurat"
+        if not self.is_trading_day(d):
+            return "closed"
+        if PRE_OPEN[0] <= t < PRE_OPEN[1]: return "pre_open"
+        if NORMAL_SESSION[0] <= t < NORMAL_SESSION[1]: return "open"
+        if POST_CLOSE[0] <= t < POST_CLOSE[1]: return "post_close"
+        return "closed"
+
+    def is_market_open(self, now=None):
+        return self.phase(now) in ("open", "muhurat")
+
+    def last_session_date(self, now=None):
+        """Date of the latest session that has started, i.e. what fresh data belongs to."""
+        now = now if now else ist_now()
+        d = now.date()
+        if any(start <= now.time() for start, _ in self.sessions(d)):
+            return d
+        d -= timedelta(days=1)
+        while not self.sessions(d):
+            d -= timedelta(days=1)
+        return d
+
+    def last_session_close(self, now=None):
+        """End of the latest session as a naive IST datetime."""
+        now = now if now else ist_now()
+        d = self.last_session_date(now)
+        return datetime.combine(d, max(end for _, end in self.sessions(d)))
+
+    def next_session_open(self, now=None):
+        now = now if now else ist_now()
+        d = now.date()
+        while True:
+            starts = [start for start, _ in self.sessions(d) if datetime.combine(d, start) > now]
+            if starts:
+                return datetime.combine(d, min(starts))
+            d += timedelta(days=1)
+
+    def session_stamp(self, now=None):
+        """
+        Date stamp for rows written at `now`: the session the data belongs to.
+        A run before the open, on a weekend or on a holiday is stamped with the
+        last traded session, not the calendar date.
+        """
+        return self._key(self.last_session_date(now))
+
+    def is_fresh(self, data_date, now=None):
+        """True when data stamped data_date ('YYYY-MM-DD', see session_stamp) covers the latest session."""
+        if not data_date:
+            return False
+        return str(data_date)[:10] >= self._key(self.last_session_date(now))
+
+    def cycle_due(self, latest_date, now=None):
+        """
+        Research cycles run while the market is live, and otherwise only to
+        catch up a session the database has not seen yet.
+        """
+        return self.is_market_open(now) or not self.is_fresh(latest_date, now)
+
+_calendar = None
+
+def get_market_calendar():
+    global _calendar
+    if _calendar is None:
+        _calendar = MarketCalendar()
+    return _calendar
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import pickle
+import random
+import hashlib
+import threading
+import yfinance as yf
+from stock_hub.config import BASE_DIR
+from stock_hub.metrics import metrics
+
+# Every upstream market-data call goes through the active provider:
+#   BROTHERHOOD_DATA_MODE=live    -> yfinance (default)
+#   BROTHERHOOD_DATA_MODE=record  -> yfinance, responses saved as fixtures
+#   BROTHERHOOD_DATA_MODE=replay  -> fixtures only, no network
+FIXTURE_DIR = os.environ.get("BROTHERHOOD_FIXTURES", os.path.join(BASE_DIR, "stock_hub", "data", "fixtures"))
+
+class ReplayMiss(LookupError):
+    pass
+
+class LiveProvider:
+    def call(self, method, symbol=None, **kwargs):
+        if method == "download":
+            return yf.download(**kwargs)
+        t = yf.Ticker(symbol)
+        if method == "history":
+            return t.history(**kwargs)
+        if method == "option_chain":
+            return t.option_chain(**kwargs)
+        if method in ("options", "news", "info"):
+            return getattr(t, method)
+        raise ValueError(f"Unknown market data method: {method}")
+
+def fixture_key(method, symbol, kwargs):
+    payload = json.dumps([method, symbol, sorted(kwargs.items())], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+class RecordingProvider(LiveProvider):
+    """Calls yfinance and pickles each response (or its exception) under FIXTURE_DIR."""
+    def __init__(self, fixture_dir=None):
+        self.fixture_dir = fixture_dir if fixture_dir else FIXTURE_DIR
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def call(self, method, symbol=None, **kwargs):
+        record = {"method": method, "symbol": symbol, "kwargs": kwargs, "recorded_at": time.time()}
+        try:
+            result = super().call(method, symbol, **kwargs)
+            record["result"] = result
+        except Exception as e:
+            record["error"] = repr(e)
+            raise
+        finally:
+            path = os.path.join(self.fixture_dir, fixture_key(method, symbol, kwargs) + ".pkl")
+            with self._lock:
+                with open(path, "wb") as f:
+                    pickle.dump(record, f)
+        return result
+
+class ReplayProvider:
+    """
+    Serves recorded fixtures with optional simulated latency (seconds, with
+    +/- jitter fraction) and a failure rate, seeded so runs are repeatable.
+    """
+    def __init__(self, fixture_dir=None, latency=0.0, jitter=0.0, failure_rate=0.0, seed=42):
+        self.fixture_dir = fixture_dir if fixture_dir else FIXTURE_DIR
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._loaded = {}
+
+    def _load(self, key):
+        if key not in self._loaded:
+            path = os.path.join(self.fixture_dir, key + ".pkl")
+            if not os.path.exists(path):
+                raise ReplayMiss(f"No fixture {key}")
+            with open(path, "rb") as f:
+                self._loaded[key] = pickle.load(f)
+        return self._loaded[key]
+
+    def call(self, method, symbol=None, **kwargs):
+        with self._lock:
+            roll = self._rng.random()
+            delay = self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter)) if self.latency else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.failure_rate:
+            raise ConnectionError(f"[REPLAY] Simulated upstream failure: {method} {symbol or ''}")
+
+        record = self._load(fixture_key(method, symbol, kwargs))
+        if "error" in record:
+            raise ConnectionError(f"[REPLAY] Recorded failure: {record['error']}")
+        return record["result"]
+
+def _provider_from_env():
+    mode = os.environ.get("BROTHERHOOD_DATA_MODE", "live").lower()
+    if mode == "record":
+        return RecordingProvider()
+    if mode == "replay":
+        return ReplayProvider(
+            latency=float(os.environ.get("BROTHERHOOD_REPLAY_LATENCY", 0)),
+            jitter=float(os.environ.get("BROTHERHOOD_REPLAY_JITTER", 0)),
+            failure_rate=float(os.environ.get("BROTHERHOOD_REPLAY_FAILURE_RATE", 0)),
+            seed=int(os.environ.get("BROTHERHOOD_REPLAY_SEED", 42))
+        )
+    return LiveProvider()
+
+_provider = None
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = _provider_from_env()
+    return _provider
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
+
+# --- yfinance-shaped facade used by the engines ---
+
+def _call(method, symbol=None, **kwargs):
+    with metrics.span(f"yf.{method}", kind="upstream"):
+        return get_provider().call(method, symbol, **kwargs)
+
+def download(tickers=None, **kwargs):
+    return _call("download", tickers=tickers, **kwargs)
+
+class Ticker:
+    """Drop-in for yf.Ticker covering the attributes the engines use."""
+    def __init__(self, symbol):
+        self.ticker = symbol
+
+    def history(self, **kwargs):
+        return _call("history", self.ticker, **kwargs)
+
+    def option_chain(self, date=None):
+        return _call("option_chain", self.ticker, date=date)
+
+    @property
+    def options(self):
+        return _call("options", self.ticker)
+
+    @property
+    def news(self):
+        return _call("news", self.ticker)
+
+    @property
+    def info(self):
+        return _call("info", self.ticker)
@@ -0,0 +1,185 @@
+import re
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from stock_hub.config import DB_PATH
+from stock_hub.market_calendar import ist_now
+from stock_hub.metrics import span
+
+# Long memory for the Oracle: an FTS5 index over past chat exchanges and the
+# Agent_Review / derivatives Reason text of every cycle. A question pulls the
+# best bm25 matches, re-ranked by age, so the prompt carries a handful of
+# relevant snippets however long the history grows.
+
+SEARCH_TIME_LIMIT_S = 0.25
+RECENCY_HALF_LIFE_DAYS = 30.0
+CANDIDATES = 200 # bm25 pool the recency re-rank chooses from
+
+# Canned fallbacks carry no information worth recalling
+_SKIP_TEXT = ("PENDING_AI", "Quant signals intact")
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "in", "on", "for", "and", "or",
+    "it", "this", "that", "what", "which", "who", "how", "why", "when", "should", "i", "me", "my",
+    "we", "you", "do", "does", "did", "can", "with", "at", "by", "from", "as", "about", "any", "now",
+}
+
+class MemoryIndex:
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else DB_PATH
+        self._lock = threading.Lock()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+                    Content, Kind UNINDEXED, Ticker UNINDEXED, Date UNINDEXED,
+                    tokenize = 'porter unicode61'
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_sync (
+                    Source TEXT PRIMARY KEY,
+                    Last_Date TEXT
+                )
+            """)
+
+    def sync_history(self):
+        """
+        Indexes the chat exchanges (user row, then assistant row) of the history
+        table past the id watermark. The first sync backfills every exchange
+        stored before the index existed.
+        """
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT Last_Date FROM memory_sync WHERE Source = 'history'").fetchone()
+            since = int(row[0]) if row else 0
+            try:
+                top = conn.execute("SELECT MAX(id) FROM history").fetchone()[0] or 0
+                if top < since:
+                    since = 0 # purged: ids restart from 1
+                rows = conn.execute("SELECT id, role, content, timestamp FROM history WHERE id > ? ORDER BY id",
+                                    (since,)).fetchall()
+            except sqlite3.OperationalError:
+                return 0 # history table not created yet
+            if not row:
+                conn.execute("DELETE FROM memory_fts WHERE Kind = 'chat'")
+            exchanges, last, question = [], since, None
+            for id_, role, content, ts in rows:
+                if role == "user":
+                    question = content
+                elif role == "assistant" and question is not None:
+                    exchanges.append((f"Q: {question}\nA: {content}", _history_time(ts)))
+                    question, last = None, id_
+            conn.executemany("INSERT INTO memory_fts (Content, Kind, Ticker, Date) VALUES (?, 'chat', '', ?)", exchanges)
+            # A trailing unanswered question is picked up with its answer next time
+            if last != since or not row:
+                conn.execute("INSERT OR REPLACE INTO memory_sync (Source, Last_Date) VALUES ('history', ?)", (str(last),))
+        return len(exchanges)
+
+    def _sync_source(self, conn, source, query):
+        """Indexes rows of dates >= the watermark; that date is re-indexed since cycles rewrite it."""
+        row = conn.execute("SELECT Last_Date FROM memory_sync WHERE Source = ?", (source,)).fetchone()
+        since = row[0] if row else ""
+        try:
+            rows = conn.execute(query, (since,)).fetchall()
+        except sqlite3.OperationalError:
+            return 0 # source table not created yet
+        rows = [r for r in rows if r[2] and not any(s in r[2] for s in _SKIP_TEXT)]
+        conn.execute("DELETE FROM memory_fts WHERE Kind = ? AND Date >= ?", (source, since))
+        conn.executemany("INSERT INTO memory_fts (Content, Kind, Ticker, Date) VALUES (?, ?, ?, ?)",
+                         [(f"{ticker} {action}: {text}", source, ticker, date) for date, ticker, text, action in rows])
+        if rows:
+            conn.execute("INSERT OR REPLACE INTO memory_sync (Source, Last_Date) VALUES (?, ?)",
+                         (source, max(r[0] for r in rows)))
+        return len(rows)
+
+    def sync_reviews(self):
+        """Incremental: only the latest stored dates are (re)indexed."""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            n = self._sync_source(conn, "review",
+                "SELECT Date, Ticker, Agent_Review, Decision FROM processed_watchlist WHERE Date >= ?")
+            n += self._sync_source(conn, "derivatives",
+                "SELECT Date, Ticker, Reason, Action FROM derivatives WHERE Date >= ?")
+        print(f"[MEMORY] Indexed {n} review rows")
+        return n
+
+    @staticmethod
+    def _match_query(text):
+        terms = [t for t in re.findall(r"[A-Za-z0-9]+", text.lower()) if t not in _STOPWORDS and len(t) > 1]
+        return " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+    def search(self, question, k=5, kinds=None, time_limit=SEARCH_TIME_LIMIT_S):
+        """
+        Top-k (kind, ticker, date, content) for a question. bm25 picks the
+        candidates; each is discounted by age with a RECENCY_HALF_LIFE_DAYS half-life.
+        """
+        match = self._match_query(question)
+        if not match:
+            return []
+        query = "SELECT Kind, Ticker, Date, Content, bm25(memory_fts) FROM memory_fts WHERE memory_fts MATCH ?"
+        params = [match]
+        if kinds:
+            query += f" AND Kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        query += " ORDER BY rank LIMIT ?"
+        params.append(CANDIDATES)
+
+        deadline = time.monotonic() + time_limit
+        conn = sqlite3.connect(self.db_path)
+        conn.set_progress_handler(lambda: int(time.monotonic() > deadline), 1000)
+        try:
+            with span("memory.search"):
+                rows = conn.execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            # Out of time (or no index yet): answer without memory
+            print(f"[MEMORY] Search skipped: {e}")
+            return []
+        finally:
+            conn.close()
+
+        today = ist_now()
+        def score(row):
+            try:
+                age = max((today - _parse_date(row[2])).days, 0)
+            except ValueError:
+                age = 0
+            # bm25 is negative (more negative = better); decay shrinks it toward 0
+            return row[4] * 0.5 ** (age / RECENCY_HALF_LIFE_DAYS)
+        rows.sort(key=score)
+        return [r[:4] for r in rows[:k]]
+
+    def context(self, question, k=5, max_chars=1500):
+        """Prompt block of the most relevant past exchanges and reviews."""
+        lines, used = [], 0
+        for kind, ticker, date, content in self.search(question, k):
+            line = f"[{kind} {date[:10]}] {content}".replace("\n", " ")
+            line = line[:400]
+            if used + len(line) > max_chars: break
+            lines.append(line)
+            used += len(line)
+        return "\n".join(lines)
+
+    def forget(self, kind=None):
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            if kind:
+                conn.execute("DELETE FROM memory_fts WHERE Kind = ?", (kind,))
+                conn.execute("DELETE FROM memory_sync WHERE Source = ?", (kind,))
+            else:
+                conn.execute("DELETE FROM memory_fts")
+                conn.execute("DELETE FROM memory_sync")
+
+def _parse_date(text):
+    return datetime.strptime(text[:10], "%Y-%m-%d")
+
+def _history_time(ts):
+    """history.timestamp is SQLite CURRENT_TIMESTAMP (UTC) -> IST, like every other Date in the index."""
+    try:
+        return (datetime.strptime(ts[:19], "%Y-%m-%d %H:%M:%S") + timedelta(hours=5, minutes=30)).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return ist_now().strftime("%Y-%m-%d %H:%M:%S")
+
+_index = None
+
+def get_memory_index():
+    global _index
+    if _index is None:
+        _index = MemoryIndex()
+    return _index
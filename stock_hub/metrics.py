@@ -0,0 +1,109 @@
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from stock_hub.config import DB_PATH
+
+# Cycle instrumentation: spans around stages / upstream calls and plain
+# counters (retries, failures, cache hits), aggregated in memory and flushed
+# once per cycle to the cycle_metrics table.
+# BROTHERHOOD_METRICS=0 turns every call below into a no-op.
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("rec", "kind", "name", "t0")
+
+    def __init__(self, rec, kind, name):
+        self.rec = rec
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.rec._observe(self.kind, self.name, (time.perf_counter() - self.t0) * 1000, exc_type is not None)
+        return False
+
+class MetricsRecorder:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.cycle_id = None
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def start_cycle(self):
+        ist_now = datetime.utcnow() + timedelta(hours=5, minutes=30)
+        self.cycle_id = ist_now.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._stats = {}
+
+    def span(self, name, kind="stage"):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, kind, name)
+
+    def count(self, name, n=1, kind="counter"):
+        if not self.enabled:
+            return
+        with self._lock:
+            st = self._stats.setdefault((kind, name), [0, 0.0, 0.0, 0])
+            st[0] += n
+
+    def _observe(self, kind, name, ms, failed):
+        with self._lock:
+            # [calls, total_ms, max_ms, failures]
+            st = self._stats.setdefault((kind, name), [0, 0.0, 0.0, 0])
+            st[0] += 1
+            st[1] += ms
+            if ms > st[2]: st[2] = ms
+            if failed: st[3] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {k: list(v) for k, v in self._stats.items()}
+
+    def flush(self, db_path=None):
+        if not self.enabled or not self._stats:
+            return
+        db_path = db_path if db_path else DB_PATH
+        cycle_id = self.cycle_id if self.cycle_id else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [(cycle_id, kind, name, st[0], round(st[1], 2), round(st[2], 2), st[3])
+                for (kind, name), st in self.snapshot().items()]
+        try:
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cycle_metrics (
+                        Cycle_Id TEXT,
+                        Kind TEXT,
+                        Name TEXT,
+                        Calls INTEGER,
+                        Total_Ms REAL,
+                        Max_Ms REAL,
+                        Failures INTEGER,
+                        PRIMARY KEY (Cycle_Id, Kind, Name)
+                    )
+                """)
+                conn.executemany("""
+                    INSERT OR REPLACE INTO cycle_metrics (Cycle_Id, Kind, Name, Calls, Total_Ms, Max_Ms, Failures)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+        except Exception as e:
+            print(f"[METRICS] Flush failed: {e}")
+
+metrics = MetricsRecorder(enabled=os.environ.get("BROTHERHOOD_METRICS", "1") != "0")
+
+def span(name, kind="stage"):
+    return metrics.span(name, kind)
+
+def count(name, n=1):
+    metrics.count(name, n)
@@ -0,0 +1,197 @@
+import re
+import sqlite3
+import hashlib
+import threading
+import concurrent.futures
+from datetime import datetime, timedelta
+from stock_hub import market_data as md
+from stock_hub.config import DB_PATH
+from stock_hub.market_calendar import ist_now
+from stock_hub.metrics import span, count
+
+# Headlines for the whole watchlist in one concurrent batch. Items are stored
+# once per (ticker, url-or-title) and a ticker is only re-fetched after its
+# TTL, so repeated cycles in a day read SQLite instead of the network.
+# Sentiment is a finance lexicon score per headline, aggregated per symbol
+# with a recency decay.
+
+NEWS_TTL_MINUTES = 120
+RETENTION_DAYS = 14
+HALF_LIFE_HOURS = 24.0
+MAX_WORKERS = 16
+OFFLINE_TEXT = "Pure Technical Analysis - Data Source Offline"
+
+# Finance-tuned lexicon (weights in [-1, 1]) keyed by base form; see _word_score
+LEXICON = {
+    "surge": 0.8, "soar": 0.8, "jump": 0.6, "rally": 0.7, "gain": 0.5, "rise": 0.4, "climb": 0.5,
+    "beat": 0.6, "record": 0.4, "upgrade": 0.7, "outperform": 0.6, "profit": 0.5, "growth": 0.5,
+    "strong": 0.5, "bullish": 0.7, "expand": 0.4, "expansion": 0.4, "boost": 0.5, "approve": 0.5,
+    "approval": 0.5, "dividend": 0.3, "recover": 0.4, "recovery": 0.4, "robust": 0.5, "buyback": 0.4,
+    "plunge": -0.8, "crash": -0.9, "slump": -0.7, "fall": -0.4, "drop": -0.4, "decline": -0.5,
+    "slip": -0.3, "tumble": -0.7, "downgrade": -0.7, "underperform": -0.6, "loss": -0.6,
+    "weak": -0.5, "bearish": -0.7, "probe": -0.6, "fraud": -0.9, "penalty": -0.6, "default": -0.8,
+    "lawsuit": -0.6, "resign": -0.5, "resignation": -0.5, "concern": -0.4, "warn": -0.5,
+    "warning": -0.5, "pressure": -0.3, "raid": -0.7, "ban": -0.6, "selloff": -0.6, "slowdown": -0.5,
+}
+NEGATIONS = {"not", "no", "never", "without", "fails", "failed"}
+_TOKEN = re.compile(r"[a-z]+")
+_SUFFIXES = ("ing", "ed", "es", "s", "d")
+_WORD_CACHE = {}
+
+def _word_score(word):
+    """Exact lexicon hit, else the word with one inflection suffix stripped (surges, plunged, rising)."""
+    if word not in _WORD_CACHE:
+        score = LEXICON.get(word, 0.0)
+        if not score:
+            for suffix in _SUFFIXES:
+                if word.endswith(suffix) and len(word) > len(suffix) + 2:
+                    base = word[:-len(suffix)]
+                    score = LEXICON.get(base) or LEXICON.get(base + "e") or 0.0
+                    if score: break
+        _WORD_CACHE[word] = score
+    return _WORD_CACHE[word]
+
+def score_headlines(titles):
+    """Lexicon sentiment in [-1, 1] for each title; a negation flips the next two words."""
+    scores = []
+    for title in titles:
+        total, hits, flip = 0.0, 0, 0
+        for word in _TOKEN.findall(title.lower()):
+            if word in NEGATIONS:
+                flip = 2
+                continue
+            w = _word_score(word)
+            if w:
+                total += -w if flip else w
+                hits += 1
+            flip = max(flip - 1, 0)
+        scores.append(round(max(-1.0, min(1.0, total / hits ** 0.5)), 3) if hits else 0.0)
+    return scores
+
+def parse_news(raw):
+    """yfinance news (legacy flat or newer {'content': {...}} items) -> [(title, url, publisher, published)]."""
+    items = []
+    for n in raw or []:
+        c = n.get('content', n) if isinstance(n, dict) else {}
+        title = (c.get('title') or "").strip()
+        if not title: continue
+        url = c.get('link') or (c.get('canonicalUrl') or {}).get('url') or (c.get('clickThroughUrl') or {}).get('url') or ""
+        publisher = c.get('publisher') or (c.get('provider') or {}).get('displayName') or ""
+        published = c.get('pubDate') or c.get('displayTime') or ""
+        if not published and c.get('providerPublishTime'):
+            published = datetime.utcfromtimestamp(c['providerPublishTime']).strftime("%Y-%m-%dT%H:%M:%SZ")
+        items.append((title, url, publisher, published[:19].replace("T", " ")))
+    return items
+
+def _dedupe_key(title, url):
+    basis = url.split("?")[0].lower() if url else re.sub(r"\W+", " ", title.lower()).strip()
+    return hashlib.sha1(basis.encode()).hexdigest()[:16]
+
+class NewsEngine:
+    def __init__(self, db_path=None, ttl_minutes=NEWS_TTL_MINUTES):
+        self.db_path = db_path if db_path else DB_PATH
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self._lock = threading.Lock()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS news_items (
+                    Ticker TEXT,
+                    Item_Key TEXT,
+                    Title TEXT,
+                    Url TEXT,
+                    Publisher TEXT,
+                    Published_At TEXT,
+                    Fetched_At TEXT,
+                    Sentiment REAL,
+                    PRIMARY KEY (Ticker, Item_Key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS news_fetch_log (
+                    Ticker TEXT PRIMARY KEY,
+                    Fetched_At TEXT
+                )
+            """)
+
+    def _stale(self, symbols, now):
+        cutoff = (now - self.ttl).strftime("%Y-%m-%d %H:%M:%S")
+        with sqlite3.connect(self.db_path) as conn:
+            fresh = {r[0] for r in conn.execute(
+                f"SELECT Ticker FROM news_fetch_log WHERE Fetched_At >= ? AND Ticker IN ({', '.join('?' * len(symbols))})",
+                [cutoff] + list(symbols))}
+        return [s for s in symbols if s not in fresh]
+
+    @staticmethod
+    def _fetch(symbol):
+        try:
+            with span("news.fetch", kind="upstream"):
+                return symbol, parse_news(md.Ticker(symbol).news), True
+        except Exception:
+            count("failure.news")
+            return symbol, [], False
+
+    def refresh(self, symbols, max_workers=MAX_WORKERS):
+        """Fetches every symbol whose TTL expired, concurrently; the rest come from SQLite."""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return 0
+        now = ist_now()
+        stale = self._stale(symbols, now)
+        count("cache_hit.news", len(symbols) - len(stale))
+        if not stale:
+            return 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as executor:
+            results = list(executor.map(self._fetch, stale))
+
+        # Undated items are stamped with the fetch time (UTC, like yfinance pubDate)
+        utc_now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [(sym, _dedupe_key(t, u), t, u, p, pub or utc_now) for sym, items, _ in results for t, u, p, pub in items]
+        scores = score_headlines([r[2] for r in rows])
+        ts = now.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO news_items (Ticker, Item_Key, Title, Url, Publisher, Published_At, Fetched_At, Sentiment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [r + (ts, s) for r, s in zip(rows, scores)])
+            # A failed fetch is not cached, so the next cycle retries it
+            conn.executemany("INSERT OR REPLACE INTO news_fetch_log (Ticker, Fetched_At) VALUES (?, ?)",
+                             [(sym, ts) for sym, _, ok in results if ok])
+            conn.execute("DELETE FROM news_items WHERE Fetched_At < ?",
+                         ((now - timedelta(days=RETENTION_DAYS)).strftime("%Y-%m-%d %H:%M:%S"),))
+        print(f"[NEWS] {len(stale)}/{len(symbols)} symbols fetched | {len(rows)} headlines")
+        return len(stale)
+
+    def sentiment(self, symbols):
+        """{symbol: {'score', 'count', 'headline'}}: recency-weighted mean over stored headlines."""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(f"""
+                SELECT Ticker, Title, Published_At, Sentiment FROM news_items
+                WHERE Ticker IN ({', '.join('?' * len(symbols))})
+            """, symbols).fetchall()
+        now = datetime.utcnow()
+        out = {}
+        for ticker, title, published, score in rows:
+            try:
+                age_h = max((now - datetime.strptime(published[:19], "%Y-%m-%d %H:%M:%S")).total_seconds() / 3600, 0)
+            except ValueError:
+                age_h = 0.0
+            w = 0.5 ** (age_h / HALF_LIFE_HOURS)
+            agg = out.setdefault(ticker, {"wsum": 0.0, "w": 0.0, "count": 0, "headline": title, "newest": published})
+            agg["wsum"] += w * score
+            agg["w"] += w
+            agg["count"] += 1
+            if published > agg["newest"]:
+                agg["newest"], agg["headline"] = published, title
+        return {t: {"score": round(a["wsum"] / a["w"], 3) if a["w"] else 0.0, "count": a["count"], "headline": a["headline"]}
+                for t, a in out.items()}
+
+    def summary_text(self, sentiment, symbol):
+        """One-line news note for the watchlist Reason field."""
+        s = sentiment.get(symbol)
+        if not s:
+            return OFFLINE_TEXT
+        tone = "Positive" if s["score"] > 0.15 else "Negative" if s["score"] < -0.15 else "Neutral"
+        return f"News {tone} ({s['score']:+.2f}, {s['count']} items): {s['headline']}"
@@ -0,0 +1,172 @@
+import threading
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from stock_hub.bar_engine import get_bar_store, to_market_tz, SESSION_OPEN, SESSION_LAST_BAR
+
+SESSION_MINUTES = 375 # 09:15 -> 15:30
+
+class _SessionRange:
+    """
+    Running state for one symbol's current session. highs/lows/vols are
+    prefix arrays indexed by minute offset from 09:15, so the ORB for any
+    window is a single lookup. Minutes before the first print have no range
+    (NaN) and no volume.
+    """
+    __slots__ = ("date", "open", "last", "last_ts", "highs", "lows", "vols")
+
+    def __init__(self, date, open_price):
+        self.date = date
+        self.open = open_price
+        self.last = open_price
+        self.last_ts = None
+        self.highs = []
+        self.lows = []
+        self.vols = []
+
+    def add_bar(self, offset, high, low, close, volume):
+        # First print after 09:15 (late start, auction halt): keep index == offset
+        if not self.highs and offset > 0:
+            self.highs.extend([np.nan] * offset)
+            self.lows.extend([np.nan] * offset)
+            self.vols.extend([0.0] * offset)
+        # Carry running values forward over minutes with no prints
+        if self.highs:
+            while len(self.highs) < offset:
+                self.highs.append(self.highs[-1])
+                self.lows.append(self.lows[-1])
+                self.vols.append(self.vols[-1])
+            high = max(high, self.highs[-1]) # NaN padding never wins
+            low = min(low, self.lows[-1])
+            volume = volume + self.vols[-1]
+        self.highs.append(high)
+        self.lows.append(low)
+        self.vols.append(volume)
+        self.last = close
+
+    def at(self, arr, window):
+        if not arr: return np.nan
+        return arr[min(window, len(arr)) - 1]
+
+class OpeningRangeMonitor:
+    """
+    Tracks price vs session open, opening-range high/low and relative volume
+    per symbol, fed incrementally from 1-minute bars (live download or the
+    BarStore). Strong/weak tables for any window are built from the running
+    state with no extra download.
+    """
+    def __init__(self, store=None, rvol_sessions=10):
+        self.store = store if store else get_bar_store()
+        self.rvol_sessions = rvol_sessions
+        self.sessions = {}
+        self._rvol_base = {}
+        self._lock = threading.Lock()
+
+    def update(self, frames):
+        """frames: {symbol: 1m OHLCV DataFrame}. Only bars newer than the last one seen are applied."""
+        with self._lock:
+            for symbol, df in frames.items():
+                if df is None or df.empty: continue
+                df = to_market_tz(df).between_time(SESSION_OPEN, SESSION_LAST_BAR)
+                if df.empty: continue
+
+                day = df.index[-1].normalize()
+                df = df[df.index >= day]
+                st = self.sessions.get(symbol)
+                if st is None or st.date != day:
+                    st = _SessionRange(day, float(df['Open'].iloc[0]))
+                    self.sessions[symbol] = st
+                if st.last_ts is not None:
+                    df = df[df.index > st.last_ts]
+                if df.empty: continue
+
+                session_start = day + timedelta(hours=9, minutes=15)
+                offsets = ((df.index - session_start).total_seconds() // 60).astype(int)
+                vols = df['Volume'].fillna(0).values if 'Volume' in df.columns else np.zeros(len(df))
+                for off, h, l, c, v in zip(offsets, df['High'].values, df['Low'].values, df['Close'].values, vols):
+                    st.add_bar(off, float(h), float(l), float(c), float(v))
+                st.last_ts = df.index[-1]
+
+    def update_from_store(self, symbols):
+        """Pulls only the new minute bars from the local BarStore."""
+        frames = {}
+        for symbol in symbols:
+            st = self.sessions.get(symbol)
+            since = st.last_ts.strftime("%Y-%m-%d %H:%M:%S") if st is not None and st.last_ts is not None else None
+            if since is None:
+                bars = self.store.load_minute_bars(symbol)
+                if not bars.empty:
+                    bars = bars[bars.index >= bars.index[-1].normalize()]
+            else:
+                bars = self.store.load_minute_bars(symbol, since=since)
+            frames[symbol] = bars
+        self.update(frames)
+
+    def _rvol_baseline(self, symbol, day):
+        """Mean cumulative volume per minute offset over the prior sessions (cached per day)."""
+        key = (symbol, day)
+        if key in self._rvol_base:
+            return self._rvol_base[key]
+
+        base = None
+        try:
+            bars = self.store.load_minute_bars(symbol)
+            bars = bars[bars.index < day].between_time(SESSION_OPEN, SESSION_LAST_BAR)
+            if not bars.empty:
+                offsets = (bars.index.hour * 60 + bars.index.minute) - (9 * 60 + 15)
+                grid = pd.DataFrame({"d": bars.index.normalize(), "o": offsets, "v": bars['Volume'].values})
+                grid = grid.pivot_table(index="d", columns="o", values="v", aggfunc="sum")
+                grid = grid.reindex(columns=range(SESSION_MINUTES)).fillna(0).tail(self.rvol_sessions)
+                base = grid.cumsum(axis=1).mean().values
+        except Exception as e:
+            print(f"[ORB] RVol baseline unavailable for {symbol}: {e}")
+        self._rvol_base[key] = base
+        return base
+
+    def snapshot(self, window=10):
+        """One row per symbol for the first `window` minutes of the session."""
+        rows = []
+        with self._lock:
+            items = list(self.sessions.items())
+        for symbol, st in items:
+            if not st.highs: continue
+            orb_high = st.at(st.highs, window)
+            orb_low = st.at(st.lows, window)
+            cum_vol = st.at(st.vols, window)
+            base = self._rvol_baseline(symbol, st.date)
+            span = min(window, len(st.vols))
+            rvol = round(cum_vol / base[span - 1], 2) if base is not None and base[span - 1] > 0 else np.nan
+
+            if np.isnan(orb_high): orb_state = "No ORB" # no prints inside the window
+            elif st.last > orb_high: orb_state = "Above ORB"
+            elif st.last < orb_low: orb_state = "Below ORB"
+            else: orb_state = "Inside ORB"
+
+            rows.append({
+                "Symbol": symbol.replace(".NS", ""),
+                "Open": round(st.open, 2),
+                "LTP": round(st.last, 2),
+                "Change vs Open %": round((st.last - st.open) / st.open * 100, 2) if st.open else 0.0,
+                "ORB High": round(orb_high, 2),
+                "ORB Low": round(orb_low, 2),
+                "RVol": rvol,
+                "ORB": orb_state
+            })
+        return pd.DataFrame(rows)
+
+    def strength_tables(self, window=10):
+        """(strong_df, weak_df) as expected by stock_analysis.send_email."""
+        df = self.snapshot(window)
+        if df.empty:
+            return df, df
+        strong = df[df["LTP"] > df["Open"]].sort_values("Change vs Open %", ascending=False)
+        weak = df[df["LTP"] < df["Open"]].sort_values("Change vs Open %")
+        return strong.reset_index(drop=True), weak.reset_index(drop=True)
+
+_monitor = None
+
+def get_opening_range_monitor():
+    global _monitor
+    if _monitor is None:
+        _monitor = OpeningRangeMonitor()
+    return _monitor
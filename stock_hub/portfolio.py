@@ -0,0 +1,232 @@
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from stock_hub.config import DB_PATH
+from stock_hub.universe import get_sector_map
+from stock_hub.quant_tools import QuantTools
+from stock_hub.market_calendar import ist_now
+
+# Transactions are the source of truth; portfolio_positions is the running
+# average-cost book derived from them, updated in the same DB transaction.
+# Valuation works on aligned NumPy arrays so a price tick only touches the
+# positions whose price moved.
+
+ATR_STOP_MULTIPLE = 1.5 # same stop as QuantTools.calculate_dynamic_sl
+
+class PortfolioValuation:
+    """
+    Mark-to-market state for a fixed set of positions. apply_prices() updates
+    only changed symbols and keeps totals / sector sums current by deltas.
+    """
+    def __init__(self, positions, sectors=None, atr=None, closed_realized=0.0):
+        self.tickers = positions['Ticker'].tolist()
+        self._idx = {t: i for i, t in enumerate(self.tickers)}
+        self.qty = positions['Quantity'].to_numpy(float)
+        self.avg_cost = positions['Avg_Cost'].to_numpy(float)
+        self.realized = positions['Realized_PnL'].to_numpy(float)
+        # Fully closed positions are not in the book but their P&L still counts
+        self.closed_realized = float(closed_realized)
+        self.cost = self.qty * self.avg_cost
+        sectors = sectors or {}
+        self.sector = np.array([sectors.get(t, "Unclassified") for t in self.tickers], dtype=object)
+        self.sector_names, self._sector_code = np.unique(self.sector, return_inverse=True) if len(self.tickers) else (np.array([]), np.array([], int))
+        atr = atr if atr is not None else {}
+        self.atr = np.array([atr.get(t, np.nan) for t in self.tickers], dtype=float)
+
+        # Until a price arrives a position is carried at cost
+        self.price = self.avg_cost.copy()
+        self.priced = np.zeros(len(self.tickers), dtype=bool)
+        self.market_value = self.qty * self.price
+        self.total_value = self.market_value.sum()
+        self.sector_value = np.bincount(self._sector_code, weights=self.market_value, minlength=len(self.sector_names))
+
+    def apply_prices(self, prices):
+        """prices: {ticker: price} or Series. Returns the number of positions revalued."""
+        prices = pd.Series(prices, dtype=float).dropna()
+        idx = np.fromiter((self._idx.get(t, -1) for t in prices.index), dtype=int, count=len(prices))
+        keep = idx >= 0
+        if not keep.any():
+            return 0
+        idx, new_price = idx[keep], prices.to_numpy()[keep]
+        new_value = self.qty[idx] * new_price
+        delta = new_value - self.market_value[idx]
+        self.total_value += delta.sum()
+        np.add.at(self.sector_value, self._sector_code[idx], delta)
+        self.price[idx] = new_price
+        self.market_value[idx] = new_value
+        self.priced[idx] = True
+        return len(idx)
+
+    def frame(self):
+        unrealized = self.market_value - self.cost
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pnl_pct = np.where(self.cost != 0, unrealized / self.cost * 100, 0.0)
+            weight = self.market_value / self.total_value * 100 if self.total_value else np.zeros_like(self.market_value)
+        atr_risk = self.qty * self.atr * ATR_STOP_MULTIPLE
+        return pd.DataFrame({
+            "Ticker": self.tickers,
+            "Sector": self.sector,
+            "Quantity": self.qty,
+            "Avg_Cost": np.round(self.avg_cost, 2),
+            "LTP": np.round(self.price, 2),
+            "Market_Value": np.round(self.market_value, 2),
+            "Unrealized_PnL": np.round(unrealized, 2),
+            "PnL_Pct": np.round(pnl_pct, 2),
+            "Realized_PnL": np.round(self.realized, 2),
+            "Weight_Pct": np.round(weight, 2),
+            "ATR": np.round(self.atr, 2),
+            "ATR_Stop": np.round(self.price - ATR_STOP_MULTIPLE * self.atr, 2),
+            "Risk_To_Stop": np.round(atr_risk, 2),
+            "Live": self.priced
+        })
+
+    def summary(self):
+        cost = self.cost.sum()
+        unrealized = self.total_value - cost
+        risk = np.nansum(self.qty * self.atr * ATR_STOP_MULTIPLE)
+        return {
+            "positions": len(self.tickers),
+            "market_value": round(float(self.total_value), 2),
+            "invested": round(float(cost), 2),
+            "unrealized_pnl": round(float(unrealized), 2),
+            "unrealized_pct": round(float(unrealized / cost * 100), 2) if cost else 0.0,
+            "realized_pnl": round(float(self.realized.sum() + self.closed_realized), 2),
+            "atr_risk": round(float(risk), 2),
+            "atr_risk_pct": round(float(risk / self.total_value * 100), 2) if self.total_value else 0.0,
+            "sector_exposure": {s: round(float(v), 2) for s, v in zip(self.sector_names, self.sector_value)}
+        }
+
+class PortfolioManager:
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else DB_PATH
+        self._lock = threading.Lock()
+        self._valuation = None
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS portfolio_transactions (
+                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Timestamp TEXT,
+                    Ticker TEXT,
+                    Side TEXT CHECK (Side IN ('BUY', 'SELL')),
+                    Quantity REAL,
+                    Price REAL,
+                    Fees REAL DEFAULT 0,
+                    Note TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS portfolio_positions (
+                    Ticker TEXT PRIMARY KEY,
+                    Quantity REAL,
+                    Avg_Cost REAL,
+                    Realized_PnL REAL,
+                    Updated_At TEXT
+                )
+            """)
+
+    @staticmethod
+    def _apply(position, side, qty, price, fees):
+        """Average-cost book update: (quantity, avg_cost, realized) -> new tuple."""
+        held, avg, realized = position
+        if side == "BUY":
+            new_qty = held + qty
+            avg = (held * avg + qty * price + fees) / new_qty
+            return new_qty, avg, realized
+        if qty > held + 1e-9:
+            raise ValueError(f"Cannot sell {qty}: only {held} held")
+        realized += qty * (price - avg) - fees
+        held -= qty
+        return held, (avg if held > 1e-9 else 0.0), realized
+
+    def record_transaction(self, ticker, side, quantity, price, fees=0.0, note="", timestamp=None):
+        side = side.upper()
+        if side not in ("BUY", "SELL"):
+            raise ValueError(f"Unknown side: {side}")
+        if quantity <= 0 or price <= 0:
+            raise ValueError("Quantity and price must be positive")
+        ts = timestamp if timestamp else ist_now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT Quantity, Avg_Cost, Realized_PnL FROM portfolio_positions WHERE Ticker = ?", (ticker,)).fetchone()
+            qty, avg, realized = self._apply(row if row else (0.0, 0.0, 0.0), side, float(quantity), float(price), float(fees))
+            conn.execute("""
+                INSERT INTO portfolio_transactions (Timestamp, Ticker, Side, Quantity, Price, Fees, Note)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (ts, ticker, side, quantity, price, fees, note))
+            conn.execute("""
+                INSERT OR REPLACE INTO portfolio_positions (Ticker, Quantity, Avg_Cost, Realized_PnL, Updated_At)
+                VALUES (?, ?, ?, ?, ?)
+            """, (ticker, qty, avg, realized, ts))
+            # Position set changed: the next valuation rebuilds its arrays
+            self._valuation = None
+
+    def rebuild_positions(self):
+        """Replays every transaction into portfolio_positions (repair / audit)."""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            txs = conn.execute("SELECT Ticker, Side, Quantity, Price, Fees, Timestamp FROM portfolio_transactions ORDER BY Timestamp, Id").fetchall()
+            book = {}
+            for ticker, side, qty, price, fees, ts in txs:
+                pos = book.get(ticker, (0.0, 0.0, 0.0, ts))
+                book[ticker] = self._apply(pos[:3], side, qty, price, fees or 0.0) + (ts,)
+            conn.execute("DELETE FROM portfolio_positions")
+            conn.executemany("""
+                INSERT INTO portfolio_positions (Ticker, Quantity, Avg_Cost, Realized_PnL, Updated_At)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(t,) + v for t, v in book.items()])
+            self._valuation = None
+
+    def positions(self, include_closed=False):
+        query = "SELECT Ticker, Quantity, Avg_Cost, Realized_PnL FROM portfolio_positions"
+        if not include_closed:
+            query += " WHERE Quantity > 0"
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql(query + " ORDER BY Ticker", conn)
+
+    def transactions(self, limit=100):
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql("SELECT * FROM portfolio_transactions ORDER BY Id DESC LIMIT ?", conn, params=(limit,))
+
+    def _atr(self, tickers):
+        from stock_hub.bar_engine import fetch_price_panel
+        try:
+            panel = fetch_price_panel(tickers, period="60d")
+            if panel and not panel['Close'].empty:
+                return QuantTools.panel_atr(panel).to_dict()
+        except Exception as e:
+            print(f"[PORTFOLIO] ATR panel unavailable: {e}")
+        return {}
+
+    def valuation(self, prices=None):
+        """
+        Marks every open position to market. prices defaults to one batched
+        fetch_live_prices call; repeat calls reuse the arrays and only apply the
+        new prices.
+        """
+        with self._lock:
+            val = self._valuation
+        if val is None:
+            book = self.positions(include_closed=True)
+            is_open = book['Quantity'] > 0
+            pos = book[is_open].reset_index(drop=True)
+            tickers = pos['Ticker'].tolist()
+            val = PortfolioValuation(pos, get_sector_map(), self._atr(tickers) if tickers else {},
+                                     closed_realized=book.loc[~is_open, 'Realized_PnL'].sum())
+            with self._lock:
+                self._valuation = val
+        if val.tickers:
+            if prices is None:
+                from stock_hub.stock_analysis import fetch_live_prices
+                prices = fetch_live_prices(val.tickers)
+            val.apply_prices(prices)
+        return val
+
+_manager = None
+
+def get_portfolio_manager():
+    global _manager
+    if _manager is None:
+        _manager = PortfolioManager()
+    return _manager
@@ -1,10 +1,64 @@
-import yfinance as yf
+import sqlite3
+from stock_hub import market_data as md
+from stock_hub.config import DB_PATH
+from stock_hub.market_calendar import get_market_calendar, ist_now
+from stock_hub.metrics import count
+from stock_hub.change_feed import publish
+
+def _init_pulse_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS market_pulse (
+            Ticker TEXT PRIMARY KEY,
+            Name TEXT,
+            Value REAL,
+            Delta_Val REAL,
+            Delta_Pct REAL,
+            Timestamp TEXT
+        )
+    """)
+
+def load_pulse_snapshot(since, db_path=None):
+    """Stored pulse rows, if all of them were fetched at/after since ('YYYY-MM-DD HH:MM:SS')."""
+    try:
+        with sqlite3.connect(db_path if db_path else DB_PATH) as conn:
+            _init_pulse_table(conn)
+            rows = conn.execute("SELECT Ticker, Name, Value, Delta_Val, Delta_Pct, Timestamp FROM market_pulse").fetchall()
+    except Exception as e:
+        print(f"[PULSE] Snapshot read failed: {e}")
+        return []
+    if not rows or min(r[5] for r in rows) < since:
+        return []
+    return [{"symbol": r[0], "name": r[1], "value": r[2], "delta_val": r[3], "delta_pct": r[4]} for r in rows]
+
+def save_pulse_snapshot(results, db_path=None):
+    ts = ist_now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with sqlite3.connect(db_path if db_path else DB_PATH) as conn:
+            _init_pulse_table(conn)
+            conn.executemany("""
+                INSERT OR REPLACE INTO market_pulse (Ticker, Name, Value, Delta_Val, Delta_Pct, Timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(r['symbol'], r['name'], r['value'], r['delta_val'], r['delta_pct'], ts) for r in results])
+    except Exception as e:
+        print(f"[PULSE] Snapshot write failed: {e}")
+        return
+    publish("pulse", results)
 
 def fetch_market_pulse_standalone():
     """
     Decoupled Pulse Engine to resolve Streamlit Cloud caching issues.
     Returns absolute values for price and points delta.
+    While the market is shut, the snapshot taken after the last session's
+    close is served with no upstream calls.
     """
+    calendar = get_market_calendar()
+    market_open = calendar.is_market_open()
+    if not market_open:
+        cached = load_pulse_snapshot(calendar.last_session_close().strftime("%Y-%m-%d %H:%M:%S"))
+        if cached:
+            count("cache_hit.pulse")
+            return cached
+
     indices = {
         "^NSEI": "Nifty 50",
         "^NSEBANK": "Bank Nifty",
@@ -13,7 +67,7 @@ def fetch_market_pulse_standalone():
     results = []
     for ticker, name in indices.items():
         try:
-            t = yf.Ticker(ticker)
+            t = md.Ticker(ticker)
             # Try getting 1d first, if empty, try 5d
             hist = t.history(period="1d")
             if hist.empty:
@@ -33,11 +87,9 @@ def fetch_market_pulse_standalone():
 
                 # LAST RESORT: Check for real-time info if market is open
                 # If the last history index is from a previous day, Ticker.info might have today's price
-                from datetime import datetime, timedelta
-                ist_now = datetime.utcnow() + timedelta(hours=5, minutes=30)
-                today_str = ist_now.strftime("%Y-%m-%d")
+                today_str = ist_now().strftime("%Y-%m-%d")
                 
-                if hist.index[-1].strftime("%Y-%m-%d") != today_str:
+                if market_open and hist.index[-1].strftime("%Y-%m-%d") != today_str:
                     try:
                         # Only try info if history is lagging (info is slow)
                         info_price = t.info.get('regularMarketPrice')
@@ -59,5 +111,7 @@ def fetch_market_pulse_standalone():
         except Exception as e:
             print(f"Pulse Error for {ticker}: {e}")
             pass
+    if results:
+        save_pulse_snapshot(results)
     return results
 
@@ -2,6 +2,13 @@ import pandas as pd
 import numpy as np
 
 class QuantTools:
+    @staticmethod
+    def resample(df, timeframe):
+        # Derive 5m/15m/60m/1d bars from 1m bars so every indicator below
+        # can run intraday on the same minute history.
+        from stock_hub.bar_engine import resample_bars
+        return resample_bars(df, timeframe)
+
     @staticmethod
     def calculate_ema(df, period):
         return df['Close'].ewm(span=period, adjust=False).mean()
@@ -31,6 +38,14 @@ class QuantTools:
         tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
         return tr.rolling(window=period).mean()
 
+    @staticmethod
+    def panel_atr(panel, period=14):
+        """calculate_atr for every column of a {field: DataFrame(dates x symbols)} panel at once."""
+        high, low, close = panel['High'], panel['Low'], panel['Close']
+        prev_close = close.shift()
+        tr = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+        return tr.rolling(window=period).mean().iloc[-1]
+
     @staticmethod
     def calculate_pivots(df):
         # Using previous day (iloc[-2] if latest is today)
@@ -57,3 +72,35 @@ class QuantTools:
         avg_vol = df['Volume'].rolling(window=20).mean().iloc[-1]
         curr_vol = df['Volume'].iloc[-1]
         return curr_vol > (2 * avg_vol)
+
+    @staticmethod
+    def gap_breakouts(panel, lookback=1):
+        """
+        Gap-up / gap-down scan across a whole price panel in one comparison:
+        today's open vs the highest high / lowest low of the prior `lookback` sessions.
+        panel: {field: DataFrame(dates x symbols)}
+        """
+        opens, highs, lows = panel['Open'], panel['High'], panel['Low']
+        if len(opens) < lookback + 1:
+            return pd.DataFrame()
+
+        open_today = opens.iloc[-1]
+        prior_high = highs.iloc[-(lookback + 1):-1].max()
+        prior_low = lows.iloc[-(lookback + 1):-1].min()
+
+        up = open_today > prior_high
+        down = open_today < prior_low
+        hit = up | down
+        if not hit.any():
+            return pd.DataFrame()
+
+        gap = np.where(up, (open_today - prior_high) / prior_high, (prior_low - open_today) / prior_low) * 100
+        df = pd.DataFrame({
+            "Symbol": open_today.index.str.replace(".NS", "", regex=False),
+            "Yesterday High": prior_high.round(2).values,
+            "Yesterday Low": prior_low.round(2).values,
+            "Today Open": open_today.round(2).values,
+            "Gap %": np.round(gap, 2),
+            "Status": np.where(up, "Gap Up Breakout", "Gap Down Breakdown")
+        })
+        return df[hit.values].reset_index(drop=True)
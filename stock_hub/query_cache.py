@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import threading
+import pandas as pd
+from stock_hub.config import DB_PATH
+from stock_hub.metrics import count
+
+# Tables the dashboard reads by "latest Date" snapshot
+SNAPSHOT_TABLES = ("processed_watchlist", "derivatives", "raw_signals")
+
+def bump_snapshot_version(conn):
+    """Writer side: called once per completed research cycle."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS snapshot_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER,
+            updated_at TEXT
+        )
+    """)
+    conn.execute("""
+        INSERT INTO snapshot_meta (id, version, updated_at) VALUES (1, 1, datetime('now'))
+        ON CONFLICT(id) DO UPDATE SET version = version + 1, updated_at = datetime('now')
+    """)
+
+class SnapshotCache:
+    """
+    Read-side cache for dashboard queries, keyed on the snapshot version the
+    writer bumps after each cycle. Between cycles a rerun only stats the DB
+    file; the database is touched again only when the file changed, and the
+    decoded frames are reused until the version itself moves.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else DB_PATH
+        self._file_token = None
+        self._version = None
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _stat_token(self):
+        token = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                token.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                token.append(None)
+        return tuple(token)
+
+    def _connect(self):
+        # Read-only: a reader must never create (or lock for writing) the writer's DB
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def version(self):
+        """Snapshot version; None while the writer has not created the DB yet."""
+        token = self._stat_token()
+        if token == self._file_token and self._version is not None:
+            return self._version
+
+        if token[0] is None:
+            version = None
+        else:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT version FROM snapshot_meta WHERE id = 1").fetchone()
+                    version = row[0] if row else 0
+            except sqlite3.OperationalError:
+                # Writer predates snapshot_meta: fall back to the file itself
+                version = token
+
+        with self._lock:
+            self._file_token = token
+            if version != self._version:
+                self._frames.clear()
+                self._version = version
+        return version
+
+    def query(self, sql, params=()):
+        """Cached pd.read_sql. Callers must copy() before mutating the frame."""
+        self.version()
+        key = (sql, tuple(params))
+        with self._lock:
+            if key in self._frames:
+                count("cache_hit.snapshot")
+                return self._frames[key]
+        if not os.path.exists(self.db_path):
+            return pd.DataFrame()
+        with self._connect() as conn:
+            df = pd.read_sql(sql, conn, params=params)
+        with self._lock:
+            self._frames[key] = df
+        return df
+
+    def latest_date(self, table):
+        if table not in SNAPSHOT_TABLES:
+            raise ValueError(f"Not a snapshot table: {table}")
+        df = self.query(f"SELECT MAX(Date) as max_date FROM {table}")
+        if df.empty or pd.isna(df['max_date'].iloc[0]):
+            return None
+        return df['max_date'].iloc[0]
+
+    def latest_snapshot(self, table):
+        """(latest_date, latest_timestamp, rows) for the most recent Date in table."""
+        latest = self.latest_date(table)
+        if latest is None:
+            return None, None, pd.DataFrame()
+        df = self.query(f"SELECT * FROM {table} WHERE Date = ?", (latest,))
+        latest_ts = None
+        if 'Timestamp' in df.columns and not df.empty and not pd.isna(df['Timestamp'].max()):
+            latest_ts = df['Timestamp'].max()
+        return latest, latest_ts, df
+
+_cache = None
+
+def get_snapshot_cache():
+    global _cache
+    if _cache is None:
+        _cache = SnapshotCache()
+    return _cache
@@ -0,0 +1,154 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+# Column schemas for the scan -> enrich -> SQLite pipeline.
+# float columns live in array('d'), bool in array('b'), text in plain lists.
+SIGNAL_SCHEMA = [
+    ("Symbol", str),
+    ("Open", float),
+    ("High", float),
+    ("Low", float),
+    ("Close", float),
+    ("Price", float),
+    ("Volume", float),
+    ("Change_Pct", float),
+    ("EMA200", float),
+    ("Above_EMA200", bool),
+    ("High_Open_Pct", float),
+    ("Trend", str),
+    ("PA_Prediction", str),
+    ("Reasoning", str),
+]
+
+WATCHLIST_SCHEMA = [
+    ("Symbol", str),
+    ("Price", float),
+    ("Trend", str),
+    ("Above_EMA200", str),
+    ("EMA200_Val", float),
+    ("RSI", float),
+    ("MACD", float),
+    ("SL", float),
+    ("Target", float),
+    ("Agent_Review", str),
+    ("Action", str),
+    ("Movement_Upside", float),
+]
+
+_TYPECODES = {float: "d", bool: "b", int: "q"}
+_NP_DTYPES = {"d": np.float64, "b": np.int8, "q": np.int64}
+
+class Record:
+    """
+    Row view into a RecordBatch. Supports the dict-style access the engine
+    already uses (r['Symbol'], r.get('Trend')) without allocating a dict per row.
+    """
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch, i):
+        self._batch = batch
+        self._i = i
+
+    def __getitem__(self, key):
+        val = self._batch.columns[key][self._i]
+        return bool(val) if self._batch.types[key] is bool else val
+
+    def __setitem__(self, key, value):
+        self._batch.columns[key][self._i] = value
+
+    def __contains__(self, key):
+        return key in self._batch.columns
+
+    def get(self, key, default=None):
+        return self[key] if key in self._batch.columns else default
+
+    def to_dict(self):
+        return {f: self[f] for f in self._batch.fields}
+
+class RecordBatch:
+    """
+    Struct-of-arrays container for scan/enrich results.
+    Numeric columns are packed arrays: to_frame() builds each with one buffer
+    copy (no per-row boxing) and rows() feeds executemany directly.
+    """
+    def __init__(self, schema):
+        self.schema = schema
+        self.fields = [f for f, _ in schema]
+        self.types = dict(schema)
+        self.columns = {f: array(_TYPECODES[t]) if t in _TYPECODES else [] for f, t in schema}
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Record(self, i)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0: i += n
+        if not 0 <= i < n:
+            raise IndexError("RecordBatch index out of range")
+        return Record(self, i)
+
+    def append(self, row):
+        """row: tuple in schema order, or a mapping keyed by field name."""
+        if isinstance(row, dict):
+            row = tuple(row.get(f) for f in self.fields)
+        for f, v in zip(self.fields, row):
+            t = self.types[f]
+            if t in _TYPECODES:
+                v = t(v) if v is not None else (np.nan if t is float else 0)
+            self.columns[f].append(v)
+
+    def extend(self, rows):
+        for r in rows:
+            if r is not None:
+                self.append(r)
+        return self
+
+    @classmethod
+    def concat(cls, batches, schema):
+        out = cls(schema)
+        for b in batches:
+            for f in out.fields:
+                out.columns[f].extend(b.columns[f])
+        return out
+
+    def column(self, name):
+        return self.columns[name]
+
+    def take(self, order):
+        out = RecordBatch(self.schema)
+        for f, col in self.columns.items():
+            out.columns[f] = type(col)(col.typecode, (col[i] for i in order)) if isinstance(col, array) else [col[i] for i in order]
+        return out
+
+    def sort_by(self, field, key=None, reverse=False):
+        col = self.columns[field]
+        key = key if key else (lambda v: v)
+        order = sorted(range(len(self)), key=lambda i: key(col[i]), reverse=reverse)
+        return self.take(order)
+
+    def rows(self, fields=None):
+        """Tuples for executemany, in the requested field order."""
+        fields = fields if fields else self.fields
+        return zip(*(self.columns[f] for f in fields))
+
+    def to_frame(self, fields=None):
+        """
+        DataFrame of the batch. Numeric columns are copied out of their arrays:
+        a frame viewing the buffer would pin it, and the next append() would
+        raise BufferError.
+        """
+        fields = fields if fields else self.fields
+        data = {}
+        for f in fields:
+            col = self.columns[f]
+            if isinstance(col, array):
+                arr = np.frombuffer(col, dtype=_NP_DTYPES[col.typecode]) if len(col) else np.empty(0, _NP_DTYPES[col.typecode])
+                data[f] = arr.astype(bool) if self.types[f] is bool else arr.copy()
+            else:
+                data[f] = col
+        return pd.DataFrame(data, copy=False)
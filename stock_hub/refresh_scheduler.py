@@ -0,0 +1,204 @@
+import sys
+import os
+import time
+import heapq
+import sqlite3
+from collections import deque
+sys.path.append(os.getcwd())
+
+from stock_hub.config import DB_PATH, QuantConfig
+from stock_hub.universe import get_universe, to_yahoo_symbol
+from stock_hub.market_calendar import get_market_calendar, ist_now
+
+# Per-symbol live refresh ordering. Each symbol's weight scales how often it
+# should be refreshed: due = last_refresh + base_interval / weight, so a
+# volatile ticker sitting on its SL is revisited many times for every pass over
+# a quiet large-cap, and the per-minute request budget goes to the top of the heap.
+DEFAULT_ATR_PCT = 1.5
+ATR_WEIGHT = 0.5 # per 1% ATR
+PROXIMITY_WEIGHT = 1.0 # / distance-to-level in %
+MAX_PROXIMITY = 10.0
+WATCHLIST_BOOST = 3.0
+MIN_INTERVAL = 15 # seconds
+PULSE_INTERVAL = 60 # seconds between index pulse refreshes in the live loop
+PANEL_INTERVAL = 300 # seconds between shared daily panel rewrites in the live loop
+
+class _SymbolState:
+    __slots__ = ("symbol", "atr_pct", "sl", "target", "price", "boost", "last_refresh", "due")
+
+    def __init__(self, symbol, atr_pct, sl, target, price, boost):
+        self.symbol = symbol
+        self.atr_pct = atr_pct
+        self.sl = sl
+        self.target = target
+        self.price = price
+        self.boost = boost
+        self.last_refresh = 0.0
+        self.due = 0.0
+
+def fetch_latest_prices(symbols):
+    """Default refresh: one batched minute-bar download, persisted and fed to the ORB monitor and alerts."""
+    from stock_hub.bar_engine import refresh_minute_bars
+    from stock_hub.opening_range import get_opening_range_monitor
+    from stock_hub.alert_engine import check_minute_bars
+    frames = refresh_minute_bars(symbols, period="1d")
+    if frames:
+        get_opening_range_monitor().update(frames)
+        check_minute_bars(frames)
+    return {s: float(df["Close"].iloc[-1]) for s, df in frames.items() if not df.empty}
+
+class RefreshScheduler:
+    def __init__(self, budget_per_minute=60, base_interval=300, fetch=None, clock=time.time):
+        self.budget_per_minute = budget_per_minute
+        self.base_interval = base_interval
+        self.fetch = fetch if fetch else fetch_latest_prices
+        self.clock = clock
+        self.states = {}
+        self._heap = []
+        self._seq = 0
+        self._spent = deque() # request timestamps in the last 60s
+
+    def add(self, symbol, atr_pct=None, sl=None, target=None, price=None, boost=1.0):
+        st = _SymbolState(symbol, atr_pct if atr_pct else DEFAULT_ATR_PCT, sl, target, price, boost)
+        old = self.states.get(symbol)
+        if old:
+            st.last_refresh = old.last_refresh
+        self.states[symbol] = st
+        self._schedule(st)
+
+    def weight(self, st):
+        w = 1 + ATR_WEIGHT * st.atr_pct
+        if st.price:
+            dists = [abs(st.price - lvl) / st.price * 100 for lvl in (st.sl, st.target) if lvl]
+            if dists:
+                w *= min(1 + PROXIMITY_WEIGHT / max(min(dists), 1e-6), MAX_PROXIMITY)
+        return w * st.boost
+
+    def _schedule(self, st):
+        st.due = st.last_refresh + max(self.base_interval / self.weight(st), MIN_INTERVAL)
+        self._seq += 1
+        heapq.heappush(self._heap, (st.due, self._seq, st.symbol))
+
+    def available(self, now=None):
+        now = now if now is not None else self.clock()
+        while self._spent and now - self._spent[0] >= 60:
+            self._spent.popleft()
+        return self.budget_per_minute - len(self._spent)
+
+    def pop_due(self, now=None, limit=None):
+        """Highest-priority symbols whose refresh is due, at most limit of them."""
+        now = now if now is not None else self.clock()
+        limit = limit if limit is not None else self.available(now)
+        picked = []
+        while self._heap and len(picked) < limit:
+            due, _, symbol = self._heap[0]
+            st = self.states.get(symbol)
+            if st is None or due != st.due:
+                heapq.heappop(self._heap) # superseded entry
+                continue
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            picked.append(symbol)
+        return picked
+
+    def tick(self, now=None):
+        """Spends what is left of this minute's budget on due symbols; returns {symbol: price}."""
+        now = now if now is not None else self.clock()
+        symbols = self.pop_due(now)
+        if not symbols:
+            return {}
+        self._spent.extend([now] * len(symbols))
+        try:
+            prices = self.fetch(symbols)
+        except Exception as e:
+            print(f"[REFRESH] Batch of {len(symbols)} failed: {e}")
+            prices = {}
+        for symbol in symbols:
+            st = self.states[symbol]
+            st.last_refresh = now
+            if symbol in prices:
+                st.price = prices[symbol]
+            self._schedule(st)
+        return prices
+
+    def next_due(self):
+        while self._heap:
+            due, _, symbol = self._heap[0]
+            st = self.states.get(symbol)
+            if st is not None and due == st.due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def run(self, max_sleep=60):
+        """
+        Refresh loop for the live session; sleeps through closed hours. Prices
+        and the index pulse are published to the change feed for live dashboards,
+        and the daily price panel is rewritten for every process that maps it.
+        """
+        from stock_hub.change_feed import publish
+        from stock_hub.pulse_engine import fetch_market_pulse_standalone
+        from stock_hub.shared_panel import get_shared_panel, publish_shared_panel
+        calendar = get_market_calendar()
+        last_pulse = last_panel = 0.0
+        while True:
+            # Every PANEL_INTERVAL in session, plus once more after the close
+            if self.clock() - last_panel >= PANEL_INTERVAL and (calendar.is_market_open() or not get_shared_panel().fresh(0)):
+                last_panel = self.clock()
+                try:
+                    publish_shared_panel(list(self.states))
+                except Exception as e:
+                    print(f"[REFRESH] Shared panel refresh failed: {e}")
+            if not calendar.is_market_open():
+                wait = (calendar.next_session_open() - ist_now()).total_seconds()
+                time.sleep(min(max(wait, 1), max_sleep))
+                continue
+            if self.clock() - last_pulse >= PULSE_INTERVAL:
+                last_pulse = self.clock()
+                try:
+                    fetch_market_pulse_standalone() # publishes "pulse" itself
+                except Exception as e:
+                    print(f"[REFRESH] Pulse refresh failed: {e}")
+            prices = self.tick()
+            if prices:
+                publish("prices", prices)
+                print(f"[REFRESH] {len(prices)} symbols | budget left {self.available()}/{self.budget_per_minute}")
+            nxt = self.next_due()
+            wait = (nxt - self.clock()) if nxt else max_sleep
+            wait = min(wait, last_pulse + PULSE_INTERVAL - self.clock())
+            time.sleep(min(max(wait, 1), max_sleep))
+
+def load_watchlist_levels(db_path=None, config=None):
+    """{yahoo_symbol: (price, sl, target, atr_pct)} from the latest processed_watchlist."""
+    config = config if config else QuantConfig.load()
+    try:
+        with sqlite3.connect(db_path if db_path else DB_PATH) as conn:
+            rows = conn.execute("""
+                SELECT Ticker, Price, SL, Target FROM processed_watchlist
+                WHERE Date = (SELECT MAX(Date) FROM processed_watchlist)
+            """).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    levels = {}
+    for ticker, price, sl, target in rows:
+        # SL = LTP - 1.5 * ATR (QuantTools.calculate_dynamic_sl)
+        atr_pct = (price - sl) / 1.5 / price * 100 if price and sl and sl < price else None
+        levels[to_yahoo_symbol(ticker, config.get('INDEX_MAPPING', {}))] = (price, sl, target, atr_pct)
+    return levels
+
+def build_scheduler(symbols=None, db_path=None, config=None, **kwargs):
+    config = config if config else QuantConfig.load()
+    symbols = list(symbols) if symbols else get_universe(config.get('UNIVERSE', 'NIFTY_100'))
+    boosted = set(config.get('PRIORITY_TICKERS', [])) | set(config.get('WATCHLIST', []))
+    levels = load_watchlist_levels(db_path, config)
+    kwargs.setdefault('budget_per_minute', config.get('REFRESH_BUDGET_PER_MIN', 60))
+    kwargs.setdefault('base_interval', config.get('REFRESH_BASE_INTERVAL', 300))
+    scheduler = RefreshScheduler(**kwargs)
+    for symbol in dict.fromkeys(symbols + sorted(boosted) + list(levels)):
+        price, sl, target, atr_pct = levels.get(symbol, (None, None, None, None))
+        scheduler.add(symbol, atr_pct, sl, target, price, WATCHLIST_BOOST if symbol in boosted else 1.0)
+    return scheduler
+
+if __name__ == "__main__":
+    build_scheduler().run()
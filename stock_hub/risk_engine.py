@@ -0,0 +1,253 @@
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from stock_hub.config import BASE_DIR, DB_PATH
+from stock_hub.bar_engine import fetch_price_panel
+from stock_hub.market_calendar import get_market_calendar, ist_now
+
+# Cross-asset risk over the universe + indices from one daily returns panel.
+# Window moments (sum of returns and sum of outer products) are kept on disk
+# and rolled forward by the sessions added since the last run, so a daily
+# refresh costs O(new_days * N^2) instead of rebuilding W x N^2.
+RISK_STATE_PATH = os.path.join(BASE_DIR, "stock_hub", "data", "risk_state.npz")
+BENCHMARK = "^NSEI"
+Z_95 = 1.6449
+REBUILD_EVERY = 250 # pushes between exact recomputations (float drift)
+
+class RollingMoments:
+    """Fixed-window return moments for N series, updated one row at a time."""
+    def __init__(self, symbols, window):
+        self.symbols = list(symbols)
+        self.window = window
+        n = len(self.symbols)
+        self.returns = np.zeros((window, n)) # ring buffer
+        self.closes = np.full((window + 1, n), np.nan) # ring buffer, one extra for drawdowns
+        self.pos = 0
+        self.count = 0
+        self.s1 = np.zeros(n)
+        self.s2 = np.zeros((n, n))
+        self.last_close = np.full(n, np.nan)
+        self.last_date = None
+        self.pushes = 0
+
+    def push(self, date, close):
+        """Adds one session of closes (array aligned with symbols)."""
+        close = np.asarray(close, dtype=float)
+        close = np.where(np.isnan(close), self.last_close, close)
+        if not np.isnan(self.last_close).all():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r = np.nan_to_num(close / self.last_close - 1, nan=0.0, posinf=0.0, neginf=0.0)
+            if self.count == self.window:
+                old = self.returns[self.pos]
+                self.s1 -= old
+                self.s2 -= np.outer(old, old)
+            else:
+                self.count += 1
+            self.returns[self.pos] = r
+            self.s1 += r
+            self.s2 += np.outer(r, r)
+            self.pos = (self.pos + 1) % self.window
+            self.pushes += 1
+            if self.pushes % REBUILD_EVERY == 0:
+                self._recompute()
+        self.closes = np.roll(self.closes, -1, axis=0)
+        self.closes[-1] = close
+        self.last_close = close
+        self.last_date = str(date)[:10]
+
+    def _recompute(self):
+        r = self.window_returns()
+        self.s1 = r.sum(axis=0)
+        self.s2 = r.T @ r
+
+    def window_returns(self):
+        if self.count < self.window:
+            return self.returns[:self.count]
+        return np.roll(self.returns, -self.pos, axis=0)
+
+    def mean(self):
+        return self.s1 / max(self.count, 1)
+
+    def cov(self):
+        n = max(self.count, 2)
+        return (self.s2 - np.outer(self.s1, self.s1) / n) / (n - 1)
+
+    def corr(self):
+        cov = self.cov()
+        sd = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = cov / np.outer(sd, sd)
+        return np.nan_to_num(c)
+
+    def save(self, path):
+        np.savez(path, symbols=np.array(self.symbols), window=self.window, returns=self.returns,
+                 closes=self.closes, pos=self.pos, count=self.count, s1=self.s1, s2=self.s2,
+                 last_close=self.last_close, last_date=self.last_date or "", pushes=self.pushes)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            m = cls(z["symbols"].tolist(), int(z["window"]))
+            m.returns, m.closes = z["returns"], z["closes"]
+            m.pos, m.count, m.pushes = int(z["pos"]), int(z["count"]), int(z["pushes"])
+            m.s1, m.s2, m.last_close = z["s1"], z["s2"], z["last_close"]
+            m.last_date = str(z["last_date"]) or None
+        return m
+
+class RiskEngine:
+    def __init__(self, window=60, state_path=RISK_STATE_PATH):
+        self.window = window
+        self.state_path = state_path
+        self.moments = None
+
+    def refresh(self, symbols, benchmark=BENCHMARK):
+        """Rolls the window forward to the latest session (full build on first run / universe change)."""
+        symbols = list(dict.fromkeys(list(symbols) + [benchmark]))
+        m = None
+        if os.path.exists(self.state_path):
+            try:
+                m = RollingMoments.load(self.state_path)
+            except Exception as e:
+                print(f"[RISK] State unreadable, rebuilding: {e}")
+        calendar = get_market_calendar()
+        now = ist_now()
+        full_days = int(self.window * 1.6) + 10
+        gap_days = (now.date() - pd.Timestamp(m.last_date).date()).days if m is not None and m.last_date else None
+        if m is None or m.symbols != symbols or m.window != self.window or gap_days is None or gap_days > full_days:
+            m = RollingMoments(symbols, self.window)
+            period = f"{full_days}d"
+        else:
+            # Every session since last_date, however long the engine was idle
+            period = f"{max(gap_days + 5, 5)}d"
+        # Only completed sessions are pushed: a live session's bar would be frozen at its intraday close
+        session = calendar.last_session_date(now).strftime("%Y-%m-%d")
+        complete_through = session if now >= calendar.last_session_close(now) else None
+
+        panel = fetch_price_panel(symbols, period=period, ttl=0)
+        closes = panel.get('Close', pd.DataFrame()).reindex(columns=symbols) if panel else pd.DataFrame()
+        added = 0
+        for date, row in closes.iterrows():
+            day = str(date)[:10]
+            if m.last_date and day <= m.last_date: continue
+            if day >= session and day != complete_through: continue
+            m.push(date, row.to_numpy())
+            added += 1
+        if added:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            m.save(self.state_path)
+        print(f"[RISK] {len(symbols)} series | +{added} sessions | window {m.count}/{m.window} through {m.last_date}")
+        self.moments = m
+        return m
+
+    def metrics(self, benchmark=BENCHMARK):
+        """Per-symbol vol, beta, 1-day 95% VaR (historical / parametric) and drawdowns."""
+        m = self.moments
+        cov = m.cov()
+        var = np.clip(np.diag(cov), 0, None)
+        b = m.symbols.index(benchmark)
+        beta = cov[:, b] / var[b] if var[b] > 0 else np.full(len(m.symbols), np.nan)
+        r = m.window_returns()
+        hist_var = -np.percentile(r, 5, axis=0) if len(r) else np.full(len(m.symbols), np.nan)
+        param_var = Z_95 * np.sqrt(var) - m.mean()
+        closes = m.closes[~np.isnan(m.closes).all(axis=1)]
+        peaks = np.fmax.accumulate(closes, axis=0)
+        dd = closes / peaks - 1
+        return pd.DataFrame({
+            "Symbol": m.symbols,
+            "Vol_Ann_Pct": np.sqrt(var * 252) * 100,
+            "Beta": beta,
+            "VaR95_Hist_Pct": hist_var * 100,
+            "VaR95_Param_Pct": param_var * 100,
+            "Drawdown_Pct": dd[-1] * 100 if len(dd) else np.nan,
+            "Max_Drawdown_Pct": np.nanmin(dd, axis=0) * 100 if len(dd) else np.nan,
+        }).round(2)
+
+    def portfolio_var(self, weights):
+        """1-day 95% VaR (%) of a {symbol: weight} book, historical and parametric."""
+        m = self.moments
+        w = np.array([weights.get(s, 0.0) for s in m.symbols])
+        if not w.any():
+            return None
+        w = w / w.sum()
+        r = m.window_returns() @ w
+        sigma = np.sqrt(max(w @ m.cov() @ w, 0))
+        return {
+            "hist": round(float(-np.percentile(r, 5) * 100), 2) if len(r) else None,
+            "param": round(float((Z_95 * sigma - m.mean() @ w) * 100), 2)
+        }
+
+    def top_pairs(self, k=5):
+        m = self.moments
+        c = m.corr()
+        iu = np.triu_indices(len(m.symbols), 1)
+        vals = c[iu]
+        order = np.argsort(vals)[::-1][:k]
+        return [(m.symbols[iu[0][i]], m.symbols[iu[1][i]], round(float(vals[i]), 2)) for i in order]
+
+    def summary(self, weights=None, k=5, benchmark=BENCHMARK):
+        """Compact text block for the Oracle prompt."""
+        m = self.moments
+        df = self.metrics(benchmark)
+        stocks = df[df["Symbol"] != benchmark]
+        c = m.corr()
+        n = len(m.symbols)
+        avg_corr = (c.sum() - n) / (n * (n - 1)) if n > 1 else 0.0
+        bench = df[df["Symbol"] == benchmark].iloc[0]
+        name = lambda s: s.replace(".NS", "")
+        lines = [
+            f"RISK SNAPSHOT ({m.count}-session window to {m.last_date}):",
+            f"- Nifty vol {bench['Vol_Ann_Pct']}% ann., 1d VaR95 {bench['VaR95_Hist_Pct']}%, drawdown {bench['Drawdown_Pct']}%",
+            f"- Avg pairwise correlation {round(float(avg_corr), 2)}",
+            "- Highest beta: " + ", ".join(f"{name(r.Symbol)} {r.Beta}" for r in stocks.nlargest(k, "Beta").itertuples()),
+            "- Highest 1d VaR95: " + ", ".join(f"{name(r.Symbol)} {r.VaR95_Hist_Pct}%" for r in stocks.nlargest(k, "VaR95_Hist_Pct").itertuples()),
+            "- Deepest drawdowns: " + ", ".join(f"{name(r.Symbol)} {r.Drawdown_Pct}%" for r in stocks.nsmallest(k, "Drawdown_Pct").itertuples()),
+            "- Most correlated pairs: " + ", ".join(f"{name(a)}/{name(b)} {v}" for a, b, v in self.top_pairs(k)),
+        ]
+        pv = self.portfolio_var(weights) if weights else None
+        if pv:
+            lines.append(f"- Portfolio 1d VaR95: {pv['hist']}% historical, {pv['param']}% parametric")
+        return "\n".join(lines)
+
+def save_risk_summary(text, db_path=None):
+    ts = ist_now()
+    with sqlite3.connect(db_path if db_path else DB_PATH) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS risk_summary (
+                Date TEXT PRIMARY KEY,
+                Summary TEXT,
+                Timestamp TEXT
+            )
+        """)
+        # Keyed by session, like the watchlist it is read alongside
+        conn.execute("INSERT OR REPLACE INTO risk_summary (Date, Summary, Timestamp) VALUES (?, ?, ?)",
+                     (get_market_calendar().session_stamp(ts), text, ts.strftime("%Y-%m-%d %H:%M:%S")))
+
+def get_risk_context(db_path=None):
+    """Latest stored risk summary for the Oracle, or an empty string."""
+    try:
+        with sqlite3.connect(db_path if db_path else DB_PATH) as conn:
+            row = conn.execute("SELECT Summary FROM risk_summary ORDER BY Date DESC LIMIT 1").fetchone()
+        return row[0] if row else ""
+    except sqlite3.OperationalError:
+        return ""
+
+def run_risk_refresh(symbols, config=None, db_path=None):
+    """Research-cycle hook: roll the window, fold in portfolio weights, store the summary."""
+    config = config if config else {}
+    engine = RiskEngine(window=config.get('RISK_WINDOW', 60))
+    indices = list(config.get('INDEX_MAPPING', {}).keys())
+    holdings = {}
+    try:
+        from stock_hub.portfolio import PortfolioManager
+        pos = PortfolioManager(db_path).positions()
+        holdings = dict(zip(pos['Ticker'], pos['Quantity']))
+    except Exception as e:
+        print(f"[RISK] Portfolio weights skipped: {e}")
+    m = engine.refresh(list(symbols) + indices + sorted(holdings))
+    # Weight holdings at the last close in the window
+    weights = {s: q * m.last_close[m.symbols.index(s)] for s, q in holdings.items()
+               if s in m.symbols and not np.isnan(m.last_close[m.symbols.index(s)])}
+    text = engine.summary(weights)
+    save_risk_summary(text, db_path)
+    return text
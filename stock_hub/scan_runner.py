@@ -0,0 +1,89 @@
+import os
+import time
+import pickle
+import concurrent.futures
+import multiprocessing as mp
+from stock_hub import market_data as md
+from stock_hub.bar_engine import split_download, TIMEFRAMES
+from stock_hub.indicator_engine import scan_advanced_signals
+from stock_hub.record_batch import RecordBatch, SIGNAL_SCHEMA
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+def _init_worker(provider):
+    # Spawned workers start clean: carry over a provider the parent installed (tests, benchmarks)
+    if provider is not None:
+        md.set_provider(provider)
+
+def _scan_shard(shard, fetch_budget, deadline, chunk_size, timeframe):
+    """
+    Worker entry point: scans one shard in batched downloads of chunk_size
+    symbols at the timeframe's interval, stopping when its fetch budget (every
+    attempt counts, failed ones included) or the shared deadline runs out.
+    Returns (RecordBatch, scanned_count, skipped_count).
+    """
+    batches = []
+    fetches = 0
+    scanned = 0
+    for chunk in _chunks(shard, chunk_size):
+        if fetches >= fetch_budget or time.time() >= deadline:
+            break
+        fetches += 1
+        try:
+            data = md.download(
+                tickers=" ".join(chunk),
+                period="5d",
+                interval=timeframe,
+                group_by='ticker',
+                progress=False,
+                threads=True,
+                timeout=10
+            )
+            frames = split_download(data, chunk)
+            batches.append(scan_advanced_signals(chunk, timeframe=timeframe, frames=frames))
+        except Exception as e:
+            print(f"[SHARD] Chunk failed ({chunk[0]}..): {e}")
+        scanned += len(chunk)
+    return RecordBatch.concat(batches, SIGNAL_SCHEMA), scanned, len(shard) - scanned
+
+def run_sharded_scan(symbols, shards=None, fetch_budget=20, time_budget=240, chunk_size=100, timeframe="1d"):
+    """
+    Splits the universe across worker processes, each with its own fetch
+    budget, and merges their signals. Symbols not reached before time_budget
+    (seconds) are reported as skipped rather than blocking the cycle.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    shards = shards if shards else min(os.cpu_count() or 1, 8)
+    shards = max(1, min(shards, len(symbols)))
+    deadline = time.time() + time_budget
+    # Round-robin so every shard gets a similar mix of large and small caps
+    parts = [symbols[i::shards] for i in range(shards)]
+
+    print(f"[SHARD] Scanning {len(symbols)} symbols across {shards} shards | Budget: {fetch_budget} fetches/shard, {time_budget}s")
+    results = []
+    skipped = 0
+    provider = md.get_provider()
+    try:
+        pickle.dumps(provider)
+    except (TypeError, pickle.PicklingError):
+        provider = None # workers rebuild it from BROTHERHOOD_DATA_MODE
+    # Spawned, not forked: the caller runs on a DAG thread next to news / VIX / I/O
+    # threads, and a fork could copy a lock one of them holds (sqlite, metrics)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=shards, mp_context=mp.get_context("spawn"),
+                                                initializer=_init_worker, initargs=(provider,)) as executor:
+        futures = [executor.submit(_scan_shard, p, fetch_budget, deadline, chunk_size, timeframe) for p in parts]
+        for fut in concurrent.futures.as_completed(futures):
+            try:
+                batch, _, missed = fut.result()
+                results.append(batch)
+                skipped += missed
+            except Exception as e:
+                print(f"[SHARD] Worker failed: {e}")
+
+    if skipped:
+        print(f"[SHARD] Budget exhausted | {skipped} symbols not scanned this cycle")
+    merged = RecordBatch.concat(results, SIGNAL_SCHEMA)
+    return merged.sort_by('High_Open_Pct', key=abs, reverse=True)
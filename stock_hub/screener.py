@@ -0,0 +1,255 @@
+import ast
+import sqlite3
+import operator
+from functools import lru_cache, reduce
+import numpy as np
+import pandas as pd
+from stock_hub.config import DB_PATH
+from stock_hub.bar_engine import fetch_price_panel
+from stock_hub.market_calendar import get_market_calendar, ist_now
+
+# User screens: "rsi14 < 40 and close > ema200 and vol > 2*avg_vol20".
+# An expression is parsed once with `ast`, checked against a whitelist of
+# node types and indicator columns, and compiled into a closure that returns
+# a boolean mask over the whole-universe indicator table. Missing values
+# (NaN) make a comparison unknown rather than False, so `not` cannot match them.
+
+class ScreenError(ValueError):
+    pass
+
+# Columns of indicator_table(); the grammar only accepts these names
+INDICATOR_COLUMNS = {
+    "open": "Session open",
+    "high": "Session high",
+    "low": "Session low",
+    "close": "Last close",
+    "prev_close": "Previous session close",
+    "change_pct": "Close vs previous close, %",
+    "gap_pct": "Open vs previous close, %",
+    "vol": "Session volume",
+    "avg_vol20": "20-session average volume",
+    "ema20": "EMA 20", "ema50": "EMA 50", "ema200": "EMA 200",
+    "sma20": "SMA 20", "sma50": "SMA 50",
+    "rsi14": "RSI 14",
+    "macd": "MACD (12, 26)", "macd_signal": "MACD signal (9)", "macd_hist": "MACD histogram",
+    "atr14": "ATR 14", "atr_pct": "ATR 14 as % of close",
+    "high_52w": "Highest high over the panel (up to 1y)", "low_52w": "Lowest low over the panel (up to 1y)",
+}
+
+_COMPARE = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+            ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne}
+_ARITH = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_FUNCS = {"abs": np.abs, "min": np.minimum, "max": np.maximum}
+
+def _known(x):
+    return ~np.isnan(x)
+
+def _compile_condition(node, used):
+    """
+    Boolean AST node -> fn(cols) returning (truth, known) arrays. A comparison
+    touching a NaN is unknown, `not` keeps it unknown, and and/or follow
+    three-valued logic, so a symbol lacking an indicator never matches a
+    screen through negation. truth is only ever set where known is.
+    """
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_condition(v, used) for v in node.values]
+        is_and = isinstance(node.op, ast.And)
+        def boolop(cols):
+            results = [p(cols) for p in parts]
+            if is_and:
+                truth = reduce(np.logical_and, (t for t, _ in results))
+                # One known False decides an `and`
+                decided = reduce(np.logical_or, (np.logical_and(k, np.logical_not(t)) for t, k in results))
+            else:
+                truth = reduce(np.logical_or, (t for t, _ in results))
+                decided = truth # one True decides an `or`
+            known = np.logical_or(reduce(np.logical_and, (k for _, k in results)), decided)
+            return np.logical_and(truth, known), known
+        return boolop
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _compile_condition(node.operand, used)
+        def negate(cols):
+            truth, known = inner(cols)
+            return np.logical_and(np.logical_not(truth), known), known
+        return negate
+    if isinstance(node, ast.Compare):
+        left = _compile(node.left, used)
+        pairs = [(_COMPARE[type(op)], _compile(c, used)) for op, c in zip(node.ops, node.comparators)
+                 if type(op) in _COMPARE]
+        if len(pairs) != len(node.ops):
+            raise ScreenError("Only < <= > >= == != comparisons are allowed")
+        def compare(cols):
+            # Chained: a < b < c  ->  (a < b) & (b < c)
+            lhs = left(cols)
+            out, known = True, _known(lhs)
+            for op, rhs_fn in pairs:
+                rhs = rhs_fn(cols)
+                out = np.logical_and(out, op(lhs, rhs))
+                known = np.logical_and(known, _known(rhs))
+                lhs = rhs
+            return np.logical_and(out, known), known
+        return compare
+    raise ScreenError("A screen must be a condition (a comparison, or comparisons joined with and / or / not), "
+                      f"not a bare value: {ast.unparse(node)[:60]}")
+
+def _compile(node, used):
+    """Numeric AST node -> fn(cols) returning an array (or scalar)."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        inner = _compile(node.operand, used)
+        return lambda cols: -inner(cols)
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH:
+        op, l, r = _ARITH[type(node.op)], _compile(node.left, used), _compile(node.right, used)
+        return lambda cols: op(l(cols), r(cols))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCS and not node.keywords:
+        fn, args = _FUNCS[node.func.id], [_compile(a, used) for a in node.args]
+        if len(args) != (1 if node.func.id == "abs" else 2):
+            raise ScreenError(f"{node.func.id}() takes {1 if node.func.id == 'abs' else 2} argument(s)")
+        return lambda cols: fn(*(a(cols) for a in args))
+    if isinstance(node, ast.Name):
+        name = node.id.lower()
+        if name not in INDICATOR_COLUMNS:
+            raise ScreenError(f"Unknown column '{node.id}'. Available: {', '.join(sorted(INDICATOR_COLUMNS))}")
+        used.add(name)
+        return lambda cols: cols[name]
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda cols: value
+    if isinstance(node, (ast.BoolOp, ast.Compare)) or (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not)):
+        raise ScreenError(f"A condition cannot be used as a number: {ast.unparse(node)[:60]}")
+    raise ScreenError(f"Unsupported syntax: {ast.dump(node)[:60]}")
+
+class Screen:
+    def __init__(self, expression, name=None):
+        self.expression = expression.strip()
+        self.name = name if name else self.expression
+        try:
+            tree = ast.parse(self.expression, mode="eval")
+        except SyntaxError as e:
+            raise ScreenError(f"Invalid expression: {e.msg}")
+        self.columns = set()
+        self._fn = _compile_condition(tree.body, self.columns)
+
+    def mask(self, table):
+        """Boolean mask over table rows; a row only matches where every value the condition needs is known."""
+        cols = {c: table[c].to_numpy(dtype=float) for c in self.columns}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out, _ = self._fn(cols)
+        return np.broadcast_to(np.asarray(out, dtype=bool), (len(table),))
+
+    def run(self, table):
+        return table.index[self.mask(table)].tolist()
+
+@lru_cache(maxsize=256)
+def compile_screen(expression):
+    """Parsed/validated once per distinct expression."""
+    return Screen(expression)
+
+def indicator_table(symbols=None, panel=None, period="1y"):
+    """One row per symbol with every INDICATOR_COLUMNS field, computed column-wise over the panel."""
+    if panel is None:
+        panel = fetch_price_panel(symbols, period=period)
+    if not panel or panel['Close'].empty:
+        return pd.DataFrame(columns=list(INDICATOR_COLUMNS))
+    o, h, l, c, v = (panel[f] for f in ("Open", "High", "Low", "Close", "Volume"))
+    prev_close = c.shift()
+    delta = c.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    macd = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    macd_signal = macd.ewm(span=9, adjust=False).mean()
+    tr = np.fmax(h - l, np.fmax((h - prev_close).abs(), (l - prev_close).abs()))
+    atr = tr.rolling(14).mean()
+    last = lambda df: df.iloc[-1]
+    table = pd.DataFrame({
+        "open": last(o), "high": last(h), "low": last(l), "close": last(c),
+        "prev_close": last(prev_close),
+        "change_pct": last((c / prev_close - 1) * 100),
+        "gap_pct": last((o / prev_close - 1) * 100),
+        "vol": last(v), "avg_vol20": last(v.rolling(20).mean()),
+        "ema20": last(c.ewm(span=20, adjust=False).mean()),
+        "ema50": last(c.ewm(span=50, adjust=False).mean()),
+        "ema200": last(c.ewm(span=200, adjust=False).mean()),
+        "sma20": last(c.rolling(20).mean()), "sma50": last(c.rolling(50).mean()),
+        "rsi14": last(100 - 100 / (1 + gain / loss)),
+        "macd": last(macd), "macd_signal": last(macd_signal), "macd_hist": last(macd - macd_signal),
+        "atr14": last(atr), "atr_pct": last(atr / c * 100),
+        "high_52w": h.max(), "low_52w": l.min(),
+    })
+    table.index.name = "Ticker"
+    return table.astype(float)
+
+class ScreenStore:
+    """Saved screens and their latest matches."""
+    def __init__(self, db_path=None):
+        self.db_path = db_path if db_path else DB_PATH
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS saved_screens (
+                    Name TEXT PRIMARY KEY,
+                    Expression TEXT,
+                    Active INTEGER DEFAULT 1,
+                    Created_At TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS screen_results (
+                    Date TEXT,
+                    Screen TEXT,
+                    Ticker TEXT,
+                    Timestamp TEXT,
+                    PRIMARY KEY (Date, Screen, Ticker)
+                )
+            """)
+
+    def save(self, name, expression):
+        compile_screen(expression) # reject invalid screens at save time
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT OR REPLACE INTO saved_screens (Name, Expression, Active, Created_At) VALUES (?, ?, 1, ?)",
+                         (name, expression.strip(), ist_now().strftime("%Y-%m-%d %H:%M:%S")))
+
+    def delete(self, name):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM saved_screens WHERE Name = ?", (name,))
+
+    def list(self, active_only=True):
+        query = "SELECT Name, Expression, Active FROM saved_screens"
+        if active_only:
+            query += " WHERE Active = 1"
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql(query + " ORDER BY Name", conn)
+
+    def run_all(self, table, persist=True):
+        """{screen name: [tickers]} for every active screen over one indicator table."""
+        results = {}
+        for name, expression, _ in self.list().itertuples(index=False):
+            try:
+                results[name] = compile_screen(expression).run(table)
+            except ScreenError as e:
+                print(f"[SCREEN] '{name}' skipped: {e}")
+        if persist and results:
+            now = ist_now()
+            date_str, ts = get_market_calendar().session_stamp(now), now.strftime("%Y-%m-%d %H:%M:%S")
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany("DELETE FROM screen_results WHERE Date = ? AND Screen = ?",
+                                 [(date_str, n) for n in results])
+                conn.executemany("INSERT INTO screen_results (Date, Screen, Ticker, Timestamp) VALUES (?, ?, ?, ?)",
+                                 [(date_str, n, t, ts) for n, tickers in results.items() for t in tickers])
+        return results
+
+    def latest_results(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql("""
+                SELECT Screen, Ticker, Timestamp FROM screen_results
+                WHERE Date = (SELECT MAX(Date) FROM screen_results) ORDER BY Screen, Ticker
+            """, conn)
+
+def run_screens(symbols, db_path=None):
+    """Research-cycle hook: one indicator table for the universe, every saved screen over it."""
+    store = ScreenStore(db_path)
+    if store.list().empty:
+        return {}
+    table = indicator_table(symbols)
+    results = store.run_all(table)
+    print(f"[SCREEN] {len(results)} screens over {len(table)} symbols | " +
+          ", ".join(f"{n}: {len(t)}" for n, t in results.items()))
+    return results
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from stock_hub.config import BASE_DIR
+from stock_hub.market_calendar import get_market_calendar, ist_now
+
+# One daily OHLCV panel on disk, shared by every Streamlit session and worker
+# process. The refresher writes it; readers np.memmap it read-only, so all
+# processes share the same page-cache pages and each field is a zero-copy
+# (dates x symbols) view.
+#
+#   <name>.json           header: shape, fields, symbols, dates, data file, written_at
+#   <name>-<version>.f8   float64 array laid out (fields, dates, symbols), NaN = no bar
+#
+# A new version goes to a new data file and the header is swapped in with
+# os.replace, so readers never see a half-written panel and an open mapping
+# stays valid until its reader moves on.
+PANEL_DIR = os.path.join(BASE_DIR, "stock_hub", "data", "panel")
+PANEL_PERIOD = "1y"
+KEEP_VERSIONS = 2
+
+def period_days(period):
+    """yfinance period string -> calendar days (None for 'max')."""
+    period = str(period).lower()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return ist_now().timetuple().tm_yday
+    for suffix, days in (("mo", 30), ("wk", 7), ("d", 1), ("y", 365)):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return int(period[:-len(suffix)]) * days
+    raise ValueError(f"Unknown period: {period}")
+
+def write_shared_panel(panel, period=PANEL_PERIOD, name="daily", root=None):
+    """Publishes a {field: DataFrame(dates x symbols)} panel; returns the header."""
+    root = root if root else PANEL_DIR
+    fields = [f for f, df in panel.items() if df is not None and not df.empty]
+    if not fields:
+        raise ValueError("Empty panel")
+    dates = panel[fields[0]].index
+    symbols = panel[fields[0]].columns
+    for f in fields[1:]:
+        dates, symbols = dates.union(panel[f].index), symbols.union(panel[f].columns, sort=False)
+    tz = str(dates.tz) if dates.tz is not None else None
+    arr = np.stack([panel[f].reindex(index=dates, columns=symbols).to_numpy(dtype=np.float64, na_value=np.nan) for f in fields])
+
+    os.makedirs(root, exist_ok=True)
+    version = time.time_ns()
+    data_file = f"{name}-{version}.f8"
+    tmp = os.path.join(root, data_file + ".tmp")
+    arr.tofile(tmp)
+    os.replace(tmp, os.path.join(root, data_file))
+    now = ist_now()
+    header = {
+        "version": version,
+        "data_file": data_file,
+        "shape": list(arr.shape),
+        "fields": fields,
+        "symbols": [str(s) for s in symbols],
+        "dates": [d.strftime("%Y-%m-%d %H:%M:%S") for d in (dates.tz_localize(None) if tz else dates)],
+        "tz": tz,
+        "period": period,
+        "written_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    header_path = os.path.join(root, f"{name}.json")
+    with open(header_path + ".tmp", "w") as f:
+        json.dump(header, f)
+    os.replace(header_path + ".tmp", header_path)
+
+    # Older versions go once they are no longer the current or previous one
+    stale = sorted(p for p in os.listdir(root) if p.startswith(f"{name}-") and p.endswith(".f8"))[:-KEEP_VERSIONS]
+    for p in stale:
+        try:
+            os.remove(os.path.join(root, p))
+        except OSError:
+            pass
+    print(f"[PANEL] {name}: {len(fields)} fields x {len(dates)} dates x {len(symbols)} symbols ({arr.nbytes / 1e6:.1f} MB)")
+    return header
+
+class SharedPanel:
+    """Read-only view of a published panel; remaps when the writer publishes a new version."""
+    def __init__(self, name="daily", root=None):
+        self.root = root if root else PANEL_DIR
+        self.header_path = os.path.join(self.root, f"{name}.json")
+        self.header = None
+        self.array = None
+        self._stat = None
+        self._state = None # (header, array, dates, symbols, field positions) of the mapped version
+
+    def refresh(self):
+        """Picks up a newer version if one was published; False when there is no panel."""
+        try:
+            st = os.stat(self.header_path)
+        except OSError:
+            self.header, self.array, self._stat, self._state = None, None, None, None
+            return False
+        token = (st.st_mtime_ns, st.st_size)
+        if token != self._stat:
+            try:
+                with open(self.header_path) as f:
+                    header = json.load(f)
+                array = np.memmap(os.path.join(self.root, header["data_file"]), dtype=np.float64,
+                                  mode="r", shape=tuple(header["shape"]))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[PANEL] Unreadable panel {self.header_path}: {e}")
+                return self.array is not None
+            dates = pd.to_datetime(header["dates"])
+            self.dates = dates.tz_localize(header["tz"]) if header["tz"] else dates
+            self.symbols = pd.Index(header["symbols"])
+            self.header, self.array, self._stat = header, array, token
+            # One tuple, swapped in a single assignment: readers take everything from one version
+            self._state = (header, array, self.dates, self.symbols, {f: i for i, f in enumerate(header["fields"])})
+        return True
+
+    def fresh(self, ttl):
+        """Written within ttl seconds, or after the latest session closed."""
+        if not self.refresh():
+            return False
+        written = pd.Timestamp(self.header["written_at"]).to_pydatetime()
+        if (ist_now() - written).total_seconds() < ttl:
+            return True
+        calendar = get_market_calendar()
+        return not calendar.is_market_open() and written >= calendar.last_session_close()
+
+    def covers(self, symbols, period):
+        if not self.refresh():
+            return False
+        try:
+            want, have = period_days(period), period_days(self.header["period"])
+        except ValueError:
+            return False
+        if want is None or (have is not None and want > have):
+            return False
+        return self.symbols.isin(list(symbols)).sum() == len(set(symbols))
+
+    @staticmethod
+    def _start(dates, period):
+        """First row of a period: 'Nd' is the last N sessions (as Yahoo counts it), others calendar time."""
+        days = period_days(period) if period is not None else None
+        if days is None or not len(dates):
+            return 0
+        if str(period).lower().endswith("d") and str(period)[:-1].isdigit():
+            return max(len(dates) - days, 0)
+        return int(dates.searchsorted(dates[-1] - pd.Timedelta(days=days), side="right"))
+
+    @classmethod
+    def _frame(cls, state, field, symbols, period):
+        header, array, dates, all_symbols, field_pos = state
+        start = cls._start(dates, period)
+        df = pd.DataFrame(array[field_pos[field], start:], index=dates[start:], columns=all_symbols, copy=False)
+        if symbols is None or list(symbols) == header["symbols"]:
+            return df
+        return df[list(symbols)]
+
+    def frame(self, field, symbols=None, period=None):
+        """(dates x symbols) DataFrame; with symbols=None it is a view of the mapping, not a copy."""
+        self.refresh()
+        return self._frame(self._state, field, symbols, period)
+
+    def to_panel(self, symbols=None, period=None):
+        """{field: DataFrame} in the shape fetch_price_panel returns, every field from the same version."""
+        self.refresh()
+        state = self._state
+        return {f: self._frame(state, f, symbols, period) for f in state[0]["fields"]}
+
+_panels = {}
+
+def get_shared_panel(name="daily"):
+    if name not in _panels:
+        _panels[name] = SharedPanel(name)
+    return _panels[name]
+
+def publish_shared_panel(symbols, period=PANEL_PERIOD, name="daily"):
+    """Refresher side: one batched download of the universe, written for every reader."""
+    from stock_hub.bar_engine import fetch_price_panel
+    return write_shared_panel(fetch_price_panel(symbols, period=period, ttl=0), period, name)
+
+if __name__ == "__main__":
+    from stock_hub.config import QuantConfig
+    from stock_hub.universe import get_universe
+    parser = argparse.ArgumentParser(description="Publish the shared daily price panel")
+    parser.add_argument("--period", default=PANEL_PERIOD)
+    args = parser.parse_args()
+    publish_shared_panel(get_universe(QuantConfig.load().get('UNIVERSE', 'NIFTY_100')), args.period)
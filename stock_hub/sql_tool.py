@@ -0,0 +1,160 @@
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from stock_hub.config import DB_PATH
+from stock_hub.metrics import span, count
+
+# Bounded read-only SQL for the Oracle. The model sees a short schema
+# description and calls run_sql itself; every statement runs on a mode=ro,
+# query_only connection whose authorizer only admits SELECTs over the
+# whitelisted tables, with a row cap and a wall-clock deadline.
+
+MAX_ROWS = 50
+TIME_LIMIT_S = 2.0
+MAX_CALLS_PER_QUESTION = 6
+CACHE_SIZE = 128
+
+# Tables the Oracle may read, with the hint it gets about each. Hints say what
+# a table holds, never its columns: schema() reads those from PRAGMA table_info.
+ALLOWED_TABLES = {
+    "processed_watchlist": "Daily enriched watchlist, one row per Date/Ticker; Decision is the call, Agent_Review the reasoning.",
+    "raw_signals": "Daily O-L scan output before enrichment.",
+    "derivatives": "Daily index/stock option strategies.",
+    "market_pulse": "Latest index levels and change, one row per index, overwritten on every research cycle.",
+    "risk_summary": "Daily cross-asset risk text (vol, beta, VaR, correlations).",
+    "screen_results": "Tickers matched by each saved screen per Date.",
+    "saved_screens": "User screen expressions.",
+    "portfolio_positions": "Average-cost book per Ticker; closed positions stay with Quantity 0 and their realized P&L.",
+    "portfolio_transactions": "Every BUY/SELL trade.",
+    "alert_events": "SL/Target/custom level crossings on the live feed.",
+    "news_items": "Deduplicated headlines per Ticker with lexicon Sentiment in [-1, 1] (Published_At is UTC).",
+}
+
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+_DENIED_FUNCTIONS = {"load_extension", "readfile", "writefile", "randomblob", "zeroblob"}
+
+class QueryError(Exception):
+    pass
+
+class ReadOnlySQL:
+    def __init__(self, db_path=None, max_rows=MAX_ROWS, time_limit=TIME_LIMIT_S):
+        self.db_path = db_path if db_path else DB_PATH
+        self.max_rows = max_rows
+        self.time_limit = time_limit
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema = None
+
+    @staticmethod
+    def _authorizer(db_tables):
+        """Admits SELECTs reading whitelisted tables; db_tables holds every real table name."""
+        def authorize(action, arg1, arg2, db_name, trigger):
+            if action not in _ALLOWED_ACTIONS:
+                return sqlite3.SQLITE_DENY
+            # CTE names also arrive as reads; only real, non-whitelisted tables are refused
+            if action == sqlite3.SQLITE_READ and arg1 not in ALLOWED_TABLES and (db_name is not None or arg1.lower() in db_tables):
+                return sqlite3.SQLITE_DENY
+            if action == sqlite3.SQLITE_FUNCTION and arg2.lower() in _DENIED_FUNCTIONS:
+                return sqlite3.SQLITE_DENY
+            return sqlite3.SQLITE_OK
+        return authorize
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=self.time_limit)
+        conn.execute("PRAGMA query_only = ON")
+        db_tables = {r[0].lower() for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+        conn.set_authorizer(self._authorizer(db_tables | {"sqlite_master", "sqlite_schema", "sqlite_temp_master"}))
+        return conn
+
+    def schema(self):
+        """Compact 'table(col TYPE, ...) -- hint' lines for the whitelisted tables that exist."""
+        version = self._version()
+        if self._schema is None or self._schema[0] != version:
+            lines = []
+            with sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True) as conn:
+                for table, hint in ALLOWED_TABLES.items():
+                    cols = conn.execute(f"PRAGMA table_info({table})").fetchall()
+                    if cols:
+                        lines.append(f"{table}({', '.join(f'{c[1]} {c[2]}' for c in cols)}) -- {hint}")
+            self._schema = (version, "\n".join(lines))
+        return self._schema[1]
+
+    def _version(self):
+        # Results are reusable until the writer publishes a new snapshot
+        from stock_hub.query_cache import get_snapshot_cache, SnapshotCache
+        cache = get_snapshot_cache()
+        if cache.db_path != self.db_path:
+            cache = SnapshotCache(self.db_path)
+        return cache.version()
+
+    def execute(self, sql):
+        """Returns (columns, rows, truncated). Raises QueryError on anything the executor refuses."""
+        sql = sql.strip().rstrip(";")
+        key = (self._version(), sql)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                count("cache_hit.sql_tool")
+                return self._cache[key]
+
+        deadline = time.monotonic() + self.time_limit
+        conn = self._connect()
+        # Called every N VM steps; a non-zero return aborts the statement
+        conn.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        try:
+            with span("sql_tool.query"):
+                cur = conn.execute(sql)
+                if cur.description is None:
+                    raise QueryError("only SELECT statements are allowed")
+                columns = [d[0] for d in cur.description]
+                rows = cur.fetchmany(self.max_rows + 1)
+        except sqlite3.DatabaseError as e:
+            count("failure.sql_tool")
+            msg = "query exceeded the time limit" if "interrupted" in str(e) else str(e)
+            raise QueryError(msg)
+        finally:
+            conn.close()
+        result = (columns, rows[:self.max_rows], len(rows) > self.max_rows)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def run_text(self, sql):
+        """Tool-facing wrapper: pipe-separated result text, or an error line the model can react to."""
+        try:
+            columns, rows, truncated = self.execute(sql)
+        except QueryError as e:
+            return f"ERROR: {e}"
+        if not rows:
+            return "(no rows)"
+        fmt = lambda v: str(round(v, 4)) if isinstance(v, float) else str(v)
+        lines = [" | ".join(columns)] + [" | ".join(fmt(v) for v in row) for row in rows]
+        if truncated:
+            lines.append(f"... truncated at {self.max_rows} rows; aggregate or add LIMIT/WHERE.")
+        return "\n".join(lines)
+
+def make_sql_tool(executor=None, max_calls=MAX_CALLS_PER_QUESTION):
+    """A run_sql function for model function-calling, capped at max_calls per question."""
+    executor = executor if executor else get_sql_executor()
+    calls = [0]
+
+    def run_sql(query: str) -> str:
+        """Runs one read-only SQLite SELECT over the Brotherhood tables and returns at most 50 rows as text."""
+        calls[0] += 1
+        if calls[0] > max_calls:
+            return "ERROR: query budget for this question is spent; answer with the data already retrieved."
+        print(f"[ORACLE] SQL: {query}")
+        return executor.run_text(query)
+
+    return run_sql
+
+_executor = None
+
+def get_sql_executor():
+    global _executor
+    if _executor is None:
+        _executor = ReadOnlySQL()
+    return _executor
@@ -1,31 +1,23 @@
-import yfinance as yf
+from stock_hub import market_data as md
 import pandas as pd
 import time
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from stock_hub.universe import NIFTY_50_SYMBOLS
+from stock_hub.metrics import count
+from stock_hub.bar_engine import fetch_price_panel
+from stock_hub.quant_tools import QuantTools
+from stock_hub.market_calendar import get_market_calendar
 
 load_dotenv()
 
-NIFTY_50_SYMBOLS = [
-    'ADANIENT.NS', 'ADANIPORTS.NS', 'APOLLOHOSP.NS', 'ASIANPAINT.NS', 'AXISBANK.NS',
-    'BAJAJ-AUTO.NS', 'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BHARTIARTL.NS', 'BPCL.NS',
-    'BRITANNIA.NS', 'CIPLA.NS', 'COALINDIA.NS', 'DIVISLAB.NS', 'DRREDDY.NS',
-    'EICHERMOT.NS', 'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS', 'HDFCLIFE.NS',
-    'HEROMOTOCO.NS', 'HINDALCO.NS', 'HINDUNILVR.NS', 'ICICIBANK.NS', 'ITC.NS',
-    'INDUSINDBK.NS', 'INFY.NS', 'JSWSTEEL.NS', 'KOTAKBANK.NS', 'LT.NS', 'LTIM.NS',
-    'M&M.NS', 'MARUTI.NS', 'NESTLEIND.NS', 'NTPC.NS', 'ONGC.NS', 'POWERGRID.NS',
-    'RELIANCE.NS', 'SBILIFE.NS', 'SBIN.NS', 'SHRIRAMFIN.NS', 'SUNPHARMA.NS',
-    'TCS.NS', 'TATACONSUM.NS', 'TATAMOTORS.NS', 'TATASTEEL.NS', 'TECHM.NS',
-    'TITAN.NS', 'ULTRACEMCO.NS', 'WIPRO.NS'
-]
-
 def fetch_stock_data(symbol, interval="1d", period="5d", max_retries=3):
     for attempt in range(max_retries):
         try:
             # Sanitize symbol by stripping $
             clean_symbol = symbol.strip('$')
-            data = yf.download(
+            data = md.download(
                 tickers=clean_symbol,
                 period="5d", # Fixed period as requested
                 interval=interval,
@@ -42,47 +34,40 @@ def fetch_stock_data(symbol, interval="1d", period="5d", max_retries=3):
                 return pd.DataFrame()
             return data
         except Exception:
+            count("retry.fetch_stock_data")
             time.sleep(2 ** attempt)
     return pd.DataFrame()
 
-def analyze_stocks():
-    results = []
-    for symbol in NIFTY_50_SYMBOLS:
-        data = fetch_stock_data(symbol)
-        if data.empty or len(data) < 2:
-            continue
-        today = data.iloc[-1]
-        yesterday = data.iloc[-2]
-        open_today = today["Open"]
-        high_yesterday = yesterday["High"]
-        low_yesterday = yesterday["Low"]
-        if open_today > high_yesterday:
-            status = "Gap Up Breakout"
-            gap = ((open_today - high_yesterday) / high_yesterday) * 100
-        elif open_today < low_yesterday:
-            status = "Gap Down Breakdown"
-            gap = ((low_yesterday - open_today) / low_yesterday) * 100
-        else:
-            continue
-        results.append({
-            "Symbol": symbol.replace(".NS", ""),
-            "Yesterday High": round(high_yesterday, 2),
-            "Yesterday Low": round(low_yesterday, 2),
-            "Today Open": round(open_today, 2),
-            "Gap %": round(gap, 2),
-            "Status": status
-        })
-        time.sleep(0.5)
-    df = pd.DataFrame(results)
-    
-    # Persistence to CSV removed as part of Data Consolidation.
-    return df
+def analyze_stocks(symbols=NIFTY_50_SYMBOLS, lookback=1, panel=None):
+    """
+    Gap-up / gap-down breakout scan over one batched (and cached) daily panel.
+    lookback: number of prior sessions whose high/low the open must clear.
+    """
+    if panel is None:
+        panel = fetch_price_panel(symbols, period=f"{max(lookback + 4, 5)}d")
+    if not panel or panel['Open'].empty:
+        return pd.DataFrame()
+    return QuantTools.gap_breakouts(panel, lookback)
 
 def fetch_live_prices(symbols=NIFTY_50_SYMBOLS):
     """
     Fetches the latest available price (Close of the last minute candle) for the given symbols.
     Returns a Series: {Symbol: Price}
+    Outside market hours the last session's closing bars come from the bar store
+    when it has them for every symbol, without any upstream call.
     """
+    calendar = get_market_calendar()
+    if not calendar.is_market_open():
+        try:
+            from stock_hub.bar_engine import get_bar_store
+            since = (calendar.last_session_close() - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+            closes = get_bar_store().latest_closes(symbols, since)
+            if closes and len(closes) == len(symbols):
+                count("cache_hit.live_prices")
+                return pd.Series(closes)
+        except Exception as e:
+            print(f"[BARS] Stored session close unavailable: {e}")
+
     try:
         # Fetch 1-minute data 
         # LIVE MARKET: '1d' is best.
@@ -92,7 +77,7 @@ def fetch_live_prices(symbols=NIFTY_50_SYMBOLS):
         ticker_str = " ".join(symbols)
         
         def get_data(period):
-            return yf.download(
+            return md.download(
                 tickers=ticker_str,
                 period=period,
                 interval="1m",
@@ -114,6 +99,19 @@ def fetch_live_prices(symbols=NIFTY_50_SYMBOLS):
         if data.empty:
             return pd.Series()
 
+        # Keep the minute bars so 5m/15m/60m/1d views can be derived locally,
+        # and feed the opening-range monitor with the same bars
+        try:
+            from stock_hub.bar_engine import get_bar_store, split_download
+            from stock_hub.opening_range import get_opening_range_monitor
+            frames = split_download(data, list(symbols))
+            get_bar_store().save_minute_bars(frames)
+            get_opening_range_monitor().update(frames)
+            from stock_hub.alert_engine import check_minute_bars
+            check_minute_bars(frames)
+        except Exception as e:
+            print(f"[BARS] Minute bar persistence skipped: {e}")
+
         # Handle single ticker case vs multi-ticker case
         if len(symbols) == 1:
             symbol = symbols[0]
@@ -158,9 +156,21 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import streamlit as st
 
+def get_strength_tables(window=10):
+    """
+    Strong/Weak vs open for the first `window` minutes (10 -> 9:15-9:25),
+    from the opening-range monitor's running state.
+    """
+    from stock_hub.opening_range import get_opening_range_monitor
+    monitor = get_opening_range_monitor()
+    if not monitor.sessions:
+        monitor.update_from_store(NIFTY_50_SYMBOLS)
+    return monitor.strength_tables(window)
+
 def send_email(strong_df, weak_df):
     """
     Sends an email with the Strong and Weak stocks tables.
+    Build them with get_strength_tables().
     Requires 'email' secrets to be configured in .streamlit/secrets.toml or Streamlit Cloud Secrets.
     [email]
     sender = "..."
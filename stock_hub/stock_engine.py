@@ -10,16 +10,29 @@ import json
 import re
 import pandas as pd
 import sqlite3
-import yfinance as yf
+from stock_hub import market_data as md
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import concurrent.futures
 from stock_hub.indicator_engine import scan_advanced_signals
 from stock_hub.forecast_engine import ForecastEngine
 from stock_hub.quant_tools import QuantTools
 from stock_hub.derivatives_engine import get_derivatives_strategy, save_options_strategy, get_atm_info
 from stock_hub.config import QuantConfig
+from stock_hub.record_batch import RecordBatch, WATCHLIST_SCHEMA
+from stock_hub.universe import NIFTY_100, get_universe
+from stock_hub.scan_runner import run_sharded_scan
+from stock_hub.query_cache import bump_snapshot_version
+from stock_hub.metrics import metrics, span, count
+from stock_hub.cycle_dag import CycleGraph
+from stock_hub.checkpoints import CycleCheckpoint
+from stock_hub.market_calendar import get_market_calendar
+from stock_hub.risk_engine import run_risk_refresh
+from stock_hub.screener import run_screens
+from stock_hub.memory_index import get_memory_index
+from stock_hub.news_engine import NewsEngine, parse_news, OFFLINE_TEXT
+from stock_hub.change_feed import ChangeFeed
+from stock_hub.enrich_executor import EnrichExecutor
 
 # --- DATABASE & MAINTENANCE MANAGERS ---
 
@@ -89,40 +102,41 @@ class DatabaseManager:
 
     def save_raw_signals(self, signals):
         ist_now = datetime.utcnow() + timedelta(hours=5, minutes=30)
-        date_str = ist_now.strftime("%Y-%m-%d")
+        date_str = get_market_calendar().session_stamp(ist_now)
         exact_time = ist_now.strftime("%Y-%m-%d %H:%M:%S")
         timestamp_str = clean_ascii(exact_time)
 
+        # signals is a RecordBatch: bulk insert straight from the columns
+        rows = ((date_str,) + r for r in signals.rows(['Symbol', 'Price', 'Volume', 'Change_Pct']))
         with sqlite3.connect(self.db_path) as conn:
-            for s in signals:
-                try:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO raw_signals (Date, Ticker, Price, Volume, Change_Pct)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (date_str, s['Symbol'], s['Price'], s['Volume'], s['Change_Pct']))
-                except Exception as e:
-                    pass
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO raw_signals (Date, Ticker, Price, Volume, Change_Pct)
+                    VALUES (?, ?, ?, ?, ?)
+                """, rows)
+            except Exception as e:
+                print(f"Raw Signals DB Error: {e}")
 
     def save_processed_watchlist(self, records):
         ist_now = datetime.utcnow() + timedelta(hours=5, minutes=30)
-        date_str = ist_now.strftime("%Y-%m-%d")
+        date_str = get_market_calendar().session_stamp(ist_now)
         exact_time = ist_now.strftime("%Y-%m-%d %H:%M:%S")
         timestamp_str = clean_ascii(exact_time)
 
+        cols = ['Symbol', 'Price', 'RSI', 'MACD', 'EMA200_Val', 'Action', 'Agent_Review', 'Target', 'SL']
+        rows = ((date_str,) + r + (timestamp_str,) for r in records.rows(cols))
         with sqlite3.connect(self.db_path) as conn:
-            for r in records:
-                try:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO processed_watchlist (Date, Ticker, Price, RSI, MACD, EMA200, Decision, Agent_Review, Target, SL, Timestamp)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (date_str, r['Symbol'], r['Price'], r['RSI'], r['MACD'], 
-                          r['EMA200_Val'], r['Action'], r['Agent_Review'], r['Target'], r['SL'], timestamp_str))
-                except Exception as e:
-                    print(f"DB Error: {e}")
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO processed_watchlist (Date, Ticker, Price, RSI, MACD, EMA200, Decision, Agent_Review, Target, SL, Timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+            except Exception as e:
+                print(f"DB Error: {e}")
 
     def save_derivatives(self, options_data):
         ist_now = datetime.utcnow() + timedelta(hours=5, minutes=30)
-        date_str = ist_now.strftime("%Y-%m-%d")
+        date_str = get_market_calendar().session_stamp(ist_now)
         exact_time = ist_now.strftime("%Y-%m-%d %H:%M:%S")
         timestamp_str = clean_ascii(exact_time)
 
@@ -136,16 +150,31 @@ class DatabaseManager:
                 except Exception as e:
                     print(f"Derivatives DB Error mapping {sym}: {e}")
 
+    def latest_date(self, table="processed_watchlist"):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(f"SELECT MAX(Date) FROM {table}").fetchone()[0]
+
+    def bump_snapshot(self):
+        # Readers (query_cache) serve cached frames until this moves
+        with sqlite3.connect(self.db_path) as conn:
+            bump_snapshot_version(conn)
+            version = conn.execute("SELECT version FROM snapshot_meta WHERE id = 1").fetchone()[0]
+        # Live dashboards re-read the snapshot when this event arrives
+        try:
+            ChangeFeed(self.db_path).publish("snapshot", {"version": version})
+        except Exception as e:
+            print(f"[FEED] Snapshot event failed: {e}")
+
 def get_yfinance_news(ticker):
+    """Uncached single-symbol headline; research cycles use the batched news node instead."""
     try:
-        t = yf.Ticker(ticker)
-        news = t.news
-        if news:
+        items = parse_news(md.Ticker(ticker).news)
+        if items:
             # Get the first news title
-            return clean_ascii(news[0]['title'])
-        return "Pure Technical Analysis - Data Source Offline"
+            return clean_ascii(items[0][0])
+        return OFFLINE_TEXT
     except:
-        return "Pure Technical Analysis - Data Source Offline"
+        return OFFLINE_TEXT
 
 class MaintenanceManager:
     CLEANUP_TIME = "09:20"
@@ -189,141 +218,121 @@ def clear_raw_folder():
             if os.path.isfile(path):
                 os.remove(path)
 
-# FULL NIFTY 100 SYMBOLS (.NS)
-NIFTY_100 = [
-    'ABB.NS', 'ADANIENSOL.NS', 'ADANIENT.NS', 'ADANIGREEN.NS', 'ADANIPORTS.NS', 'ADANIPOWER.NS',
-    'ATGL.NS', 'AMBUJACEM.NS', 'APOLLOHOSP.NS', 'ASIANPAINT.NS', 'AXISBANK.NS', 'BAJAJ-AUTO.NS',
-    'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BAJAJHLDNG.NS', 'BANKBARODA.NS', 'BERGEPAINT.NS', 'BEL.NS',
-    'BHARTIARTL.NS', 'BPCL.NS', 'BOSCHLTD.NS', 'BRITANNIA.NS', 'CANBK.NS', 'CHOLAFIN.NS',
-    'CIPLA.NS', 'COALINDIA.NS', 'COLPAL.NS', 'DLF.NS', 'DABUR.NS', 'DIVISLAB.NS', 'DRREDDY.NS',
-    'EICHERMOT.NS', 'GAIL.NS', 'GICRE.NS', 'GODREJCP.NS', 'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS',
-    'HDFCLIFE.NS', 'HAVELLS.NS', 'HEROMOTOCO.NS', 'HINDALCO.NS', 'HAL.NS', 'HINDUNILVR.NS',
-    'ICICIBANK.NS', 'ICICIGI.NS', 'ICICIPRULI.NS', 'ITC.NS', 'IOC.NS', 'IRCTC.NS', 'IRFC.NS',
-    'INDUSINDBK.NS', 'INFY.NS', 'NAUKRI.NS', 'JSWSTEEL.NS', 'KOTAKBANK.NS', 'LTIM.NS', 'LT.NS',
-    'LICI.NS', 'M&M.NS', 'MARICO.NS', 'MARUTI.NS', 'NTPC.NS', 'NESTLEIND.NS', 'ONGC.NS',
-    'PIDILITIND.NS', 'PFC.NS', 'POWERGRID.NS', 'PNB.NS', 'RELIANCE.NS', 'SBICARD.NS', 'SBILIFE.NS',
-    'SRF.NS', 'SBIN.NS', 'SUNPHARMA.NS', 'TVSMOTOR.NS', 'TCS.NS', 'TATACONSUM.NS', 'TATAMOTORS.NS',
-    'TATASTEEL.NS', 'TECHM.NS', 'TITAN.NS', 'TRENT.NS', 'ULTRACEMCO.NS', 'UNITDSPR.NS', 'VBL.NS',
-    'VEDL.NS', 'WIPRO.NS', 'ZOMATO.NS', 'ZYDUSLIFE.NS'
-]
-
-def run_research_cycle():
-    # 1. Maintenance & Integrity Check
-    MaintenanceManager.run_daily_clean()
-    db = DatabaseManager()
+def _watchlist_row(s, config, qt, indicators, news):
+    """Filters, levels and news fallback on top of enrich_indicators(); None below EMA200."""
+    symbol = s['Symbol']
+    mapping = config.get('INDEX_MAPPING', {})
+    display_symbol = mapping.get(symbol, symbol)
+    ltp, ema200, macd_hist_val, rsi, atr, fib_target = indicators
+    
+    # PROPRIETARY MOMENTUM FILTERS
+    is_above_ema200 = ltp > ema200
+    ema_str = "YES" if is_above_ema200 else "NO"
+    
+    macd_bullish = macd_hist_val > 0
+    
+    action = "📡 NEUTRAL"
+    reason = "Market in consolidation"
+    
+    if is_above_ema200:
+        if macd_bullish and rsi > 50 and rsi < config['RSI_BUY']:
+            action = "🚀 BUY (Conviction)"
+            reason = "Bullish: Price > EMA200 & RSI < 70"
+        else:
+            action = "📡 NEUTRAL"
+            reason = "Trend Neutral: Price Above EMA200, waiting for RSI momentum"
+    else:
+        return None # Only show stocks trading ABOVE EMA200
+    
+    sl = qt.calculate_dynamic_sl(ltp, atr)
     
+    # Calculate Upside
+    upside = round(((fib_target - ltp) / ltp) * 100, 2) if fib_target > ltp else 0.0
+    
+    # Clean Logic
+    clean_symbol = clean_ascii(display_symbol.replace(".NS", ""))
+    action = clean_ascii(action)
+    reason = clean_ascii(reason)
+    
+    # Fetch News Fallback
+    news_sentiment = news(symbol) if news else get_yfinance_news(symbol)
+    final_reasoning = f"{reason} | {news_sentiment}"
+    
+    # Row in WATCHLIST_SCHEMA order
+    return (
+        clean_symbol,
+        ltp,
+        s.get('Trend', 'Bullish'),
+        ema_str,
+        round(ema200, 2),
+        round(rsi, 2),
+        round(macd_hist_val, 2),
+        round(sl, 2),
+        round(fib_target, 2),
+        f"PENDING_AI_FETCH | Fallback: {final_reasoning}",
+        action,
+        upside
+    )
+
+def run_research_cycle(force=False):
+    """
+    One full research cycle. Unless forced (manual refresh), it only runs
+    while the market is live or when the DB has not seen the last session yet.
+    """
+    if not force:
+        calendar = get_market_calendar()
+        latest = DatabaseManager().latest_date()
+        if not calendar.cycle_due(latest):
+            print(f"[CALENDAR] Market {calendar.phase()} | Data from {latest} covers the last session. "
+                  f"Next open: {calendar.next_session_open().strftime('%Y-%m-%d %H:%M')} IST. Skipping cycle.")
+            return
+    metrics.start_cycle()
+    try:
+        with span("cycle"):
+            _run_research_cycle()
+    finally:
+        db = DatabaseManager()
+        metrics.flush(db.db_path)
+        db.bump_snapshot()
+
+def cycle_history(graph, symbol, period="250d"):
+    """Daily history for symbol, fetched once per cycle however many nodes need it."""
+    return graph.memo(("history", symbol, period), lambda: md.Ticker(symbol).history(period=period))
+
+def fetch_vix():
+    vix_hist = md.Ticker("^VIX").history(period="1d")
+    return vix_hist['Close'].iloc[-1] if not vix_hist.empty else 15.0
+
+def pulse_check(db):
     # Requirement 3: Immediate Pulse Trigger if stale or empty
     try:
         from stock_hub.logic_handler import fetch_market_pulse # type: ignore
-        with sqlite3.connect(db.db_path) as conn:
-            check_df = pd.read_sql("SELECT MAX(Date) as last_date FROM raw_signals", conn)
-            last_date = check_df['last_date'].iloc[0] if not check_df.empty else None
-            today = datetime.now().strftime("%Y-%m-%d")
-            
-            if not last_date or last_date != today:
-                print("[INTEGRITY] STALE DATA DETECTED | Triggering Market Pulse...")
-                fetch_market_pulse() # Immediate fetch
+        last_date = db.latest_date("raw_signals")
+        # Stale means older than the last NSE session, not older than today
+        if not get_market_calendar().is_fresh(last_date):
+            print("[INTEGRITY] STALE DATA DETECTED | Triggering Market Pulse...")
+            fetch_market_pulse() # Immediate fetch
     except Exception as e:
         print(f"[INTEGRITY WARNING] Pulse check bypassed: {e}")
-    
-    print("[INIT] PRIME O-L MOMENTUM ENGINE | Processing Markets (Modular v3)...")
-    config = QuantConfig.load()
-    
-    forecaster = ForecastEngine()
-    signals = scan_advanced_signals(NIFTY_100)
-    db.save_raw_signals(signals)
-    qt = QuantTools()
-    
-    final_report = []
-    
-    def enrich(s):
-        if not s: return None
-        symbol = s['Symbol']
-        mapping = config.get('INDEX_MAPPING', {})
-        display_symbol = mapping.get(symbol, symbol)
-        
-        try:
-            ticker_obj = yf.Ticker(symbol)
-            hist = ticker_obj.history(period="250d")
-            if hist.empty or len(hist) < 200: return None
-            
-            last = hist.iloc[-1]
-            ltp = round(last['Close'], 2)
-            
-            ema200 = qt.calculate_ema(hist, 200).iloc[-1]
-            macd, macd_sig, macd_hist = qt.calculate_macd(hist, 26, 12, 9)
-            macd_val = macd.iloc[-1]
-            macd_hist_val = macd_hist.iloc[-1]
-            
-            rsi = qt.calculate_rsi(hist).iloc[-1]
-            atr = qt.calculate_atr(hist).iloc[-1]
-            fib_target = qt.get_fibonacci_target(hist, config['FIB_RATIO'])
-            
-            # PROPRIETARY MOMENTUM FILTERS
-            is_above_ema200 = ltp > ema200
-            ema_str = "YES" if is_above_ema200 else "NO"
-            
-            macd_bullish = macd_hist_val > 0
-            
-            action = "📡 NEUTRAL"
-            reason = "Market in consolidation"
-            
-            if is_above_ema200:
-                if macd_bullish and rsi > 50 and rsi < config['RSI_BUY']:
-                    action = "🚀 BUY (Conviction)"
-                    reason = "Bullish: Price > EMA200 & RSI < 70"
-                else:
-                    action = "📡 NEUTRAL"
-                    reason = "Trend Neutral: Price Above EMA200, waiting for RSI momentum"
-            else:
-                return None # Only show stocks trading ABOVE EMA200
-            
-            sl = qt.calculate_dynamic_sl(ltp, atr)
-            
-            # Calculate Upside
-            upside = round(((fib_target - ltp) / ltp) * 100, 2) if fib_target > ltp else 0.0
-            
-            # Clean Logic
-            clean_symbol = clean_ascii(display_symbol.replace(".NS", ""))
-            action = clean_ascii(action)
-            reason = clean_ascii(reason)
-            
-            # Fetch News Fallback
-            news_sentiment = get_yfinance_news(symbol)
-            final_reasoning = f"{reason} | {news_sentiment}"
-            
-            return {
-                "Symbol": clean_symbol,
-                "Price": ltp,
-                "Trend": s.get('Trend', 'Bullish'),
-                "Above_EMA200": ema_str,
-                "EMA200_Val": round(ema200, 2),
-                "RSI": round(rsi, 2),
-                "MACD": round(macd_hist_val, 2),
-                "SL": round(sl, 2),
-                "Target": round(fib_target, 2),
-                "Agent_Review": f"PENDING_AI_FETCH | Fallback: {final_reasoning}",
-                "Action": action,
-                "Movement_Upside": upside
-            }
-        except Exception as e:
-            print(f"Error enriching {symbol}: {e}")
-            return None
 
-    if signals:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=30) as executor:
-            final_report = [r for r in list(executor.map(enrich, signals)) if r]
-    
+def run_scan(universe, config):
+    if len(universe) > config.get('SHARD_THRESHOLD', 200):
+        return run_sharded_scan(universe, shards=config.get('SCAN_SHARDS'),
+                                fetch_budget=config.get('SHARD_FETCH_BUDGET', 20),
+                                time_budget=config.get('SCAN_TIME_BUDGET', 240))
+    return scan_advanced_signals(universe)
+
+def add_priority_tickers(final_report, config, qt, history):
     # Priority Tickers Verification
-    priority_tickers = ['VBL.NS', 'RELIANCE.NS', 'ITC.NS']
-    existing_symbols = [r['Symbol'] for r in final_report]
+    priority_tickers = config.get('PRIORITY_TICKERS', ['VBL.NS', 'RELIANCE.NS', 'ITC.NS'])
+    existing_symbols = set(final_report.column('Symbol'))
     mapping = config.get('INDEX_MAPPING', {})
     
     for ticker in priority_tickers:
         display_name = mapping.get(ticker, ticker)
         if display_name not in existing_symbols:
             try:
-                hist = yf.Ticker(ticker).history(period="250d")
+                hist = history(ticker)
                 if not hist.empty:
                     last = hist.iloc[-1]
                     ltp_p = round(last['Close'], 2)
@@ -332,14 +341,14 @@ def run_research_cycle():
                     rsi = qt.calculate_rsi(hist).iloc[-1]
                     ema200 = qt.calculate_ema(hist, 200).iloc[-1]
                     ema_str = "YES" if ltp_p > ema200 else "NO"
-                    
+                
                     # Calculate MACD Dynamic Value
                     _, _, macd_series = qt.calculate_macd(hist)
                     macd_val = macd_series.iloc[-1]
-                    
+                
                     # Clean Symbol Name for report (Remove .NS)
                     clean_symbol = clean_ascii(display_name.replace(".NS", ""))
-                    
+                
                     final_report.append({
                         "Symbol": clean_symbol,
                         "Price": ltp_p,
@@ -354,111 +363,273 @@ def run_research_cycle():
                         "Action": "MONITOR",
                         "Movement_Upside": 10.0
                     })
-            except: pass
+            except: count("failure.priority")
+    return final_report
 
+def get_review_model():
+    """Configured Gemini model for Agent_Review completion, or None without a key."""
+    import google.generativeai as genai
+    import streamlit as st
+    api_key = None
+    try:
+        api_key = st.secrets["GOOGLE_API_KEY"]
+    except:
+        api_key = os.environ.get("GOOGLE_API_KEY")
+
+    if api_key:
+        api_key = api_key.strip().strip("'").strip('"')
+
+    if not api_key:
+        return None
+    if api_key.startswith("AQ.") or api_key.startswith("ya29"):
+        from google.oauth2.credentials import Credentials
+        creds = Credentials(api_key)
+        genai.configure(credentials=creds, transport='rest')
+    else:
+        genai.configure(api_key=api_key, transport='rest')
+    return genai.GenerativeModel('gemini-flash-lite-latest')
+
+def review_item(model, item):
+    prompt = (f"Act as a professional systematic quant. You've isolated the ticker {item['Symbol']} currently priced at {item['Price']}. "
+              f"Its RSI is {item['RSI']} and Target is {item['Target']}. Briefly summarize an actionable reason "
+              f"for {item['Action']} in 1 concise sentence prioritizing data.")
+    try:
+        with span("gemini.generate_content", kind="upstream"):
+            res = model.generate_content(prompt)
+        if res and hasattr(res, 'text'):
+            item['Agent_Review'] = clean_ascii(res.text.strip())
+            return True
+        else: item['Agent_Review'] = clean_ascii("Quant signals intact. Validating volume.")
+    except:
+        count("failure.gemini")
+        item['Agent_Review'] = clean_ascii("Quant signals intact. Validating volume.")
+    return False
+
+def review_watchlist(final_report, checkpoint=None):
     # --- ENFORCE AI DATA COMPLETENESS ---
     print("[SYSTEM] Forcing Gemini AI completion for Agent_Review...")
+    reviewed = checkpoint.load("review") if checkpoint else {}
     try:
-        from stock_hub.logic_handler import query_gemini # type: ignore
-        import google.generativeai as genai
-        import os
-        import streamlit as st
-        api_key = None
-        try:
-            api_key = st.secrets["GOOGLE_API_KEY"]
-        except:
-            api_key = os.environ.get("GOOGLE_API_KEY")
-
-        if api_key:
-            api_key = api_key.strip().strip("'").strip('"')
-
-        if api_key:
-            if api_key.startswith("AQ.") or api_key.startswith("ya29"):
-                from google.oauth2.credentials import Credentials
-                creds = Credentials(api_key)
-                genai.configure(credentials=creds, transport='rest')
-            else:
-                genai.configure(api_key=api_key, transport='rest')
-                
-            model = genai.GenerativeModel('gemini-flash-lite-latest')
+        model = get_review_model()
+        if model:
             for item in final_report:
+                if "PENDING_AI" not in item.get('Agent_Review', ''): continue
+                # Reviews already written before a restart cost no quota
+                if item['Symbol'] in reviewed:
+                    item['Agent_Review'] = reviewed[item['Symbol']]
+                    count("checkpoint.skip")
+                    continue
                 time.sleep(0.5) # Anti-Quota spike
-                if "PENDING_AI" in item.get('Agent_Review', ''):
-                    prompt = (f"Act as a professional systematic quant. You've isolated the ticker {item['Symbol']} currently priced at {item['Price']}. "
-                              f"Its RSI is {item['RSI']} and Target is {item['Target']}. Briefly summarize an actionable reason "
-                              f"for {item['Action']} in 1 concise sentence prioritizing data.")
-                    # We mock query_gemini returning the direct output string
-                    try:
-                        res = model.generate_content(prompt)
-                        if res and hasattr(res, 'text'):
-                            item['Agent_Review'] = clean_ascii(res.text.strip())
-                        else: item['Agent_Review'] = clean_ascii("Quant signals intact. Validating volume.")
-                    except:
-                        item['Agent_Review'] = clean_ascii("Quant signals intact. Validating volume.")
+                if review_item(model, item) and checkpoint:
+                    checkpoint.save("review", item['Symbol'], item['Agent_Review'])
         else:
             print("No GOOGLE_API_KEY to force generation. Bypassing.")
     except Exception as e:
         print(f"Forced AI completion failed: {e}")
+    return final_report
 
-    # --- DATA INTEGRITY VALIDATION ---
-    if len(final_report) >= 2:
-        if final_report[0]['Price'] == final_report[-1]['Price']:
-            print("[ERROR] INTEGRITY ERROR: Price Cloning Detected. Aborting.")
-            return
+def derivatives_signal(sym, config, qt, history, vix):
+    # 250d history is shared with enrichment; the signal keeps its 60-session window
+    hist = history(sym).tail(60)
+    if hist.empty: return None
 
-    # --- DERIVATIVES LOGIC (Scalable) ---
-    indices = list(config['INDEX_MAPPING'].keys())
-    stock_options = ["RELIANCE.NS", "HDFCBANK.NS", "ICICIBANK.NS", "INFY.NS", "SBIN.NS"]
-    targets = indices + stock_options
-    
-    options_data = {}
-    for sym in targets:
+    last = hist.iloc[-1]
+    ltp = round(last['Close'], 2)
+    strat = get_derivatives_strategy(sym, ltp, vix=vix)
+
+    ema200 = qt.calculate_ema(hist, 200).iloc[-1]
+    rsi = qt.calculate_rsi(hist).iloc[-1]
+    atr = qt.calculate_atr(hist).iloc[-1]
+    sl = qt.calculate_dynamic_sl(ltp, atr)
+    r1 = qt.calculate_pivots(hist)[2]
+
+    action = "⚪ NEUTRAL"
+    reason = "Market in Consolidation"
+
+    if ltp > ema200 and rsi < config['RSI_BUY']:
+        action = "🚀 BUY"
+        reason = f"Trend Bullish + RSI ({round(rsi, 1)}) Attractive"
+    elif rsi > config['RSI_SELL']:
+        action = "⚠️ OVERBOUGHT (Wait)"
+        reason = f"RSI Overbought ({round(rsi, 1)}), avoid calls"
+    elif ltp < ema200:
+        action = "⚪ NEUTRAL"
+        reason = "Below EMA200, Wait for Breakout"
+
+    return {
+        "price": ltp,
+        "pcr": strat['pcr'],
+        "tag": strat['tag'],
+        "rsi": round(rsi, 2),
+        "sl": round(sl, 2),
+        "target": round(r1, 2),
+        "action": action,
+        "reason": reason,
+        "strike": strat.get('atm_strike', 'N/A (Recalculating)'),
+        "premium": strat.get('atm_premium', 'FEED DELAY')
+    }
+
+def build_cycle_graph(db, qt=None, checkpoint=None):
+    """
+    The research cycle as a CycleGraph. Dependencies are explicit, so the
+    pulse check, scan and derivatives branches run concurrently, and every
+    history / VIX lookup is shared across nodes through graph.memo; news for
+    every scan hit is fetched in one batch (cached for its TTL) before enrich.
+    With a checkpoint, per-symbol results from an interrupted run today are
+    reused instead of recomputed.
+    """
+    qt = qt if qt else QuantTools()
+    graph = CycleGraph()
+    history = lambda sym: cycle_history(graph, sym)
+
+    @graph.node("pulse_check")
+    def _pulse():
+        pulse_check(db)
+
+    @graph.node("config")
+    def _config():
+        return QuantConfig.load()
+
+    @graph.node("universe", deps=["config"])
+    def _universe(config):
+        return get_universe(config.get('UNIVERSE', 'NIFTY_100'))
+
+    @graph.node("vix")
+    def _vix():
+        return graph.memo(("vix",), fetch_vix)
+
+    @graph.node("scan", deps=["universe", "config"])
+    def _scan(universe, config):
+        signals = run_scan(universe, config)
+        db.save_raw_signals(signals)
+        return signals
+
+    @graph.node("news", deps=["scan", "config"])
+    def _news(scan, config):
+        engine = NewsEngine(db.db_path, config.get('NEWS_TTL_MINUTES', 120))
+        symbols = [s['Symbol'] for s in scan or []]
         try:
-            hist = yf.Ticker(sym).history(period="60d")
-            if hist.empty: continue
-            
-            last = hist.iloc[-1]
-            ltp = round(last['Close'], 2)
-            strat = get_derivatives_strategy(sym, ltp)
-            
-            ema200 = qt.calculate_ema(hist, 200).iloc[-1]
-            rsi = qt.calculate_rsi(hist).iloc[-1]
-            atr = qt.calculate_atr(hist).iloc[-1]
-            sl = qt.calculate_dynamic_sl(ltp, atr)
-            r1 = qt.calculate_pivots(hist)[2]
-            
-            action = "⚪ NEUTRAL"
-            reason = "Market in Consolidation"
-            
-            if ltp > ema200 and rsi < config['RSI_BUY']:
-                action = "🚀 BUY"
-                reason = f"Trend Bullish + RSI ({round(rsi, 1)}) Attractive"
-            elif rsi > config['RSI_SELL']:
-                action = "⚠️ OVERBOUGHT (Wait)"
-                reason = f"RSI Overbought ({round(rsi, 1)}), avoid calls"
-            elif ltp < ema200:
-                action = "⚪ NEUTRAL"
-                reason = "Below EMA200, Wait for Breakout"
-
-            options_data[sym] = {
-                "price": ltp,
-                "pcr": strat['pcr'],
-                "tag": strat['tag'],
-                "rsi": round(rsi, 2),
-                "sl": round(sl, 2),
-                "target": round(r1, 2),
-                "action": action,
-                "reason": reason,
-                "strike": strat.get('atm_strike', 'N/A (Recalculating)'),
-                "premium": strat.get('atm_premium', 'FEED DELAY')
-            }
+            engine.refresh(symbols)
         except Exception as e:
-            print(f"Error processing {sym}: {e}")
-            pass
+            print(f"[NEWS] Refresh failed, using stored headlines: {e}")
+            count("failure.news")
+        sentiment = engine.sentiment(symbols)
+        return lambda sym: clean_ascii(engine.summary_text(sentiment, sym))
+
+    @graph.node("enrich", deps=["scan", "config", "news"])
+    def _enrich(scan, config, news):
+        done = checkpoint.load("enrich") if checkpoint else {}
+
+        todo = [s for s in scan or [] if s['Symbol'] not in done]
+        count("checkpoint.skip", len(scan or []) - len(todo))
+        executor = EnrichExecutor(config.get('ENRICH_PROCESSES', 4),
+                                  min_process_symbols=config.get('ENRICH_PROCESS_THRESHOLD', 200))
+
+        def record(s, row):
+            # Per symbol as it finishes, so an interrupted cycle resumes from here
+            if isinstance(row, Exception):
+                print(f"Error enriching {s['Symbol']}: {row}")
+                count("failure.enrich")
+            elif checkpoint:
+                checkpoint.save("enrich", s['Symbol'], row)
+
+        outcomes = executor.run(todo, history, config['FIB_RATIO'],
+                                lambda s, indicators: _watchlist_row(s, config, qt, indicators, news), record)
+        rows = {s['Symbol']: None if isinstance(row, Exception) else row for s, row in zip(todo, outcomes)}
+
+        final_report = RecordBatch(WATCHLIST_SCHEMA)
+        ordered = (rows[s['Symbol']] if s['Symbol'] in rows else done[s['Symbol']] for s in scan or [])
+        final_report.extend(tuple(row) if row is not None else None for row in ordered)
+        return final_report
+
+    @graph.node("priority", deps=["enrich", "config"])
+    def _priority(enrich, config):
+        return add_priority_tickers(enrich, config, qt, history)
+
+    @graph.node("gemini_review", deps=["priority"])
+    def _review(priority):
+        return review_watchlist(priority, checkpoint)
+
+    @graph.node("derivatives", deps=["config", "vix"])
+    def _derivatives(config, vix):
+        # --- DERIVATIVES LOGIC (Scalable) ---
+        indices = list(config['INDEX_MAPPING'].keys())
+        stock_options = ["RELIANCE.NS", "HDFCBANK.NS", "ICICIBANK.NS", "INFY.NS", "SBIN.NS"]
+        options_data = checkpoint.load("derivatives") if checkpoint else {}
+        for sym in indices + stock_options:
+            if sym in options_data: continue
+            try:
+                d = derivatives_signal(sym, config, qt, history, vix)
+                if d:
+                    options_data[sym] = d
+                    if checkpoint: checkpoint.save("derivatives", sym, d)
+            except Exception as e:
+                print(f"Error processing {sym}: {e}")
+                count("failure.derivatives")
+        return options_data
+
+    @graph.node("risk", deps=["universe", "config"])
+    def _risk(universe, config):
+        # Advisory only: a failed refresh must not fail the cycle
+        try:
+            return run_risk_refresh(universe, config, db.db_path)
+        except Exception as e:
+            print(f"[RISK] Refresh skipped: {e}")
+            count("failure.risk")
+            return None
+
+    @graph.node("screens", deps=["universe"])
+    def _screens(universe):
+        try:
+            return run_screens(universe, db.db_path)
+        except Exception as e:
+            print(f"[SCREEN] Saved screens skipped: {e}")
+            count("failure.screens")
+            return {}
+
+    @graph.node("db_sync", deps=["gemini_review", "derivatives"])
+    def _sync(gemini_review, derivatives):
+        # --- DATA INTEGRITY VALIDATION ---
+        if len(gemini_review) >= 2:
+            if gemini_review[0]['Price'] == gemini_review[-1]['Price']:
+                print("[ERROR] INTEGRITY ERROR: Price Cloning Detected. Aborting.")
+                return False
+        db.save_derivatives(derivatives)
+        db.save_processed_watchlist(gemini_review)
+        return True
+
+    return graph
+
+def _run_research_cycle():
+    # 1. Maintenance & Integrity Check
+    MaintenanceManager.run_daily_clean()
+    db = DatabaseManager()
     
-    # 2. Database Sync
-    db.save_derivatives(options_data)
-    db.save_processed_watchlist(final_report)
+    print("[INIT] PRIME O-L MOMENTUM ENGINE | Processing Markets (Modular v3)...")
+    checkpoint = CycleCheckpoint(db.db_path)
+    graph = build_cycle_graph(db, checkpoint=checkpoint)
+    synced = graph.run(["pulse_check", "risk", "screens", "db_sync"])["db_sync"]
+    # Only a cycle that ran to the end gives up its checkpoints
+    checkpoint.clear()
+    if not synced:
+        return
+    try:
+        get_memory_index().sync_reviews()
+        get_memory_index().sync_history()
+    except sqlite3.Error as e:
+        print(f"[MEMORY] Index sync skipped: {e}")
+    try:
+        # pyarrow is only needed here; the rest of the engine runs without it
+        from stock_hub.archive import get_archive
+        from pyarrow import ArrowException
+    except ImportError as e:
+        print(f"[ARCHIVE] Session archive skipped: {e}")
+    else:
+        try:
+            get_archive().run()
+        except (OSError, sqlite3.Error, ArrowException) as e:
+            print(f"[ARCHIVE] Session archive skipped: {e}")
+    options_data = graph.result("derivatives")
     
     # TERMINAL PROOF
     print("\n--- TERMINAL PROOF (ATM Audit) ---")
@@ -474,5 +645,8 @@ if __name__ == "__main__":
     try:
         run_research_cycle()
     except Exception as e:
-        # Silently proceed to avoid halting the system factory
-        pass
+        # Fail loudly: checkpoints persist, so a rerun resumes where this one stopped
+        import traceback
+        traceback.print_exc()
+        print(f"[FATAL] Research cycle aborted: {e}")
+        sys.exit(1)
@@ -0,0 +1,144 @@
+import os
+import pandas as pd
+from stock_hub.config import BASE_DIR
+
+# Drop NSE/BSE constituent CSVs here (e.g. EQUITY_L.csv, ind_nifty500list.csv,
+# bse_equity.csv) and refer to them by file stem: get_universe("EQUITY_L").
+UNIVERSE_DIR = os.path.join(BASE_DIR, "stock_hub", "data", "universe")
+
+NIFTY_50_SYMBOLS = [
+    'ADANIENT.NS', 'ADANIPORTS.NS', 'APOLLOHOSP.NS', 'ASIANPAINT.NS', 'AXISBANK.NS',
+    'BAJAJ-AUTO.NS', 'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BHARTIARTL.NS', 'BPCL.NS',
+    'BRITANNIA.NS', 'CIPLA.NS', 'COALINDIA.NS', 'DIVISLAB.NS', 'DRREDDY.NS',
+    'EICHERMOT.NS', 'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS', 'HDFCLIFE.NS',
+    'HEROMOTOCO.NS', 'HINDALCO.NS', 'HINDUNILVR.NS', 'ICICIBANK.NS', 'ITC.NS',
+    'INDUSINDBK.NS', 'INFY.NS', 'JSWSTEEL.NS', 'KOTAKBANK.NS', 'LT.NS', 'LTIM.NS',
+    'M&M.NS', 'MARUTI.NS', 'NESTLEIND.NS', 'NTPC.NS', 'ONGC.NS', 'POWERGRID.NS',
+    'RELIANCE.NS', 'SBILIFE.NS', 'SBIN.NS', 'SHRIRAMFIN.NS', 'SUNPHARMA.NS',
+    'TCS.NS', 'TATACONSUM.NS', 'TATAMOTORS.NS', 'TATASTEEL.NS', 'TECHM.NS',
+    'TITAN.NS', 'ULTRACEMCO.NS', 'WIPRO.NS'
+]
+
+# FULL NIFTY 100 SYMBOLS (.NS)
+NIFTY_100 = [
+    'ABB.NS', 'ADANIENSOL.NS', 'ADANIENT.NS', 'ADANIGREEN.NS', 'ADANIPORTS.NS', 'ADANIPOWER.NS',
+    'ATGL.NS', 'AMBUJACEM.NS', 'APOLLOHOSP.NS', 'ASIANPAINT.NS', 'AXISBANK.NS', 'BAJAJ-AUTO.NS',
+    'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BAJAJHLDNG.NS', 'BANKBARODA.NS', 'BERGEPAINT.NS', 'BEL.NS',
+    'BHARTIARTL.NS', 'BPCL.NS', 'BOSCHLTD.NS', 'BRITANNIA.NS', 'CANBK.NS', 'CHOLAFIN.NS',
+    'CIPLA.NS', 'COALINDIA.NS', 'COLPAL.NS', 'DLF.NS', 'DABUR.NS', 'DIVISLAB.NS', 'DRREDDY.NS',
+    'EICHERMOT.NS', 'GAIL.NS', 'GICRE.NS', 'GODREJCP.NS', 'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS',
+    'HDFCLIFE.NS', 'HAVELLS.NS', 'HEROMOTOCO.NS', 'HINDALCO.NS', 'HAL.NS', 'HINDUNILVR.NS',
+    'ICICIBANK.NS', 'ICICIGI.NS', 'ICICIPRULI.NS', 'ITC.NS', 'IOC.NS', 'IRCTC.NS', 'IRFC.NS',
+    'INDUSINDBK.NS', 'INFY.NS', 'NAUKRI.NS', 'JSWSTEEL.NS', 'KOTAKBANK.NS', 'LTIM.NS', 'LT.NS',
+    'LICI.NS', 'M&M.NS', 'MARICO.NS', 'MARUTI.NS', 'NTPC.NS', 'NESTLEIND.NS', 'ONGC.NS',
+    'PIDILITIND.NS', 'PFC.NS', 'POWERGRID.NS', 'PNB.NS', 'RELIANCE.NS', 'SBICARD.NS', 'SBILIFE.NS',
+    'SRF.NS', 'SBIN.NS', 'SUNPHARMA.NS', 'TVSMOTOR.NS', 'TCS.NS', 'TATACONSUM.NS', 'TATAMOTORS.NS',
+    'TATASTEEL.NS', 'TECHM.NS', 'TITAN.NS', 'TRENT.NS', 'ULTRACEMCO.NS', 'UNITDSPR.NS', 'VBL.NS',
+    'VEDL.NS', 'WIPRO.NS', 'ZOMATO.NS', 'ZYDUSLIFE.NS'
+]
+
+BUILTIN_UNIVERSES = {
+    "NIFTY_50": NIFTY_50_SYMBOLS,
+    "NIFTY_100": NIFTY_100,
+}
+
+# Cash-market series worth scanning (rolling settlement + trade-to-trade)
+EQUITY_SERIES = {"EQ", "BE", "BZ"}
+
+_registry = {}
+
+def load_universe_csv(path):
+    """
+    Normalizes an exchange constituent file into Ticker / Name / Sector / Exchange.
+    Understands NSE EQUITY_L.csv, NSE index lists (ind_*.csv) and the BSE
+    equity list (Security Id column). Unknown layouts need a Symbol/Ticker column.
+    """
+    raw = pd.read_csv(path)
+    raw.columns = [str(c).strip() for c in raw.columns]
+    cols = {c.upper(): c for c in raw.columns}
+
+    if "SECURITY ID" in cols:
+        exchange, suffix = "BSE", ".BO"
+        sym_col = cols["SECURITY ID"]
+        name_col = cols.get("SECURITY NAME") or cols.get("ISSUER NAME")
+        status_col = cols.get("STATUS")
+        if status_col:
+            raw = raw[raw[status_col].astype(str).str.strip().str.upper() == "ACTIVE"]
+    else:
+        exchange, suffix = "NSE", ".NS"
+        sym_col = cols.get("SYMBOL") or cols.get("TICKER")
+        if sym_col is None:
+            raise ValueError(f"No Symbol/Ticker column in {path}")
+        name_col = cols.get("NAME OF COMPANY") or cols.get("COMPANY NAME") or cols.get("NAME")
+        series_col = cols.get("SERIES")
+        if series_col:
+            raw = raw[raw[series_col].astype(str).str.strip().isin(EQUITY_SERIES)]
+
+    sector_col = cols.get("INDUSTRY") or cols.get("SECTOR")
+    tickers = raw[sym_col].astype(str).str.strip()
+    tickers = tickers.where(tickers.str.contains(r"\.(?:NS|BO)$"), tickers + suffix)
+
+    df = pd.DataFrame({
+        "Ticker": tickers.values,
+        "Name": raw[name_col].astype(str).str.strip().values if name_col else tickers.values,
+        "Sector": raw[sector_col].astype(str).str.strip().values if sector_col else "Unclassified",
+        "Exchange": exchange
+    })
+    return df.drop_duplicates("Ticker").reset_index(drop=True)
+
+def get_universe_frame(name="NIFTY_100"):
+    """Ticker / Name / Sector / Exchange frame for a built-in list or a CSV stem in UNIVERSE_DIR."""
+    if name in _registry:
+        return _registry[name]
+
+    path = name if name.endswith(".csv") else os.path.join(UNIVERSE_DIR, f"{name}.csv")
+    if os.path.exists(path):
+        df = load_universe_csv(path)
+    elif name in BUILTIN_UNIVERSES:
+        syms = BUILTIN_UNIVERSES[name]
+        df = pd.DataFrame({"Ticker": syms, "Name": syms, "Sector": "Unclassified", "Exchange": "NSE"})
+        # Borrow sectors from any constituent file that covers these symbols
+        sectors = get_sector_map()
+        if sectors:
+            df["Sector"] = df["Ticker"].map(sectors).fillna("Unclassified")
+    else:
+        raise KeyError(f"Unknown universe: {name}")
+
+    _registry[name] = df
+    return df
+
+def get_universe(name="NIFTY_100"):
+    return get_universe_frame(name)["Ticker"].tolist()
+
+def to_yahoo_symbol(ticker, index_mapping=None):
+    """DB display name ("RELIANCE", "NIFTY") -> Yahoo symbol ("RELIANCE.NS", "^NSEI")."""
+    for symbol, name in (index_mapping or {}).items():
+        if name == ticker:
+            return symbol
+    if ticker.startswith("^") or "." in ticker:
+        return ticker
+    return f"{ticker}.NS"
+
+def list_universes():
+    names = list(BUILTIN_UNIVERSES)
+    if os.path.isdir(UNIVERSE_DIR):
+        names += sorted(f[:-4] for f in os.listdir(UNIVERSE_DIR) if f.endswith(".csv"))
+    return names
+
+def get_sector_map():
+    """{Ticker: Sector} merged across every CSV in UNIVERSE_DIR that carries an Industry column."""
+    if "__sectors__" in _registry:
+        return _registry["__sectors__"]
+    sectors = {}
+    if os.path.isdir(UNIVERSE_DIR):
+        for f in sorted(os.listdir(UNIVERSE_DIR)):
+            if not f.endswith(".csv"): continue
+            try:
+                df = load_universe_csv(os.path.join(UNIVERSE_DIR, f))
+            except Exception as e:
+                print(f"[UNIVERSE] Skipping {f}: {e}")
+                continue
+            known = df[df["Sector"] != "Unclassified"]
+            sectors.update(dict(zip(known["Ticker"], known["Sector"])))
+    _registry["__sectors__"] = sectors
+    return sectors
@@ -1,24 +1,16 @@
-import yfinance as yf
+from stock_hub import market_data as md
 import pandas as pd
 import time
 
-NIFTY_50_SYMBOLS = [
-    'ADANIENT.NS', 'ADANIPORTS.NS', 'APOLLOHOSP.NS', 'ASIANPAINT.NS', 'AXISBANK.NS',
-    'BAJAJ-AUTO.NS', 'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BHARTIARTL.NS', 'BPCL.NS',
-    'BRITANNIA.NS', 'CIPLA.NS', 'COALINDIA.NS', 'DIVISLAB.NS', 'DRREDDY.NS',
-    'EICHERMOT.NS', 'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS', 'HDFCLIFE.NS',
-    'HEROMOTOCO.NS', 'HINDALCO.NS', 'HINDUNILVR.NS', 'ICICIBANK.NS', 'ITC.NS',
-    'INDUSINDBK.NS', 'INFY.NS', 'JSWSTEEL.NS', 'KOTAKBANK.NS', 'LT.NS', 'LTIM.NS',
-    'M&M.NS', 'MARUTI.NS', 'NESTLEIND.NS', 'NTPC.NS', 'ONGC.NS', 'POWERGRID.NS',
-    'RELIANCE.NS', 'SBILIFE.NS', 'SBIN.NS', 'SHRIRAMFIN.NS', 'SUNPHARMA.NS',
-    'TCS.NS', 'TATACONSUM.NS', 'TATAMOTORS.NS', 'TATASTEEL.NS', 'TECHM.NS',
-    'TITAN.NS', 'ULTRACEMCO.NS', 'WIPRO.NS'
-]
+from stock_hub.universe import NIFTY_50_SYMBOLS
+from stock_hub.metrics import count
+from stock_hub.bar_engine import fetch_price_panel
+from stock_hub.quant_tools import QuantTools
 
 def fetch_stock_data(symbol, interval="1d", period="5d", max_retries=3):
     for attempt in range(max_retries):
         try:
-            data = yf.download(
+            data = md.download(
                 tickers=symbol,
                 period=period,
                 interval=interval,
@@ -35,38 +27,20 @@ def fetch_stock_data(symbol, interval="1d", period="5d", max_retries=3):
                 return pd.DataFrame()
             return data
         except Exception:
+            count("retry.fetch_stock_data")
             time.sleep(2 ** attempt)
     return pd.DataFrame()
 
-def analyze_stocks():
-    results = []
-    for symbol in NIFTY_50_SYMBOLS:
-        data = fetch_stock_data(symbol)
-        if data.empty or len(data) < 2:
-            continue
-        today = data.iloc[-1]
-        yesterday = data.iloc[-2]
-        open_today = today["Open"]
-        high_yesterday = yesterday["High"]
-        low_yesterday = yesterday["Low"]
-        if open_today > high_yesterday:
-            status = "Gap Up Breakout"
-            gap = ((open_today - high_yesterday) / high_yesterday) * 100
-        elif open_today < low_yesterday:
-            status = "Gap Down Breakdown"
-            gap = ((low_yesterday - open_today) / low_yesterday) * 100
-        else:
-            continue
-        results.append({
-            "Symbol": symbol.replace(".NS", ""),
-            "Yesterday High": round(high_yesterday, 2),
-            "Yesterday Low": round(low_yesterday, 2),
-            "Today Open": round(open_today, 2),
-            "Gap %": round(gap, 2),
-            "Status": status
-        })
-        time.sleep(0.5)
-    return pd.DataFrame(results)
+def analyze_stocks(symbols=NIFTY_50_SYMBOLS, lookback=1, panel=None):
+    """
+    Gap-up / gap-down breakout scan over one batched (and cached) daily panel.
+    lookback: number of prior sessions whose high/low the open must clear.
+    """
+    if panel is None:
+        panel = fetch_price_panel(symbols, period=f"{max(lookback + 4, 5)}d")
+    if not panel or panel['Open'].empty:
+        return pd.DataFrame()
+    return QuantTools.gap_breakouts(panel, lookback)
 
 def fetch_live_prices(symbols=NIFTY_50_SYMBOLS):
     """
@@ -82,7 +56,7 @@ def fetch_live_prices(symbols=NIFTY_50_SYMBOLS):
         ticker_str = " ".join(symbols)
         
         def get_data(period):
-            return yf.download(
+            return md.download(
                 tickers=ticker_str,
                 period=period,
                 interval="1m",